@@ -1,3 +1,5 @@
+from typing import Optional
+from fastapi import HTTPException
 from passlib.context import CryptContext
 import jwt
 from datetime import datetime, timedelta
@@ -35,3 +37,18 @@ def decode_access_token(token: str):
     except Exception as e:
         print(f"[AUTH DEBUG] Unexpected auth error: {e}")
         return None
+
+def require_admin(authorization: Optional[str]) -> str:
+    """
+    Username of a valid Bearer token listed in ADMIN_USERNAMES
+    (comma-separated). 401 without a valid token, 403 otherwise.
+    Guards operational endpoints (cache control, worker diagnostics).
+    """
+    token = authorization.split(" ")[1] if authorization and authorization.startswith("Bearer ") else None
+    payload = decode_access_token(token) if token else None
+    if not payload or not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    admins = {u.strip() for u in os.getenv("ADMIN_USERNAMES", "").split(",") if u.strip()}
+    if payload["sub"] not in admins:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return payload["sub"]
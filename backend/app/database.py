@@ -176,7 +176,6 @@ def get_mandi_db():
 # ──────────────────────────────────────────────────────────────
 # Asynchronous Database Engine and Session Configuration
 # ──────────────────────────────────────────────────────────────
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 # Construct async connection URLs using postgresql+asyncpg
 ASYNC_AUTH_DATABASE_URL = AUTH_RAW.strip()
@@ -194,6 +193,7 @@ ASYNC_AUTH_DATABASE_URL = apply_ssl_if_needed(ASYNC_AUTH_DATABASE_URL, async_aut
 ASYNC_MANDI_DATABASE_URL = apply_ssl_if_needed(ASYNC_MANDI_DATABASE_URL, async_mandi_engine_args)
 
 def safe_create_async_engine(name, url, args):
+    from sqlalchemy.ext.asyncio import create_async_engine
     try:
         u = make_url(url)
         debug_print(f"Creating async {name} engine (Driver: {u.drivername}, Host: {u.host}, Port: {u.port})")
@@ -204,11 +204,44 @@ def safe_create_async_engine(name, url, args):
         debug_print(f"CRITICAL ERROR in async {name} engine creation: {str(e)}")
         raise e
 
-async_auth_engine = safe_create_async_engine("ASYNC_AUTH", ASYNC_AUTH_DATABASE_URL, async_auth_engine_args)
-async_mandi_engine = safe_create_async_engine("ASYNC_MANDI", ASYNC_MANDI_DATABASE_URL, async_mandi_engine_args)
+class _LazyAsyncSessionFactory:
+    """
+    Async engine + sessionmaker created on first use, so importing this
+    module does not pull in sqlalchemy.ext.asyncio / asyncpg or open a
+    second pool pair until an async endpoint actually needs it.
+    Calling the factory behaves exactly like calling the async_sessionmaker.
+    """
 
-AsyncAuthSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=async_auth_engine, class_=AsyncSession)
-AsyncMandiSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=async_mandi_engine, class_=AsyncSession)
+    def __init__(self, name, url, args):
+        self._name = name
+        self._url = url
+        self._args = args
+        self._engine = None
+        self._sessionmaker = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+            self._engine = safe_create_async_engine(self._name, self._url, self._args)
+            self._sessionmaker = async_sessionmaker(autocommit=False, autoflush=False, bind=self._engine, class_=AsyncSession)
+        return self._engine
+
+    def __call__(self, **kwargs):
+        if self._sessionmaker is None:
+            self.engine
+        return self._sessionmaker(**kwargs)
+
+AsyncAuthSessionLocal = _LazyAsyncSessionFactory("ASYNC_AUTH", ASYNC_AUTH_DATABASE_URL, async_auth_engine_args)
+AsyncMandiSessionLocal = _LazyAsyncSessionFactory("ASYNC_MANDI", ASYNC_MANDI_DATABASE_URL, async_mandi_engine_args)
+
+def __getattr__(name):
+    # Lazy module attributes for the async engines (PEP 562)
+    if name == "async_auth_engine":
+        return AsyncAuthSessionLocal.engine
+    if name == "async_mandi_engine":
+        return AsyncMandiSessionLocal.engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def get_async_auth_db():
     async with AsyncAuthSessionLocal() as db:
@@ -1,10 +1,6 @@
 import os
-import tempfile
-# Force transformers to use a shallow, explicit directory (cross-platform temporary directory)
-temp_cache = os.path.join(tempfile.gettempdir(), "hf_cache")
-os.environ["HF_HOME"] = temp_cache
-os.environ["TRANSFORMERS_CACHE"] = temp_cache
-
+import time
+_BOOT_T0 = time.perf_counter()
 
 import sys
 import asyncio
@@ -17,15 +13,51 @@ print(f"DEBUG MAIN: MANDI_DATABASE_URL={os.getenv('MANDI_DATABASE_URL')}")
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
+import importlib
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from app.routers import market, auth, weather, scanner, harvestiq, satellite, assistant, research, schemes, mandi_prices, news, plant_scanner
-from app.database import auth_engine, mandi_engine, AuthBase, MandiBase
+
+# Startup timing breakdown (ms), logged once from the lifespan handler.
+# Heavy libraries (pandas, prophet, sklearn, transformers, torch, groq,
+# the Azure Speech SDK, async DB engines) are imported on first use by
+# the services that need them — see bench_startup.py for the budget check.
+startup_timings = {"framework": (time.perf_counter() - _BOOT_T0) * 1000}
+
+def _timed_import(module_name: str):
+    t0 = time.perf_counter()
+    module = importlib.import_module(module_name)
+    startup_timings[module_name.rsplit(".", 1)[-1]] = (time.perf_counter() - t0) * 1000
+    return module
+
+market = _timed_import("app.routers.market")
+auth = _timed_import("app.routers.auth")
+weather = _timed_import("app.routers.weather")
+scanner = _timed_import("app.routers.scanner")
+harvestiq = _timed_import("app.routers.harvestiq")
+satellite = _timed_import("app.routers.satellite")
+assistant = _timed_import("app.routers.assistant")
+research = _timed_import("app.routers.research")
+schemes = _timed_import("app.routers.schemes")
+mandi_prices = _timed_import("app.routers.mandi_prices")
+news = _timed_import("app.routers.news")
+plant_scanner = _timed_import("app.routers.plant_scanner")
 
 ml_models = {}
+_startup_logged = False
+
+
+def log_startup_timings():
+    """Print the import/startup breakdown once per process."""
+    global _startup_logged
+    if _startup_logged:
+        return
+    _startup_logged = True
+    total = (time.perf_counter() - _BOOT_T0) * 1000
+    parts = ", ".join(f"{k}={v:.0f}ms" for k, v in sorted(startup_timings.items(), key=lambda kv: -kv[1]))
+    print(f"[STARTUP] Boot {total:.0f}ms — {parts}")
 
 # Database initialization is moved to startup event for better resilience
 
@@ -56,12 +88,51 @@ def init_db():
         debug_print(f"CRITICAL: Database initialization failed: {e}")
         import traceback
         debug_print(traceback.format_exc())
-        # We don't raise here so the API can still start (for health checks/debugging)
+        # Re-raised so the warm-up orchestrator reports the database as failed;
+        # the API itself still starts (health reports "degraded")
+        raise
+
+
+def preconnect_db_pools(connections_per_pool: int = 2):
+    """Open a few pooled connections per engine so first requests skip the TCP/TLS/auth handshake."""
+    from sqlalchemy import text
+    from app.database import auth_engine, mandi_engine
+
+    for engine in (auth_engine, mandi_engine):
+        conns = [engine.connect() for _ in range(connections_per_pool)]
+        for conn in conns:
+            conn.execute(text("SELECT 1"))
+        for conn in conns:
+            conn.close()
+
+
+def preconnect_http_sessions():
+    """Establish TCP+TLS on the pooled requests sessions used by Gemini and Sarvam."""
+    from app.services.gemini_service import gemini_service
+    from app.services.tts_fallback import tts_fallback_service
+
+    targets = [
+        (gemini_service._session, "https://generativelanguage.googleapis.com/"),
+        (tts_fallback_service._session, "https://api.sarvam.ai/"),
+    ]
+    for session, url in targets:
+        try:
+            session.head(url, timeout=5)
+        except Exception as e:
+            print(f"[!] HTTP pre-connect to {url} failed: {e}")
+
+
+# Components that must finish warming before the worker reports ready. The
+# classifier is not critical by default: its download/load can take minutes,
+# and /analyze-plant falls back to the client's metadata until it is loaded,
+# so it shouldn't gate the whole app.
+WARMUP_CRITICAL = {c.strip() for c in os.getenv("WARMUP_CRITICAL", "database").split(",") if c.strip()}
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("APPLICATION STARTING UP...")
     app.state.is_ready = False
+    log_startup_timings()
     
     # 1. Start Scheduler
     from app.services.scheduler import start_scheduler
@@ -71,35 +142,61 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"[!] Failed to start scheduler: {e}")
         
-    # 2. Database Initialization (non-blocking)
-    async def delayed_init():
-        await asyncio.sleep(1) # Yield control
+    from app.services.warmup_service import warmup_orchestrator
+    app.state.warmup = warmup_orchestrator
+
+    # 2. Database Initialization + pool pre-connect
+    async def warm_database():
         await asyncio.to_thread(init_db)
-    asyncio.create_task(delayed_init())
-    
-    # 3. Warm up Local Classifier Model in background to prevent startup blocking
+        await asyncio.to_thread(preconnect_db_pools)
+
+    # 3. Local Classifier Model (loaded off the event loop; weights shared
+    #    across workers via mmap / pre-fork — see classifier_service)
     async def load_model_background():
-        try:
-            from transformers import AutoImageProcessor, AutoModelForImageClassification
-            VISION_MODEL_NAME = "Abuzaid01/plant-disease-classifier"
-            print("Loading pre-trained PlantVillage model in the background...")
-            proc = await asyncio.to_thread(AutoImageProcessor.from_pretrained, VISION_MODEL_NAME)
-            mod = await asyncio.to_thread(AutoModelForImageClassification.from_pretrained, VISION_MODEL_NAME)
-            app.state.classifier_processor = proc
-            app.state.classifier_model = mod
-            print("Model loaded successfully in the background!")
-        except Exception as e:
-            print(f"[!] Failed to load local classifier model in background: {e}")
-            
-    asyncio.create_task(load_model_background())
+        from app.services.classifier_service import load_shared_classifier
+        print("Loading pre-trained PlantVillage model in the background...")
+        proc, mod = await asyncio.to_thread(load_shared_classifier)
+        app.state.classifier_processor = proc
+        app.state.classifier_model = mod
+        print("Model loaded successfully in the background!")
+
+    # 4. Construct + pre-warm the Azure voice engine off the event loop
+    async def warm_voice_engine():
+        from app.services.azure_tts_engine import casual_voice_engine
+        await asyncio.to_thread(casual_voice_engine.get)
+
+    # 5. Pre-connect pooled HTTP sessions to upstream APIs
+    async def warm_http_clients():
+        await asyncio.to_thread(preconnect_http_sessions)
+
+    # 6. Warm the persistent geocode cache from user profile locations (needs the DB)
+    async def preload_caches():
+        await warmup_orchestrator.wait_for("database")
+        from app.services.geocoding import preseed_from_user_profiles
+        await preseed_from_user_profiles()
+
+    warmup_orchestrator.register("database", warm_database, timeout=float(os.getenv("WARMUP_DB_TIMEOUT", "60")), critical="database" in WARMUP_CRITICAL)
+    warmup_orchestrator.register("classifier", load_model_background, timeout=float(os.getenv("WARMUP_CLASSIFIER_TIMEOUT", "300")), critical="classifier" in WARMUP_CRITICAL)
+    warmup_orchestrator.register("tts_voices", warm_voice_engine, timeout=float(os.getenv("WARMUP_TTS_TIMEOUT", "60")), critical="tts_voices" in WARMUP_CRITICAL)
+    warmup_orchestrator.register("http_clients", warm_http_clients, timeout=15, critical="http_clients" in WARMUP_CRITICAL)
+    warmup_orchestrator.register("caches", preload_caches, timeout=float(os.getenv("WARMUP_CACHE_TIMEOUT", "120")), critical="caches" in WARMUP_CRITICAL)
+    warmup_orchestrator.start()
+
+    async def mark_ready():
+        await warmup_orchestrator.wait_critical()
+        app.state.is_ready = True
+        state = "degraded" if warmup_orchestrator.is_degraded else "ready"
+        print(f"[*] Critical warm-up finished ({state}). EventHorizon is Online.")
+
+    ready_task = asyncio.create_task(mark_ready())
+    print("[*] Application startup complete. Warming up in the background...")
 
-    app.state.is_ready = True
-    print("[*] Application startup complete. EventHorizon is Online.")
-    
     yield
 
     # Teardown logic here
     print("APPLICATION SHUTTING DOWN...")
+    ready_task.cancel()
+    warmup_orchestrator.cancel()
     
     # Clean up ML classifier models
     if hasattr(app.state, "classifier_processor"):
@@ -122,6 +219,12 @@ async def lifespan(app: FastAPI):
         print("[-] Process pool executor shut down.")
     except Exception as e:
         print(f"[!] Failed to shut down executor: {e}")
+
+    try:
+        from app.services.audio_codec import shutdown_pool
+        shutdown_pool()
+    except Exception as e:
+        print(f"[!] Failed to shut down audio encoder pool: {e}")
         
     ml_models.clear()
 
@@ -164,10 +267,11 @@ async def root():
 
 @app.get('/api/health')
 async def health_check():
+    warmup = getattr(app.state, "warmup", None)
+    report = warmup.report() if warmup else {"status": "booting", "components": {}}
     if getattr(app.state, "is_ready", False):
-        return {"status": "ready", "message": "EventHorizon API is online"}
-    else:
-        raise HTTPException(status_code=503, detail="booting")
+        return {**report, "message": "EventHorizon API is online"}
+    return JSONResponse(status_code=503, content={**report, "detail": "booting"})
 
 # Serve audio files
 # In FastAPI, we can mount a static directory.
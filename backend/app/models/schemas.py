@@ -12,6 +12,14 @@ class TTSRequest(BaseModel):
     text: str
     language: str
     voice_preference: Optional[str] = None
+    format: Optional[str] = None  # opus | webm | mp3 | wav; falls back to the Accept header, then wav
+    stream: bool = False  # stream a WAV as the audio is synthesized (lower time-to-first-audio)
+
+class AdvisoryTTSRequest(BaseModel):
+    template: str  # advisory_templates id, from an advisory's `speech` field
+    params: Dict[str, Any] = {}
+    language: str
+    format: Optional[str] = None  # as in TTSRequest
 
 class MemoryRequest(BaseModel):
     user_id: str
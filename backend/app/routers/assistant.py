@@ -3,8 +3,10 @@ import base64
 import asyncio
 import hashlib
 import re
-from fastapi import APIRouter, HTTPException, UploadFile, File, Header, Depends, WebSocket, WebSocketDisconnect
-from fastapi.responses import Response
+import uuid
+from typing import Optional
+from fastapi import APIRouter, HTTPException, UploadFile, File, Header, Depends, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response, StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
 from app.database import get_auth_db, AsyncAuthSessionLocal
 from app.models import User
@@ -15,22 +17,36 @@ from sqlalchemy import select
 from app.models.schemas import (
     ChatRequest, 
     TTSRequest, 
+    AdvisoryTTSRequest,
     MemoryRequest,
     ProfileResponse,
     ProfileUpdateRequest
 )
 
 # Import Services
-from app.services.gemini_service import gemini_service
+from app.services.gemini_service import gemini_service, NETWORK_ERROR_REPLY
 from app.services.groq_service import groq_service
 from app.services.tts_fallback import tts_fallback_service
 from app.services.azure_tts_engine import casual_voice_engine
 from app.services.memory_service import memory_service
+from app.services.ws_audio_protocol import (
+    pack_frame, unpack_frame, FrameError, FRAME_MIC_AUDIO, FRAME_TTS_AUDIO, PROTOCOL_BINARY, PROTOCOL_JSON,
+)
+from app.services.streaming_tts import TTSStream, wav_stream_header, pcm_to_wav, get_streaming_stats
+from app.services.streaming_stt import IncrementalTranscriber, INCREMENTAL_ENABLED as STT_INCREMENTAL
+from app.services.audio_store import audio_store, audio_key
+from app.services.phrase_tts import speak_template, get_phrase_stats
+from app.services.tts_router import tts_router
+from app.services.tts_chunker import extract_tts_chunks, AdaptiveTTSChunker, ADAPTIVE_ENABLED as TTS_ADAPTIVE_CHUNKING
+from app.services.tts_delivery import OrderedAudioDelivery, record_delivery, get_delivery_stats
+from app.services.advisory_templates import ADVISORY_TEMPLATES, render
+from app.services.audio_codec import encode_async, encode_in_pool, negotiate_format, mime_for, get_codec_stats
+from app.services.semantic_cache import semantic_chat_cache
+from app.services.history_manager import history_manager
 from app.cache_utils import TTLCache
 
 router = APIRouter()
 
-tts_audio_cache = TTLCache(ttl_seconds=86400)  # Cache generated TTS audio for 24 hours
 chat_response_cache = TTLCache(ttl_seconds=3600)  # Cache repeated identical chat queries for 1 hour
 
 # Helper to verify token and retrieve user
@@ -49,34 +65,72 @@ def get_current_user_from_token(authorization: str, db: Session) -> User:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
+def verified_username(authorization: str) -> Optional[str]:
+    """Token subject of a valid Bearer header, else None (treated as anonymous)."""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    payload = decode_access_token(authorization.split(" ")[1])
+    return payload.get("sub") if payload else None
+
 @router.post('/chat')
-def assistant_chat(data: ChatRequest):
+def assistant_chat(data: ChatRequest, authorization: str = Header(None)):
     """
     POST /api/chat
     Process user voice/text query via Gemini 3 Flash.
     """
     try:
-        history_json = json.dumps(data.history or [], sort_keys=True, separators=(",", ":"), default=str)
-        cache_key = f"chat:{data.language}:{data.page_context or 'general'}:{hashlib.sha256((data.message + history_json).encode('utf-8')).hexdigest()}"
+        # Recent turns within the token budget; older ones live on as a summary.
+        # Only a verified identity selects a stored summary — never data.user_id.
+        compact = history_manager.compact(data.history, verified_username(authorization))
+        history_json = json.dumps(compact.window, sort_keys=True, separators=(",", ":"), default=str)
+        # The summary personalises the answer, so it is part of the key (empty for anonymous callers)
+        memory_hash = hashlib.sha256((compact.memory or "").encode("utf-8")).hexdigest()
+        cache_key = f"chat:{data.language}:{data.page_context or 'general'}:{hashlib.sha256((data.message + history_json + memory_hash).encode('utf-8')).hexdigest()}"
         cached_response = chat_response_cache.get(cache_key)
         if cached_response is not None:
             print(f"[CHAT CACHE HIT] language={data.language} page_context={data.page_context or 'general'} text_hash={cache_key[-8:]}")
             return {"response": cached_response, "language": data.language}
 
+        # Same intent asked with different wording (or a different history). Answers
+        # built on a user's summary are personal, so they never use the shared layer.
+        semantic_hit = None
+        if not compact.memory:
+            semantic_hit = semantic_chat_cache.get(data.message, data.language, data.page_context or "general", compact.window)
+        if semantic_hit is not None:
+            cached_response, similarity = semantic_hit
+            print(f"[CHAT SEMANTIC CACHE HIT] language={data.language} page_context={data.page_context or 'general'} similarity={similarity:.3f}")
+            return {"response": cached_response, "language": data.language}
+
         response = gemini_service.generate_response(
             message=data.message,
             context=data.page_context or "general",
             detected_language=data.language,
-            history=data.history
+            history=compact.window,
+            memory=compact.memory
         )
 
+        if response == NETWORK_ERROR_REPLY:
+            return {"response": response, "language": data.language}
+
         chat_response_cache.set(cache_key, response)
+        if not compact.memory:
+            semantic_chat_cache.set(data.message, data.language, data.page_context or "general", response, compact.window)
         print(f"[CHAT CACHE SET] language={data.language} page_context={data.page_context or 'general'} text_hash={cache_key[-8:]}")
         return {"response": response, "language": data.language}
     except Exception as e:
         print(f"[ASSISTANT CHAT ERROR] {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get('/chat/cache-stats')
+def chat_cache_stats():
+    """Semantic chat cache hit rate, expiries and entries per (language, page_context) scope."""
+    return semantic_chat_cache.get_stats()
+
+@router.get('/chat/history-stats')
+def chat_history_stats():
+    """History compaction: turns dropped, estimated tokens saved, background summaries."""
+    return history_manager.get_stats()
+
 @router.post('/voice/stt')
 async def voice_stt(audio: UploadFile = File(...)):
     """
@@ -93,46 +147,139 @@ async def voice_stt(audio: UploadFile = File(...)):
         print(f"[ASSISTANT STT ERROR] {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def synthesize_tiered(text: str, language: str):
+    """Blocking TTS through the REST tiers: Azure, then Sarvam, then Gemini. None if all fail."""
+    # Tier 1: Primary — Azure Casual Indian Voice for the most natural conversational sound
+    audio_content = casual_voice_engine.speak_natural(text=text, lang_code=language)
+    
+    # Tier 2: Fallback — Sarvam AI (free, Indic-native voices)
+    if not audio_content:
+        print("[TTS FALLBACK TRIGGERED] Azure TTS failed, falling back to Sarvam AI bulbul:v3...")
+        audio_content = tts_fallback_service.generate_speech(text=text, language=language)
+        
+    # Tier 3: Last Resort Fallback — Gemini multimodal TTS
+    if not audio_content:
+        print("[TTS LAST FALLBACK TRIGGERED] Both Azure and Sarvam failed, falling back to Gemini TTS...")
+        audio_content = gemini_service.generate_tts(text=text, language=language)
+    return audio_content
+
 @router.post('/voice/tts')
-def voice_tts(data: TTSRequest):
+def voice_tts(data: TTSRequest, request: Request):
     """
     POST /api/voice/tts
     Convert text response to speech.
     Primary: Azure Cognitive Neural Casual TTS, then Sarvam AI bulbul:v3, then Gemini 3.1 Flash TTS.
+    Output format is negotiated (`format` field, then Accept header, default WAV).
+    With `stream: true` the response is a WAV streamed as it is synthesized.
     """
     try:
-        cache_key = f"tts:{data.language}:{hashlib.sha256(data.text.encode('utf-8')).hexdigest()}"
-        cached_audio = tts_audio_cache.get(cache_key)
-        if cached_audio is not None:
-            print(f"[TTS CACHE HIT] language={data.language} text_hash={cache_key[-8:]}")
-            return Response(content=cached_audio, media_type="audio/wav")
-
-        # Tier 1: Primary — Azure Casual Indian Voice for the most natural conversational sound
-        audio_content = casual_voice_engine.speak_natural(text=data.text, lang_code=data.language)
-        
-        # Tier 2: Fallback — Sarvam AI (free, Indic-native voices)
-        if not audio_content:
-            print("[TTS FALLBACK TRIGGERED] Azure TTS failed, falling back to Sarvam AI bulbul:v3...")
-            audio_content = tts_fallback_service.generate_speech(text=data.text, language=data.language)
-            
-        # Tier 3: Last Resort Fallback — Gemini multimodal TTS
-        if not audio_content:
-            print("[TTS LAST FALLBACK TRIGGERED] Both Azure and Sarvam failed, falling back to Gemini TTS...")
-            audio_content = gemini_service.generate_tts(text=data.text, language=data.language)
+        audio_format = "wav" if data.stream else negotiate_format(data.format, request.headers.get("accept"), default="wav")
+        cache_key = audio_key(data.text, data.language, data.voice_preference, audio_format)
+        cached = audio_store.lookup(cache_key)
+        if cached is not None:
+            cached_path, cached_format = cached
+            print(f"[TTS CACHE HIT] language={data.language} format={cached_format} key={cache_key[:8]}")
+            # Served from disk by the server (sendfile / pathsend where supported), not via the heap
+            return FileResponse(cached_path, media_type=mime_for(cached_format), headers={"X-Audio-Format": cached_format})
+
+        if data.stream:
+            return StreamingResponse(
+                stream_tts_wav(data.text, data.language, cache_key),
+                media_type="audio/wav",
+                headers={"X-Audio-Format": "wav", "X-Audio-Streaming": "1"},
+            )
+
+        audio_content = synthesize_tiered(data.text, data.language)
 
         if not audio_content:
             raise HTTPException(status_code=500, detail="TTS generation failed across all engines (Azure, Sarvam, and Gemini).")
 
-        tts_audio_cache.set(cache_key, audio_content)
-        print(f"[TTS CACHE SET] language={data.language} text_hash={cache_key[-8:]}")
-            
+        # Encode once on the codec pool and store the encoded form, not the WAV
+        audio_content, actual_format = encode_in_pool(audio_content, audio_format)
+        audio_store.put(cache_key, audio_content, actual_format)
+        print(f"[TTS CACHE SET] language={data.language} format={actual_format} key={cache_key[:8]}")
+
         # Return audio as binary stream
-        return Response(content=audio_content, media_type="audio/wav")
+        return Response(content=audio_content, media_type=mime_for(actual_format), headers={"X-Audio-Format": actual_format})
         
     except Exception as e:
         print(f"[ASSISTANT TTS ERROR] {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def stream_tts_wav(text: str, language: str, cache_key: str):
+    """Streaming-WAV body: header first (rate from the winning provider), then PCM frames as they arrive."""
+    stream = TTSStream(text, language)
+    pcm = bytearray()
+    async for frame in stream:
+        if not pcm:
+            yield wav_stream_header(stream.sample_rate)
+        pcm.extend(frame)
+        yield frame
+    print(f"[TTS STREAM] provider={stream.provider} ttfa={stream.ttfa_ms or 0:.0f}ms total={stream.total_ms or 0:.0f}ms bytes={stream.bytes}")
+    if pcm:
+        await asyncio.to_thread(audio_store.put, cache_key, pcm_to_wav(bytes(pcm), stream.sample_rate), "wav")
+
+
+@router.post('/voice/advisory-tts')
+def voice_advisory_tts(data: AdvisoryTTSRequest, request: Request):
+    """
+    POST /api/voice/advisory-tts
+    Speak a templated advisory (the `speech` field of NDVI / ML / risk advisories).
+    Spliced from pre-synthesized phrase clips plus the dynamic values; falls
+    back to regular TTS of the rendered (translated) text.
+    """
+    if data.template not in ADVISORY_TEMPLATES:
+        raise HTTPException(status_code=404, detail=f"Unknown advisory template: {data.template}")
+    try:
+        audio_format = negotiate_format(data.format, request.headers.get("accept"), default="wav")
+        spoken = json.dumps([data.template, data.params], sort_keys=True)
+        cache_key = audio_key(spoken, data.language, "advisory", audio_format)
+        cached = audio_store.lookup(cache_key)
+        if cached is not None:
+            cached_path, cached_format = cached
+            return FileResponse(cached_path, media_type=mime_for(cached_format), headers={"X-Audio-Format": cached_format})
+
+        audio_content = speak_template(data.template, data.language, data.params)
+        if not audio_content:
+            print(f"[ADVISORY TTS] Phrase splice unavailable for {data.template}, using regular TTS...")
+            text = render(data.template, **data.params)
+            if not data.language.startswith("en"):
+                from app.services.translator import translator
+                text = translator.translate_from_english(text, data.language)
+            audio_content = synthesize_tiered(text, data.language)
+        if not audio_content:
+            raise HTTPException(status_code=500, detail="Advisory TTS generation failed across all engines.")
+
+        audio_content, actual_format = encode_in_pool(audio_content, audio_format)
+        audio_store.put(cache_key, audio_content, actual_format)
+        return Response(content=audio_content, media_type=mime_for(actual_format), headers={"X-Audio-Format": actual_format})
+
+    except HTTPException:
+        raise
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Bad params for {data.template}: {e}")
+    except Exception as e:
+        print(f"[ADVISORY TTS ERROR] {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get('/voice/audio-stats')
+def voice_audio_stats():
+    """Bytes saved by compressed TTS output, per format, Azure synthesizer pool, streaming TTFA, ordered-delivery, audio store and phrase-splice metrics."""
+    stats = get_codec_stats()
+    # Don't construct the engine just to report on it
+    stats["azure_pools"] = casual_voice_engine.get_pool_stats() if casual_voice_engine.is_loaded else {}
+    stats["streaming"] = get_streaming_stats()
+    stats["store"] = audio_store.get_stats()
+    stats["phrases"] = get_phrase_stats()
+    stats["delivery"] = get_delivery_stats()
+    return stats
+
+@router.get('/voice/tts-router')
+def voice_tts_router_stats():
+    """Per-language TTS provider EWMA latency, p90, error rate, cooldowns and hedging counts."""
+    return tts_router.get_stats()
+
 @router.post('/user/memory')
 def user_memory(data: MemoryRequest):
     """
@@ -224,133 +371,117 @@ def post_user_profile(data: ProfileUpdateRequest, authorization: str = Header(No
     )
 
 
-# ──────────── TTS Response Cache (LRU-style, capped) ────────────
-_tts_cache: dict[str, bytes] = {}
-_TTS_CACHE_MAX = 100
-
-
-async def race_tts(text: str, language: str, preferred_provider: str = None):
+async def race_tts(text: str, language: str, preferred_provider: str = None, audio_format: str = "wav"):
     """
-    Race Gemini and Sarvam TTS concurrently.
-    Returns (audio_bytes, provider_name) tuple.
-    If preferred_provider is set, uses only that provider (no race) for voice consistency.
-    Results are cached for repeated phrases.
+    Synthesize one sentence through the adaptive provider router: the
+    predicted-fastest provider first, hedged to the runner-up after its p90
+    latency (see tts_router). Returns (audio_bytes, provider_name,
+    actual_format); audio is encoded to `audio_format` on the codec pool.
+    If preferred_provider is set it is used alone while it works, for voice consistency.
+    Results are stored (encoded) in the disk audio store for repeated phrases.
     """
-    cache_key = hashlib.md5(f"{text}:{language}".encode()).hexdigest()
-    if cache_key in _tts_cache:
+    cache_key = audio_key(text, language, None, audio_format)
+    cached = await asyncio.to_thread(audio_store.get, cache_key)
+    if cached is not None:
         print(f"[TTS CACHE HIT] Serving cached audio for: '{text[:40]}...'")
-        return _tts_cache[cache_key], "cache"
-
-    # If a provider already won for this response, stick with it (consistent voice)
-    if preferred_provider == "gemini":
-        try:
-            audio = await asyncio.to_thread(gemini_service.generate_tts, text, language)
-            if audio:
-                if len(text) < 300:
-                    if len(_tts_cache) >= _TTS_CACHE_MAX:
-                        del _tts_cache[next(iter(_tts_cache))]
-                    _tts_cache[cache_key] = audio
-                return audio, "gemini"
-        except Exception as e:
-            print(f"[TTS PREFERRED ERROR] Gemini failed: {e}")
-        return None, None
-
-    if preferred_provider == "sarvam":
-        try:
-            audio = await asyncio.to_thread(tts_fallback_service.generate_speech, text, language)
-            if audio:
-                if len(text) < 300:
-                    if len(_tts_cache) >= _TTS_CACHE_MAX:
-                        del _tts_cache[next(iter(_tts_cache))]
-                    _tts_cache[cache_key] = audio
-                return audio, "sarvam"
-        except Exception as e:
-            print(f"[TTS PREFERRED ERROR] Sarvam failed: {e}")
-        return None, None
-
-    if preferred_provider == "azure":
-        try:
-            audio = await asyncio.to_thread(casual_voice_engine.speak_natural, text, language)
-            if audio:
-                if len(text) < 300:
-                    if len(_tts_cache) >= _TTS_CACHE_MAX:
-                        del _tts_cache[next(iter(_tts_cache))]
-                    _tts_cache[cache_key] = audio
-                return audio, "azure"
-        except Exception as e:
-            print(f"[TTS PREFERRED ERROR] Azure failed: {e}")
-        return None, None
-
-    # No preference yet — race both providers to find the fastest one
-    gemini_task = asyncio.create_task(
-        asyncio.to_thread(gemini_service.generate_tts, text, language)
-    )
-    tasks = [gemini_task]
-    sarvam_task = None
+        audio, fmt = cached
+        return audio, "cache", fmt
 
+    calls = {
+        "gemini": lambda: asyncio.to_thread(gemini_service.generate_tts, text, language),
+        "azure": lambda: casual_voice_engine.speak_natural_async(text, language),
+    }
     if tts_fallback_service.sarvam_enabled:
-        sarvam_task = asyncio.create_task(
-            asyncio.to_thread(tts_fallback_service.generate_speech, text, language)
-        )
-        tasks.append(sarvam_task)
+        calls["sarvam"] = lambda: asyncio.to_thread(tts_fallback_service.generate_speech, text, language)
 
-    audio_content = None
-    winning_provider = None
+    audio_content, provider = await tts_router.run(language, calls, preferred=preferred_provider)
+    if preferred_provider and provider and provider != preferred_provider:
+        print(f"[TTS PREFERRED ERROR] {preferred_provider} failed, this chunk used '{provider}'")
+    if not audio_content:
+        return None, None, audio_format
 
-    if len(tasks) == 1:
-        try:
-            audio_content = await gemini_task
-            if audio_content:
-                winning_provider = "gemini"
-        except Exception as e:
-            print(f"[RACE TTS ERROR] Gemini-only: {e}")
-    else:
-        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    encoded, fmt = await encode_async(audio_content, audio_format)
+    await asyncio.to_thread(audio_store.put, cache_key, encoded, fmt)
+    return encoded, provider, fmt
 
-        for task in done:
-            try:
-                result = task.result()
-                if result:
-                    audio_content = result
-                    winning_provider = "gemini" if task is gemini_task else "sarvam"
-                    break
-            except Exception:
-                pass
-
-        if audio_content:
-            for task in pending:
-                task.cancel()
-        else:
-            for task in pending:
-                try:
-                    result = await task
-                    if result:
-                        audio_content = result
-                        winning_provider = "gemini" if task is gemini_task else "sarvam"
-                except Exception:
-                    pass
 
-    # Fallback to Azure if both Gemini and Sarvam failed during race
-    if not audio_content:
-        print("[RACE TTS FALLBACK] Both Gemini and Sarvam failed. Attempting Azure TTS...")
-        try:
-            audio_content = await asyncio.to_thread(casual_voice_engine.speak_natural, text, language)
+async def stream_sentence(websocket: WebSocket, seq: int, sentence: str, language: str, ws_lock: asyncio.Lock, provider_state: dict, binary_audio: bool):
+    """
+    Stream one sentence's audio as PCM frames while it is synthesized:
+    `audio_stream_start` (rate, provider), frames (FRAME_TTS_AUDIO "pcm"
+    binary frames, or base64 `audio_frame` JSON), then `audio_stream_end`.
+    """
+    stream = TTSStream(sentence, language, preferred=provider_state.get("preferred"),
+                       providers=tts_router.rank(language, ["azure", "sarvam", "gemini"]))
+    async for frame in stream:
+        async with ws_lock:
+            if stream.bytes == len(frame):
+                await websocket.send_json({
+                    "type": "audio_stream_start",
+                    "seq": seq,
+                    "format": "pcm",
+                    "sample_rate": stream.sample_rate,
+                    "provider": stream.provider,
+                    "text": sentence
+                })
+            if binary_audio:
+                await websocket.send_bytes(pack_frame(FRAME_TTS_AUDIO, seq, frame, "pcm"))
+            else:
+                await websocket.send_json({"type": "audio_frame", "seq": seq, "audio": base64.b64encode(frame).decode("utf-8")})
+
+    if stream.provider and not provider_state.get("preferred"):
+        provider_state["preferred"] = stream.provider
+        print(f"[TTS PROVIDER LOCKED] Using '{stream.provider}' for all remaining chunks in this response.")
+    async with ws_lock:
+        await websocket.send_json({
+            "type": "audio_stream_end",
+            "seq": seq,
+            "provider": stream.provider,
+            "bytes": stream.bytes,
+            "ttfa_ms": round(stream.ttfa_ms, 1) if stream.ttfa_ms is not None else None,
+            "text": sentence
+        })
+
+
+async def send_audio_chunk(websocket: WebSocket, ws_lock: asyncio.Lock, binary_audio: bool, seq: int, sentence: str, audio_content, actual_format, skipped: bool = False):
+    """
+    One sentence's `audio_chunk`. In binary mode the audio goes as a
+    FRAME_TTS_AUDIO frame right after a small JSON header (no base64);
+    otherwise legacy base64 JSON. `skipped` marks a chunk whose audio missed
+    its delivery deadline (text only).
+    """
+    async with ws_lock:
+        if binary_audio:
+            await websocket.send_json({
+                "type": "audio_chunk",
+                "binary": True,
+                "bytes": len(audio_content) if audio_content else 0,
+                "format": actual_format,
+                "seq": seq,
+                "text": sentence,
+                "skipped": skipped
+            })
             if audio_content:
-                winning_provider = "azure"
-        except Exception as e:
-            print(f"[RACE TTS FALLBACK ERROR] Azure failed: {e}")
-
-    # Cache short phrases
-    if audio_content and len(text) < 300:
-        if len(_tts_cache) >= _TTS_CACHE_MAX:
-            del _tts_cache[next(iter(_tts_cache))]
-        _tts_cache[cache_key] = audio_content
+                await websocket.send_bytes(pack_frame(FRAME_TTS_AUDIO, seq, audio_content, actual_format))
+            return
 
-    return audio_content, winning_provider
+        await websocket.send_json({
+            "type": "audio_chunk",
+            "audio": base64.b64encode(audio_content).decode("utf-8") if audio_content else "",
+            "format": actual_format,
+            "seq": seq,
+            "text": sentence,
+            "skipped": skipped
+        })
 
 
-async def tts_worker(websocket: WebSocket, queue: asyncio.Queue, language: str, ws_lock: asyncio.Lock, provider_state: dict):
-    """Parallel TTS worker: generates speech with consistent voice per response."""
+async def tts_worker(websocket: WebSocket, queue: asyncio.Queue, language: str, ws_lock: asyncio.Lock, provider_state: dict, audio_format: str = "wav", binary_audio: bool = False, stream_audio: bool = False, delivery: OrderedAudioDelivery = None):
+    """
+    Parallel TTS worker: generates speech with consistent voice per response.
+    Clips are handed to `delivery`, which sends them in order; workers stay
+    within its look-ahead window and skip sentences whose deadline passed.
+    With `stream_audio` each sentence is streamed frame by frame instead.
+    """
     while True:
         item = await queue.get()
         if item is None:
@@ -358,76 +489,39 @@ async def tts_worker(websocket: WebSocket, queue: asyncio.Queue, language: str,
             break
         seq, sentence = item
         try:
+            if stream_audio:
+                await stream_sentence(websocket, seq, sentence, language, ws_lock, provider_state, binary_audio)
+                continue
+
+            if not await delivery.slot(seq):
+                continue  # already skipped for missing its deadline
+
             print(f"[WS TTS Worker] Generating speech for seq={seq}: '{sentence[:50]}'")
-            audio_content, provider = await race_tts(sentence, language, provider_state.get("preferred"))
+            audio_content, provider, actual_format = await race_tts(sentence, language, provider_state.get("preferred"), audio_format)
 
             # Lock in the winning provider for voice consistency
             if audio_content and provider and not provider_state.get("preferred"):
                 provider_state["preferred"] = provider
                 print(f"[TTS PROVIDER LOCKED] Using '{provider}' for all remaining chunks in this response.")
 
-            audio_b64 = base64.b64encode(audio_content).decode("utf-8") if audio_content else ""
-            async with ws_lock:
-                await websocket.send_json({
-                    "type": "audio_chunk",
-                    "audio": audio_b64,
-                    "seq": seq,
-                    "text": sentence
-                })
+            delivery.complete(seq, audio_content, actual_format)
         except Exception as tts_err:
             print(f"[WS TTS WORKER ERROR] seq={seq}: {tts_err}")
-            try:
-                async with ws_lock:
-                    await websocket.send_json({
-                        "type": "audio_chunk",
-                        "audio": "",
-                        "seq": seq,
-                        "text": sentence
-                    })
-            except Exception:
-                pass
+            if stream_audio:
+                try:
+                    async with ws_lock:
+                        await websocket.send_json({"type": "audio_stream_end", "seq": seq, "bytes": 0, "text": sentence})
+                except Exception:
+                    pass
+            else:
+                delivery.complete(seq, None, audio_format)
         finally:
             queue.task_done()
 
 
-def extract_tts_chunks(buffer: str, is_final: bool = False):
-    """
-    Extracts complete clauses/sentences from buffer.
-    Returns (chunks_list, remaining_buffer).
-    """
-    chunks = []
-    strong_delims = {'.', '!', '?', '।', '\n', '\r'}
-    weak_delims = {',', ';', ':'}
-    MIN_CHUNK_LENGTH = 10
-    
-    current_idx = 0
-    start_idx = 0
-    n = len(buffer)
-    
-    while current_idx < n:
-        char = buffer[current_idx]
-        if char in strong_delims:
-            chunk = buffer[start_idx:current_idx + 1].strip()
-            if chunk:
-                chunks.append(chunk)
-            start_idx = current_idx + 1
-        elif char in weak_delims:
-            chunk_candidate = buffer[start_idx:current_idx + 1].strip()
-            if len(chunk_candidate) >= MIN_CHUNK_LENGTH:
-                chunks.append(chunk_candidate)
-                start_idx = current_idx + 1
-        current_idx += 1
-        
-    remaining = buffer[start_idx:]
-    if is_final and remaining.strip():
-        chunks.append(remaining.strip())
-        remaining = ""
-        
-    return chunks, remaining
-
-
-async def handle_chat_stream(websocket: WebSocket, message: str, language: str, history: list, page_context: str, tts_enabled: bool):
+async def handle_chat_stream(websocket: WebSocket, message: str, language: str, history: list, page_context: str, tts_enabled: bool, audio_format: str = "wav", binary_audio: bool = False, stream_audio: bool = False, user_id: str = None, session_id: str = None):
     accumulated_text = ""
+    compact = await asyncio.to_thread(history_manager.compact, history, user_id, session_id)
     await websocket.send_json({"type": "stream_start"})
     
     NUM_TTS_WORKERS = 3
@@ -435,10 +529,17 @@ async def handle_chat_stream(websocket: WebSocket, message: str, language: str,
     ws_lock = asyncio.Lock()
     provider_state = {"preferred": None}  # Shared: locks voice to first winning provider
     worker_tasks = []
+    delivery = None
     
     if tts_enabled:
-        worker_tasks = [
-            asyncio.create_task(tts_worker(websocket, tts_queue, language, ws_lock, provider_state))
+        if not stream_audio:
+            # Workers synthesize concurrently; the delivery task sends clips strictly in seq order
+            async def send(seq, sentence, audio_content, actual_format, skipped):
+                await send_audio_chunk(websocket, ws_lock, binary_audio, seq, sentence, audio_content, actual_format, skipped)
+            delivery = OrderedAudioDelivery(send)
+            worker_tasks.append(asyncio.create_task(delivery.run()))
+        worker_tasks += [
+            asyncio.create_task(tts_worker(websocket, tts_queue, language, ws_lock, provider_state, audio_format, binary_audio, stream_audio, delivery))
             for _ in range(NUM_TTS_WORKERS)
         ]
     
@@ -446,10 +547,13 @@ async def handle_chat_stream(websocket: WebSocket, message: str, language: str,
         message=message,
         context=page_context,
         detected_language=language,
-        history=history
+        history=compact.window,
+        memory=compact.memory
     )
     
     sentence_buffer = ""
+    # Early first chunk at a word boundary, then growing chunks (fewer synthesis calls)
+    chunker = AdaptiveTTSChunker() if tts_enabled and TTS_ADAPTIVE_CHUNKING else None
     tts_seq = 0
     
     while True:
@@ -465,9 +569,14 @@ async def handle_chat_stream(websocket: WebSocket, message: str, language: str,
                 })
             
             if tts_enabled:
-                sentence_buffer += chunk
-                chunks, sentence_buffer = extract_tts_chunks(sentence_buffer, is_final=False)
+                if chunker:
+                    chunks = chunker.feed(chunk)
+                else:
+                    sentence_buffer += chunk
+                    chunks, sentence_buffer = extract_tts_chunks(sentence_buffer, is_final=False)
                 for tts_chunk in chunks:
+                    if delivery:
+                        await delivery.add(tts_seq, tts_chunk)
                     await tts_queue.put((tts_seq, tts_chunk))
                     tts_seq += 1
         except StopIteration:
@@ -478,15 +587,27 @@ async def handle_chat_stream(websocket: WebSocket, message: str, language: str,
             
     if tts_enabled:
         # Flush remaining buffer
-        chunks, sentence_buffer = extract_tts_chunks(sentence_buffer, is_final=True)
+        if chunker:
+            chunks = chunker.flush()
+        else:
+            chunks, sentence_buffer = extract_tts_chunks(sentence_buffer, is_final=True)
         for tts_chunk in chunks:
+            if delivery:
+                await delivery.add(tts_seq, tts_chunk)
             await tts_queue.put((tts_seq, tts_chunk))
             tts_seq += 1
+        if delivery:
+            delivery.close(tts_seq)
         # Send poison pills to terminate all workers
         for _ in range(NUM_TTS_WORKERS):
             await tts_queue.put(None)
-        # Wait for all workers to finish
+        # Wait for all workers (and the in-order sender) to finish
         await asyncio.gather(*worker_tasks)
+        if delivery:
+            summary = delivery.summary()
+            record_delivery(summary)
+            print(f"[TTS DELIVERY] chunks={summary['chunks']} ttfa={summary['ttfa_ms']}ms "
+                  f"gap_free={summary['gap_free_ratio']} skipped={summary['skipped']} max_buffered={summary['max_buffered']}")
         
     await websocket.send_json({
         "type": "text_complete",
@@ -500,10 +621,40 @@ async def assistant_websocket(websocket: WebSocket):
     
     token = websocket.query_params.get("token")
     user = None
+    # Server-issued id for this connection: anonymous history summaries are kept under it
+    session_id = uuid.uuid4().hex
+
+    # Audio transport: "binary" frames (see ws_audio_protocol) or legacy base64 JSON
+    protocol = PROTOCOL_BINARY if websocket.query_params.get("protocol") == PROTOCOL_BINARY else PROTOCOL_JSON
+    session_language = "en"
     
-    # In-memory buffer to accumulate non-cumulative incoming audio chunks
-    audio_buffer = bytearray()
-    chunk_counter = 0  # For debouncing real-time STT
+    # Accumulates the non-cumulative mic chunks of the current utterance and
+    # transcribes each VAD segment once (see streaming_stt)
+    stt = IncrementalTranscriber()
+
+    async def on_audio_chunk(chunk, language: str):
+        """Append a mic chunk (bytes or zero-copy memoryview) and run the debounced preview STT."""
+        stt.add_chunk(chunk)
+
+        if STT_INCREMENTAL:
+            if not stt.should_preview():
+                return
+            stt_result = await stt.preview()
+        else:
+            # Legacy: re-transcribe the whole buffer on every 3rd chunk
+            if stt.chunks % 3:
+                return
+            stt_result = await asyncio.to_thread(
+                groq_service.transcribe_audio, bytes(stt.encoded), "voice.webm"
+            )
+        transcript = stt_result.get("transcript", "")
+        detected_lang = stt_result.get("language_detected", language)
+
+        await websocket.send_json({
+            "type": "transcript_chunk",
+            "text": transcript,
+            "language_detected": detected_lang
+        })
     
     try:
         if token:
@@ -518,41 +669,50 @@ async def assistant_websocket(websocket: WebSocket):
                 print(f"[WS AUTH ERROR] {e}")
                 
         while True:
-            data = await websocket.receive_text()
-            payload = json.loads(data)
+            message_frame = await websocket.receive()
+            if message_frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message_frame.get("code", 1000))
+
+            # Binary audio frame: header + raw mic audio, no JSON / base64
+            frame_bytes = message_frame.get("bytes")
+            if frame_bytes is not None:
+                try:
+                    frame_type, _, _, audio_view = unpack_frame(frame_bytes)
+                except FrameError as e:
+                    await websocket.send_json({"type": "error", "message": str(e)})
+                    continue
+                if frame_type == FRAME_MIC_AUDIO and len(audio_view):
+                    await on_audio_chunk(audio_view, session_language)
+                continue
+
+            payload = json.loads(message_frame.get("text") or "{}")
             msg_type = payload.get("type")
+            binary_audio = protocol == PROTOCOL_BINARY
             
-            if msg_type == "text":
+            if msg_type == "hello":
+                if payload.get("protocol") in (PROTOCOL_BINARY, PROTOCOL_JSON):
+                    protocol = payload["protocol"]
+                session_language = payload.get("language", session_language)
+                await websocket.send_json({"type": "hello", "protocol": protocol})
+
+            elif msg_type == "text":
                 message = payload.get("message", "")
                 language = payload.get("language", "en")
                 history = payload.get("history", [])
                 page_context = payload.get("page_context", "general")
                 tts_enabled = payload.get("tts_enabled", True)
+                # Existing clients get WAV; new clients opt into "opus" / "mp3"
+                audio_format = negotiate_format(payload.get("audio_format"), default="wav")
                 
-                await handle_chat_stream(websocket, message, language, history, page_context, tts_enabled)
+                await handle_chat_stream(websocket, message, language, history, page_context, tts_enabled, audio_format, binary_audio, bool(payload.get("stream_audio")), user.username if user else None, session_id)
                 
             elif msg_type == "audio_chunk":
                 audio_b64 = payload.get("audio", "")
                 language = payload.get("language", "en")
+                session_language = language
                 
                 if audio_b64:
-                    chunk_bytes = base64.b64decode(audio_b64)
-                    audio_buffer.extend(chunk_bytes)
-                    chunk_counter += 1
-                    
-                    # Debounce: only transcribe every 3rd chunk for real-time preview
-                    if chunk_counter % 3 == 0:
-                        stt_result = await asyncio.to_thread(
-                            groq_service.transcribe_audio, bytes(audio_buffer), "voice.webm"
-                        )
-                        transcript = stt_result.get("transcript", "")
-                        detected_lang = stt_result.get("language_detected", language)
-                        
-                        await websocket.send_json({
-                            "type": "transcript_chunk",
-                            "text": transcript,
-                            "language_detected": detected_lang
-                        })
+                    await on_audio_chunk(base64.b64decode(audio_b64), language)
                     
             elif msg_type == "audio_end":
                 audio_b64 = payload.get("audio", "")
@@ -562,20 +722,20 @@ async def assistant_websocket(websocket: WebSocket):
                 tts_enabled = payload.get("tts_enabled", True)
                 
                 if audio_b64:
-                    chunk_bytes = base64.b64decode(audio_b64)
-                    audio_buffer.extend(chunk_bytes)
+                    stt.add_chunk(base64.b64decode(audio_b64))
                 
-                # Snapshot buffer before clearing (so STT gets the full audio)
-                audio_buffer_snapshot = bytes(audio_buffer)
-                
-                # Clear audio buffer and chunk counter for the next recording session
-                audio_buffer.clear()
-                chunk_counter = 0
-                    
-                # Transcribe final accumulated buffer (non-blocking)
-                stt_result = await asyncio.to_thread(
-                    groq_service.transcribe_audio, audio_buffer_snapshot, "voice.webm"
-                )
+                try:
+                    if STT_INCREMENTAL:
+                        # Only the trailing segment (and anything a preview missed) goes to ASR
+                        stt_result = await stt.finalize()
+                        print(f"[WS STT] {stt_result['segments']} segments, {stt_result['stats']}")
+                    else:
+                        stt_result = await asyncio.to_thread(
+                            groq_service.transcribe_audio, bytes(stt.encoded), "voice.webm"
+                        )
+                finally:
+                    # Fresh state for the next recording session
+                    stt.reset()
                 transcript = stt_result.get("transcript", "")
                 detected_lang = stt_result.get("language_detected", language)
                 
@@ -593,10 +753,10 @@ async def assistant_websocket(websocket: WebSocket):
                     "language_detected": detected_lang
                 })
                 
-                await handle_chat_stream(websocket, transcript, detected_lang, history, page_context, tts_enabled)
+                audio_format = negotiate_format(payload.get("audio_format"), default="wav")
+                await handle_chat_stream(websocket, transcript, detected_lang, history, page_context, tts_enabled, audio_format, binary_audio, bool(payload.get("stream_audio")), user.username if user else None, session_id)
                     
     except WebSocketDisconnect:
         print("[WS CLIENT DISCONNECTED]")
     except Exception as e:
         print(f"[WS ERROR] {e}")
-
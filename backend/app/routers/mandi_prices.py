@@ -2,8 +2,6 @@ from fastapi import APIRouter, Query, HTTPException, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from app.database import get_mandi_db
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 import asyncio
 
@@ -146,6 +144,7 @@ async def get_mandi_forecast(
     except Exception as e:
         print(f"[Executor] Mandi linear forecast failed in child process: {e}")
         # Local fallback in case pool executor fails
+        import numpy as np
         forecast_data = []
         x_days = np.arange(len(prices))
         y_prices = np.array(prices)
@@ -1,22 +1,16 @@
 import os
-import tempfile
-# Force transformers to use a shallow, explicit directory (cross-platform temporary directory)
-temp_cache = os.path.join(tempfile.gettempdir(), "hf_cache")
-os.environ["HF_HOME"] = temp_cache
-os.environ["TRANSFORMERS_CACHE"] = temp_cache
-
-
-import io
 import logging
 import re
 import json
 import asyncio
-import gc
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request, Header
 from typing import Optional, Dict, Any
 
 from app.services.gemini_service import gemini_service
 from app.services.vision_diagnostic_service import vision_diagnostic_service
+from app.services.classifier_service import get_classifier_status, get_inference_batcher
+from app.services.diagnosis_cache import diagnosis_cache, variant_key
+from app.auth import require_admin
 
 logger = logging.getLogger("eventhorizon.plant_scanner")
 router = APIRouter()
@@ -25,45 +19,23 @@ async def predict_disease_with_pretrained(image_bytes: bytes, proc, mod) -> Dict
     try:
         if proc is None or mod is None:
             return {"is_valid": False, "error": "Classifier model is not initialized."}
-            
-        def run_inference():
-            from PIL import Image
-            import torch
-            
-            image = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-            inputs = proc(images=image, return_tensors="pt")
-            
-            with torch.no_grad():
-                outputs = mod(**inputs)
-                logits = outputs.logits
-                
-            probabilities = torch.nn.functional.softmax(logits, dim=-1)
-            top_class_idx = torch.argmax(probabilities, dim=-1).item()
-            confidence_score = probabilities[0][top_class_idx].item()
-            
-            # CRITICAL GUARDRAIL: If the model is guessing blindly
-            if confidence_score < 0.70:
-                del inputs
-                if 'outputs' in locals(): del outputs
-                gc.collect()
-                return {
-                    "is_valid": False,
-                    "error": "Cannot confidently recognize a supported plant leaf. Please take a clearer, close-up photo of an Apple, Tomato, or Corn leaf."
-                }
-                
-            predicted_label = mod.config.id2label[top_class_idx]
-            
-            res = {
-                "is_valid": True,
-                "disease_name": predicted_label.replace("___", " ").replace("_", " "),
-                "confidence": round(confidence_score * 100, 2)
+
+        # Concurrent requests are coalesced into one batched forward pass
+        top_class_idx, confidence_score = await get_inference_batcher(proc, mod).classify(image_bytes)
+
+        # CRITICAL GUARDRAIL: If the model is guessing blindly
+        if confidence_score < 0.70:
+            return {
+                "is_valid": False,
+                "error": "Cannot confidently recognize a supported plant leaf. Please take a clearer, close-up photo of an Apple, Tomato, or Corn leaf."
             }
-            del inputs
-            if 'outputs' in locals(): del outputs
-            gc.collect()
-            return res
-            
-        return await asyncio.to_thread(run_inference)
+
+        predicted_label = mod.config.id2label[top_class_idx]
+        return {
+            "is_valid": True,
+            "disease_name": predicted_label.replace("___", " ").replace("_", " "),
+            "confidence": round(confidence_score * 100, 2)
+        }
     except Exception as e:
         logger.error(f"Prediction failed: {e}")
         return {"is_valid": False, "error": f"Internal image processing failed: {str(e)}"}
@@ -159,6 +131,12 @@ def fetch_market_links(search_query: str):
         logger.warning(f"Serper API search failed: {e}")
         return []
 
+@router.get("/classifier/status")
+async def classifier_status(authorization: Optional[str] = Header(None)):
+    """Share mode, load-time RSS before/after and current memory for this worker (admins only)."""
+    require_admin(authorization)
+    return get_classifier_status()
+
 @router.post("/analyze-plant")
 async def analyze_plant(
     request: Request, 
@@ -169,7 +147,14 @@ async def analyze_plant(
     initial_remedy: Optional[str] = Form(None)
 ):
     image_bytes = await file.read()
-    
+
+    # Re-uploads of the same / near-identical photo return the cached analysis
+    fingerprint = await diagnosis_cache.fingerprint(image_bytes)
+    cache_variant = variant_key(language, plant_name, issue_detected, initial_remedy)
+    cached, _ = diagnosis_cache.lookup("analyze-plant", fingerprint, cache_variant)
+    if cached is not None:
+        return cached
+
     proc = getattr(request.app.state, "classifier_processor", None)
     mod = getattr(request.app.state, "classifier_model", None)
     
@@ -186,8 +171,6 @@ async def analyze_plant(
         disease = f"{plant_name} {issue_detected}"
         confidence = 95.0
     else:
-        del image_bytes
-        gc.collect()
         return {"success": False, "message": classification.get("error")}
         
     
@@ -204,9 +187,7 @@ async def analyze_plant(
                 "remedy": ai_analysis.get("remedy_steps"),
                 "buy_links": [] # No products needed for healthy crops
             }
-            del image_bytes
-            if 'classification' in locals(): del classification
-            gc.collect()
+            diagnosis_cache.store("analyze-plant", fingerprint, cache_variant, res)
             return res
 
         ai_analysis = await get_root_cause_and_query(disease, language, initial_remedy)
@@ -223,13 +204,8 @@ async def analyze_plant(
             "remedy": ai_analysis.get("remedy_steps"),
             "buy_links": live_links
         }
-        del image_bytes
-        if 'classification' in locals(): del classification
-        gc.collect()
+        diagnosis_cache.store("analyze-plant", fingerprint, cache_variant, res)
         return res
     except Exception as e:
         logger.error(f"Analysis endpoint failed: {e}")
-        del image_bytes
-        if 'classification' in locals(): del classification
-        gc.collect()
         return {"success": False, "message": f"Analysis failed: {str(e)}"}
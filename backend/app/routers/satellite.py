@@ -14,11 +14,10 @@ from sqlalchemy.orm import Session
 
 from app.database import get_mandi_db
 from app.models import NDVIReading
-from app.services.satellite_ndvi_service import get_ndvi_analysis
-from app.services.sentinel_hub_service import (
-    is_sentinel_hub_configured, fetch_sentinel_ndvi,
+from app.services.sentinel_hub_service import is_sentinel_hub_configured, get_batcher_stats
+from app.services.ndvi_result_service import (
+    get_ndvi_result, get_ndvi_sources, project_analysis, format_location, should_persist, mark_persisted,
 )
-from app.services.india_locations import find_nearest_district, get_coords_for_district
 from app.services.ndvi_ml_service import forecast_ndvi_prophet, generate_ml_advisory
 
 router = APIRouter()
@@ -46,48 +45,10 @@ async def _resolve_coords(
     )
 
 
-def _build_advisory(ndvi: float, trend: dict) -> dict:
-    """Generate advisory from NDVI + trend data."""
-    signal = trend.get("signal", "normal")
-    direction = trend.get("direction", "stable")
-    drops = trend.get("consecutive_drops", 0)
-
-    if signal == "drought_alert":
-        return {
-            "severity": "critical",
-            "title": "⚠️ Early Drought Signal Detected",
-            "message": f"Vegetation index declining for {drops} consecutive periods, now at {ndvi:.2f} (stressed). Increase irrigation immediately.",
-        }
-    elif signal == "persistent_decline":
-        return {
-            "severity": "warning",
-            "title": "📉 Persistent Vegetation Decline",
-            "message": f"NDVI dropped for {drops} consecutive periods. Current: {ndvi:.2f}. Check for pest, nutrient, or water stress.",
-        }
-    elif signal in ("browning", "stress_warning"):
-        return {
-            "severity": "warning",
-            "title": "🍂 Vegetation Stress" if signal == "stress_warning" else "🍂 Browning Detected",
-            "message": f"NDVI declining, now at {ndvi:.2f}. May be seasonal or indicate emerging stress.",
-        }
-    elif signal == "greening":
-        return {
-            "severity": "positive",
-            "title": "🌱 Vegetation Recovery / Growth",
-            "message": f"NDVI improving, current: {ndvi:.2f}. Growth looks healthy.",
-        }
-    else:
-        return {
-            "severity": "info",
-            "title": "✅ Vegetation Stable",
-            "message": f"Current NDVI: {ndvi:.2f}. No significant changes detected.",
-        }
-
-
-def _cache_ndvi_readings(db: Session, result: dict, crop: str):
-    """Save time series readings to local database if not already present."""
+def _cache_ndvi_readings(db: Session, result: dict, crop: str) -> bool:
+    """Save time series readings to local database if not already present. False if the commit failed."""
     if not result or not result.get("time_series"):
-        return
+        return True
     
     lat = result["latitude"]
     lon = result["longitude"]
@@ -129,9 +90,11 @@ def _cache_ndvi_readings(db: Session, result: dict, crop: str):
             
     try:
         db.commit()
+        return True
     except Exception as e:
         db.rollback()
         print(f"[NDVI CACHE] Failed to commit readings to DB: {e}")
+        return False
 
 
 @router.get("/ndvi")
@@ -151,52 +114,23 @@ async def get_ndvi(
     Fetch NDVI vegetation health analysis.
     Auto-selects best available source, and caches historical readings in the database.
     """
+    if source == "sentinel" and not is_sentinel_hub_configured():
+        raise HTTPException(status_code=503, detail="Sentinel Hub not configured. Set SENTINELHUB_CLIENT_ID/SECRET in .env")
+
     async with httpx.AsyncClient(timeout=30.0) as client:
         final_lat, final_lon = await _resolve_coords(request, lat, lon, state, district, place, client)
 
-        # Determine source
-        use_sentinel = is_sentinel_hub_configured()
-        if source == "modis":
-            use_sentinel = False
-        elif source == "sentinel" and not use_sentinel:
-            raise HTTPException(status_code=503, detail="Sentinel Hub not configured. Set SENTINELHUB_CLIENT_ID/SECRET in .env")
-
-        result = None
-
-        # Try Sentinel Hub first (better resolution)
-        if use_sentinel:
-            sentinel_data = await fetch_sentinel_ndvi(final_lat, final_lon, days_back=periods * 5, client=client)
-            if sentinel_data and sentinel_data.get("current"):
-                # Build full response from Sentinel data
-                result = {
-                    **sentinel_data,
-                    "product": "Sentinel-2 L2A",
-                    "advisory": _build_advisory(
-                        sentinel_data["current"]["ndvi"],
-                        sentinel_data["trend"],
-                    ),
-                    "data_source": "Copernicus Sentinel Hub (10m)",
-                    "last_updated": datetime.utcnow().isoformat() + "Z",
-                }
-
-        # Fallback to MODIS
-        if not result:
-            result = await get_ndvi_analysis(final_lat, final_lon, periods=periods, client=client)
-            if use_sentinel and source != "modis":
-                result["sentinel_fallback"] = True
-                result["sentinel_note"] = "Sentinel Hub data unavailable for this location/period. Using MODIS fallback."
-
-        # Enrich with location name
-        nearest = find_nearest_district(final_lat, final_lon)
-        if nearest:
-            result["location"] = f"{place}, {nearest['district']}, {nearest['state']}" if place else f"{nearest['district']}, {nearest['state']}"
-        else:
-            result["location"] = f"{place}, {final_lat:.2f}°N, {final_lon:.2f}°E" if place else f"{final_lat:.2f}°N, {final_lon:.2f}°E"
-
-        # Cache historical data in DB
-        _cache_ndvi_readings(db, result, crop)
-
-        return result
+    ndvi_result = await get_ndvi_result(final_lat, final_lon, periods=periods, source=source)
+    result = project_analysis(ndvi_result, place)
+    if ndvi_result["sentinel_fallback"]:
+        result["sentinel_fallback"] = True
+        result["sentinel_note"] = "Sentinel Hub data unavailable for this location/period. Using MODIS fallback."
+
+    # Cache historical data in DB
+    if should_persist(ndvi_result, crop) and _cache_ndvi_readings(db, result, crop):
+        mark_persisted(ndvi_result, crop)
+
+    return result
 
 
 @router.get("/ndvi/predict")
@@ -218,91 +152,73 @@ async def predict_ndvi(
     async with httpx.AsyncClient(timeout=30.0) as client:
         final_lat, final_lon = await _resolve_coords(request, lat, lon, state, district, place, client)
 
-        # 1. Fetch historical NDVI analysis
-        use_sentinel = is_sentinel_hub_configured()
-        result = None
-        
-        if use_sentinel:
-            sentinel_data = await fetch_sentinel_ndvi(final_lat, final_lon, days_back=periods * 5, client=client)
-            if sentinel_data and sentinel_data.get("current"):
-                result = {
-                    **sentinel_data,
-                    "product": "Sentinel-2 L2A",
-                    "advisory": _build_advisory(sentinel_data["current"]["ndvi"], sentinel_data["trend"]),
-                    "data_source": "Copernicus Sentinel Hub (10m)",
-                }
-
-        if not result:
-            result = await get_ndvi_analysis(final_lat, final_lon, periods=periods, client=client)
-
-        nearest = find_nearest_district(final_lat, final_lon)
-        if nearest:
-            result["location"] = f"{place}, {nearest['district']}, {nearest['state']}" if place else f"{nearest['district']}, {nearest['state']}"
-        else:
-            result["location"] = f"{place}, {final_lat:.2f}°N, {final_lon:.2f}°E" if place else f"{final_lat:.2f}°N, {final_lon:.2f}°E"
-
-        # 2. Cache historical data in DB
-        _cache_ndvi_readings(db, result, crop)
-
-        # 3. Generate ML forecasts (predict next 3 future periods)
-        history = result.get("time_series", [])
-        if len(history) < 2:
-            # Generate a realistic mock history and forecast so the page renders normally
-            import math
-            today = datetime.utcnow()
-            history = []
-            for i in range(periods):
-                dt = today - timedelta(days=16 * (periods - i - 1))
-                # Generate a cyclic seasonal NDVI value between 0.45 and 0.65
-                day_of_year = dt.timetuple().tm_yday
-                ndvi_val = 0.55 + 0.1 * math.sin(2 * math.pi * day_of_year / 365.25)
-                history.append({
-                    "date": dt.strftime("%Y-%m-%d"),
-                    "date_label": dt.strftime("%d %b"),
-                    "ndvi": round(ndvi_val, 4)
-                })
-            result["time_series"] = history
-            result["current"] = {
-                "ndvi": history[-1]["ndvi"],
-                "date": history[-1]["date"],
-                "status": "Healthy",
-                "color": "#22c55e",
-                "emoji": "🌾",
-                "health_pct": 75
-            }
-            result["trend"] = {
-                "direction": "stable",
-                "change_16day": 0.0,
-                "change_long_term": 0.0,
-                "consecutive_drops": 0,
-                "signal": "normal"
-            }
-            result["statistics"] = {
-                "min": round(min(h["ndvi"] for h in history), 4),
-                "max": round(max(h["ndvi"] for h in history), 4),
-                "mean": round(sum(h["ndvi"] for h in history) / len(history), 4),
-                "range": round(max(h["ndvi"] for h in history) - min(h["ndvi"] for h in history), 4),
-                "data_points": len(history),
-                "period_days": (periods - 1) * 16,
-            }
-            result["advisory"] = {
-                "severity": "positive",
-                "title": "✅ Crop Health Stable",
-                "message": f"Vegetation index is stable at {history[-1]['ndvi']:.2f}. Crops are growing under normal seasonal conditions."
-            }
-            result["data_source"] = "NASA MODIS (Simulated Fallback)"
-
-        # Runs Prophet (or falls back to sklearn Ridge Regression) in a background thread
-        forecast = await asyncio.to_thread(forecast_ndvi_prophet, history, periods_to_predict=3)
-
-        # 4. Generate predictive advisories from ML results
-        ml_advisory = generate_ml_advisory(history, forecast)
-
-        # 5. Enrich result
-        result["forecast"] = forecast
-        result["ml_advisory"] = ml_advisory
-
-        return result
+    # 1. Historical NDVI analysis — shared with /ndvi (reuses its cached result)
+    ndvi_result = await get_ndvi_result(final_lat, final_lon, periods=periods)
+    result = project_analysis(ndvi_result, place)
+
+    # 2. Cache historical data in DB
+    if should_persist(ndvi_result, crop) and _cache_ndvi_readings(db, result, crop):
+        mark_persisted(ndvi_result, crop)
+
+    # 3. Generate ML forecasts (predict next 3 future periods)
+    history = result.get("time_series", [])
+    if len(history) < 2:
+        # Generate a realistic mock history and forecast so the page renders normally
+        import math
+        today = datetime.utcnow()
+        history = []
+        for i in range(periods):
+            dt = today - timedelta(days=16 * (periods - i - 1))
+            # Generate a cyclic seasonal NDVI value between 0.45 and 0.65
+            day_of_year = dt.timetuple().tm_yday
+            ndvi_val = 0.55 + 0.1 * math.sin(2 * math.pi * day_of_year / 365.25)
+            history.append({
+                "date": dt.strftime("%Y-%m-%d"),
+                "date_label": dt.strftime("%d %b"),
+                "ndvi": round(ndvi_val, 4)
+            })
+        result["time_series"] = history
+        result["current"] = {
+            "ndvi": history[-1]["ndvi"],
+            "date": history[-1]["date"],
+            "status": "Healthy",
+            "color": "#22c55e",
+            "emoji": "🌾",
+            "health_pct": 75
+        }
+        result["trend"] = {
+            "direction": "stable",
+            "change_16day": 0.0,
+            "change_long_term": 0.0,
+            "consecutive_drops": 0,
+            "signal": "normal"
+        }
+        result["statistics"] = {
+            "min": round(min(h["ndvi"] for h in history), 4),
+            "max": round(max(h["ndvi"] for h in history), 4),
+            "mean": round(sum(h["ndvi"] for h in history) / len(history), 4),
+            "range": round(max(h["ndvi"] for h in history) - min(h["ndvi"] for h in history), 4),
+            "data_points": len(history),
+            "period_days": (periods - 1) * 16,
+        }
+        result["advisory"] = {
+            "severity": "positive",
+            "title": "✅ Crop Health Stable",
+            "message": f"Vegetation index is stable at {history[-1]['ndvi']:.2f}. Crops are growing under normal seasonal conditions."
+        }
+        result["data_source"] = "NASA MODIS (Simulated Fallback)"
+
+    # Runs Prophet (or falls back to sklearn Ridge Regression) in a background thread
+    forecast = await asyncio.to_thread(forecast_ndvi_prophet, history, periods_to_predict=3)
+
+    # 4. Generate predictive advisories from ML results
+    ml_advisory = generate_ml_advisory(history, forecast)
+
+    # 5. Enrich result
+    result["forecast"] = forecast
+    result["ml_advisory"] = ml_advisory
+
+    return result
 
 
 @router.get("/ndvi/compare")
@@ -321,71 +237,46 @@ async def compare_sources(
     async with httpx.AsyncClient(timeout=30.0) as client:
         final_lat, final_lon = await _resolve_coords(request, lat, lon, state, district, place, client)
 
-        nearest = find_nearest_district(final_lat, final_lon)
-        location = f"{place}, {nearest['district']}, {nearest['state']}" if place and nearest else (
-            f"{nearest['district']}, {nearest['state']}" if nearest else f"{place}, {final_lat:.2f}°N, {final_lon:.2f}°E" if place else f"{final_lat:.2f}°N, {final_lon:.2f}°E"
-        )
+    # Same per-source results that /ndvi and /ndvi/predict use for the default 6 periods
+    sources = await get_ndvi_sources(final_lat, final_lon, periods=6)
+    modis = sources["modis"] or {}
+    sentinel = sources["sentinel"]
 
-        comparison = {
-            "location": location,
-            "latitude": final_lat,
-            "longitude": final_lon,
-            "sources": {},
-        }
+    comparison = {
+        "location": format_location(sources["nearest"], place, final_lat, final_lon),
+        "latitude": final_lat,
+        "longitude": final_lon,
+        "sources": {},
+    }
 
-        # Prepare fetch tasks
-        modis_task = get_ndvi_analysis(final_lat, final_lon, periods=6, client=client)
-        sentinel_task = None
-        if is_sentinel_hub_configured():
-            sentinel_task = fetch_sentinel_ndvi(final_lat, final_lon, client=client)
-
-        if sentinel_task:
-            modis_res, sentinel_res = await asyncio.gather(modis_task, sentinel_task, return_exceptions=True)
-        else:
-            modis_res = await modis_task
-            sentinel_res = None
-
-        # Handle exceptions gracefully
-        if isinstance(modis_res, Exception):
-            print(f"[Satellite] MODIS error during compare: {modis_res}")
-            modis = {}
-        else:
-            modis = modis_res
-
-        if isinstance(sentinel_res, Exception):
-            print(f"[Satellite] Sentinel error during compare: {sentinel_res}")
-            sentinel = None
-        else:
-            sentinel = sentinel_res
-
-        comparison["sources"]["modis"] = {
-            "available": bool(modis.get("current")),
-            "resolution": "250m",
-            "update_frequency": "16 days",
-            "current_ndvi": modis["current"]["ndvi"] if modis.get("current") else None,
-            "status": modis["current"]["status"] if modis.get("current") else "unavailable",
-            "trend": modis.get("trend"),
-            "data_points": len(modis.get("time_series", [])),
-        }
+    comparison["sources"]["modis"] = {
+        "available": bool(modis.get("current")),
+        "resolution": "250m",
+        "update_frequency": "16 days",
+        "current_ndvi": modis["current"]["ndvi"] if modis.get("current") else None,
+        "status": modis["current"]["status"] if modis.get("current") else "unavailable",
+        "trend": modis.get("trend"),
+        "data_points": len(modis.get("time_series", [])),
+    }
 
-        # Sentinel Hub (if configured)
-        if is_sentinel_hub_configured():
-            comparison["sources"]["sentinel"] = {
-                "available": bool(sentinel and sentinel.get("current")),
-                "resolution": "10m",
-                "update_frequency": "5 days",
-                "current_ndvi": sentinel["current"]["ndvi"] if sentinel and sentinel.get("current") else None,
-                "status": sentinel["current"]["status"] if sentinel and sentinel.get("current") else "unavailable",
-                "trend": sentinel.get("trend") if sentinel else None,
-                "data_points": len(sentinel.get("time_series", [])) if sentinel else 0,
-            }
-        else:
-            comparison["sources"]["sentinel"] = {
-                "available": False,
-                "reason": "SENTINELHUB_CLIENT_ID/SECRET not configured",
-            }
+    # Sentinel Hub (if configured)
+    if is_sentinel_hub_configured():
+        comparison["sources"]["sentinel"] = {
+            "available": bool(sentinel and sentinel.get("current")),
+            "resolution": "10m",
+            "update_frequency": "5 days",
+            "current_ndvi": sentinel["current"]["ndvi"] if sentinel and sentinel.get("current") else None,
+            "status": sentinel["current"]["status"] if sentinel and sentinel.get("current") else "unavailable",
+            "trend": sentinel.get("trend") if sentinel else None,
+            "data_points": len(sentinel.get("time_series", [])) if sentinel else 0,
+        }
+    else:
+        comparison["sources"]["sentinel"] = {
+            "available": False,
+            "reason": "SENTINELHUB_CLIENT_ID/SECRET not configured",
+        }
 
-        return comparison
+    return comparison
 
 
 @router.get("/ndvi/health")
@@ -415,4 +306,5 @@ async def ndvi_health():
             },
         },
         "auto_select": "Sentinel Hub preferred when available, MODIS fallback",
+        "sentinel_batching": get_batcher_stats(),
     }
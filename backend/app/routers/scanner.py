@@ -4,13 +4,21 @@ Endpoint for Visual Diagnostic Scanner. Accepts compressed Base64 JPEG
 and runs the crop diagnosis pipeline.
 """
 
+import json
+import base64
+import asyncio
+import hashlib
 import logging
 from typing import Optional
-from pydantic import BaseModel, Field
-from fastapi import APIRouter, HTTPException, Header, Request
+from pydantic import BaseModel, Field, ValidationError
+from fastapi import APIRouter, HTTPException, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, StreamingResponse
 
 from app.services.vision_diagnostic_service import vision_diagnostic_service
-from app.auth import decode_access_token
+from app.services.diagnosis_cache import diagnosis_cache
+from app.services.audio_codec import iter_frames, negotiate_format, mime_for
+from app.services.audio_store import audio_store
+from app.auth import decode_access_token, require_admin
 from app.database import AsyncAuthSessionLocal
 from app.models import User
 from sqlalchemy import select
@@ -23,6 +31,35 @@ class DiagnoseRequest(BaseModel):
     image_base64: str = Field(..., description="Base64 JPEG (<50KB)")
     language: str = Field(default="en")
     query: Optional[str] = Field(default=None)
+    audio_format: Optional[str] = Field(default=None, description="opus | webm | mp3 | wav (default: Accept header, else wav; opus when streaming)")
+
+
+async def _resolve_user_location(token: Optional[str]) -> Optional[str]:
+    """Build a "mandal, district, state" search location from the user's profile."""
+    if not token:
+        return None
+    try:
+        payload = decode_access_token(token)
+        if not payload:
+            return None
+        username = payload.get("sub")
+        async with AsyncAuthSessionLocal() as db:
+            result = await db.execute(select(User).filter(User.username == username))
+            user = result.scalars().first()
+        if not user:
+            return None
+        # Build location string for search localization
+        loc_parts = [p for p in (user.mandal, user.district, user.state) if p]
+        return ", ".join(loc_parts) if loc_parts else None
+    except Exception as e:
+        logger.warning(f"[Scanner] Auth error: {e}")
+        return None
+
+
+def _bearer(authorization: Optional[str]) -> Optional[str]:
+    if authorization and authorization.startswith("Bearer "):
+        return authorization.split(" ")[1]
+    return None
 
 
 @router.post("/diagnose")
@@ -32,36 +69,13 @@ async def diagnose_crop(
     authorization: Optional[str] = Header(None),
 ):
     """Diagnose crop disease from compressed image."""
-    user_id = None
-    location = None
-    if authorization and authorization.startswith("Bearer "):
-        try:
-            token = authorization.split(" ")[1]
-            payload = decode_access_token(token)
-            if payload:
-                username = payload.get("sub")
-                async with AsyncAuthSessionLocal() as db:
-                    result = await db.execute(select(User).filter(User.username == username))
-                    user = result.scalars().first()
-                    if user:
-                        user_id = user.id
-                        # Build location string for search localization
-                        loc_parts = []
-                        if user.mandal:
-                            loc_parts.append(user.mandal)
-                        if user.district:
-                            loc_parts.append(user.district)
-                        if user.state:
-                            loc_parts.append(user.state)
-                        if loc_parts:
-                            location = ", ".join(loc_parts)
-        except Exception as e:
-            logger.warning(f"[Scanner] Auth error: {e}")
+    location = await _resolve_user_location(_bearer(authorization))
 
     if not data.image_base64:
         raise HTTPException(status_code=400, detail="No image provided")
 
     image_size_kb = len(data.image_base64) * 3 / 4 / 1024
+    audio_format = negotiate_format(data.audio_format, request.headers.get("accept"), default="wav")
     try:
         result = await vision_diagnostic_service.diagnose(
             image_base64=data.image_base64,
@@ -69,6 +83,7 @@ async def diagnose_crop(
             user_query=data.query,
             speak_result=True,
             location=location,
+            audio_format=audio_format,
         )
         logger.info(f"[Scanner] Done: {result.get('issue_detected')}")
         return result
@@ -77,3 +92,149 @@ async def diagnose_crop(
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# ──────────── Streaming diagnosis (SSE / WebSocket) ────────────
+
+async def _diagnose_events(data: DiagnoseRequest, location: Optional[str]):
+    """
+    Run the diagnosis pipeline and yield (event, payload) as each stage
+    finishes: diagnosis → price → translation → audio, then ("done", result).
+    Audio arrives already encoded in the negotiated format (Opus by default).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    task = asyncio.create_task(vision_diagnostic_service.diagnose(
+        image_base64=data.image_base64,
+        language=data.language,
+        user_query=data.query,
+        speak_result=True,
+        location=location,
+        on_event=lambda event, payload: queue.put_nowait((event, payload)),
+        audio_format=negotiate_format(data.audio_format, default="opus"),
+    ))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield item
+
+        result = task.result()
+        result.pop("audio_url", None)  # audio already streamed separately
+        yield "done", result
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+@router.post("/diagnose/stream")
+async def diagnose_crop_stream(
+    data: DiagnoseRequest,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events variant of /diagnose. Events arrive as stages finish;
+    the audio event carries a URL to the compressed audio instead of base64.
+    """
+    if not data.image_base64:
+        raise HTTPException(status_code=400, detail="No image provided")
+    location = await _resolve_user_location(_bearer(authorization))
+
+    async def sse():
+        try:
+            async for event, payload in _diagnose_events(data, location):
+                if event == "audio":
+                    # Served from the size-bounded audio store (LRU on disk), keyed by content;
+                    # inline as a data URL, like /diagnose, if the store is off or the write fails
+                    audio_id = hashlib.sha256(payload["audio"]).hexdigest()
+                    stored = await asyncio.to_thread(audio_store.put, audio_id, payload["audio"], payload["format"])
+                    url = (f"/api/scanner/audio/{audio_id}" if stored is not None
+                           else f"data:{payload['mime']};base64,{base64.b64encode(payload['audio']).decode()}")
+                    payload = {
+                        "url": url,
+                        "format": payload["format"],
+                        "mime": payload["mime"],
+                        "bytes": len(payload["audio"]),
+                    }
+                yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False, default=str)}\n\n"
+        except Exception as e:
+            logger.error(f"[Scanner] Stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+
+    return StreamingResponse(sse(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/audio/{audio_id}")
+async def get_stream_audio(audio_id: str):
+    """Compressed diagnosis audio referenced by the SSE `audio` event (stored by any worker)."""
+    # lookup touches the disk (utime, shard probe, first-use directory scan) — keep it off the loop
+    found = await asyncio.to_thread(audio_store.lookup, audio_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Audio expired or not found")
+    path, fmt = found
+    return FileResponse(path, media_type=mime_for(fmt), headers={"X-Audio-Format": fmt})
+
+
+@router.websocket("/diagnose/ws")
+async def diagnose_crop_ws(websocket: WebSocket):
+    """
+    WebSocket variant: client sends one DiagnoseRequest JSON; server sends
+    JSON events ({"type": "diagnosis" | "price" | "translation" | "done"})
+    and the audio as binary frames between "audio_start" and "audio_end".
+    """
+    await websocket.accept()
+    try:
+        raw = await websocket.receive_text()
+        try:
+            data = DiagnoseRequest(**json.loads(raw))
+        except (ValueError, ValidationError) as e:
+            await websocket.send_json({"type": "error", "message": f"Invalid request: {e}"})
+            return
+        if not data.image_base64:
+            await websocket.send_json({"type": "error", "message": "No image provided"})
+            return
+
+        location = await _resolve_user_location(websocket.query_params.get("token"))
+        async for event, payload in _diagnose_events(data, location):
+            if event == "audio":
+                audio = payload["audio"]
+                await websocket.send_json({
+                    "type": "audio_start",
+                    "format": payload["format"],
+                    "mime": payload["mime"],
+                    "bytes": len(audio),
+                })
+                for frame in iter_frames(audio):
+                    await websocket.send_bytes(bytes(frame))
+                await websocket.send_json({"type": "audio_end"})
+            else:
+                await websocket.send_text(json.dumps({"type": event, **payload}, ensure_ascii=False, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("[Scanner] Stream client disconnected")
+    except Exception as e:
+        logger.error(f"[Scanner] WS stream error: {e}")
+        try:
+            await websocket.send_json({"type": "error", "message": str(e)})
+        except Exception:
+            pass
+
+
+@router.get("/diagnosis-cache/stats")
+async def diagnosis_cache_stats(authorization: Optional[str] = Header(None)):
+    """Hit rate, near-duplicate hits and size of the perceptual-hash diagnosis cache (admins only)."""
+    require_admin(authorization)
+    return diagnosis_cache.get_stats()
+
+
+@router.delete("/diagnosis-cache")
+async def invalidate_diagnosis_cache(namespace: Optional[str] = None, entry_id: Optional[str] = None,
+                                     authorization: Optional[str] = Header(None)):
+    """Drop cached diagnoses: everything, one namespace ("diagnose" / "analyze-plant"), or one entry id (admins only)."""
+    username = require_admin(authorization)
+    removed = diagnosis_cache.invalidate(namespace=namespace, entry_id=entry_id)
+    logger.info(f"[Scanner] Diagnosis cache invalidated by {username}: {removed} entries")
+    return {"removed": removed}
@@ -0,0 +1,110 @@
+"""
+Advisory Templates — EventHorizon AI
+======================================
+Single source of truth for the templated advisory texts (NDVI satellite
+advisories, ML forecast advisories, weather-risk advisories). The services
+render their messages from here, and phrase_tts pre-synthesizes the fixed
+parts of the same templates so advisory playback is spliced from cached
+audio instead of synthesized from scratch.
+
+Templates use str.format fields; a field is a dynamic part (a number or
+crop name) and everything between fields is a fixed phrase.
+"""
+
+from typing import Any, Dict
+
+# id -> (severity, title, message template)
+ADVISORY_TEMPLATES: Dict[str, tuple] = {
+    # satellite_ndvi_service._build_advisory
+    "ndvi.drought_alert": (
+        "critical", "⚠️ Early Drought Signal Detected",
+        "Vegetation index has been declining for {drops} consecutive periods and is now at {ndvi:.2f} "
+        "(stressed level). This is a strong early indicator of drought stress. Increase irrigation "
+        "immediately and consider mulching.",
+    ),
+    "ndvi.persistent_decline": (
+        "warning", "📉 Persistent Vegetation Decline",
+        "Vegetation health has dropped for {drops} consecutive periods. Current NDVI: {ndvi:.2f}. "
+        "Monitor closely and check for pest damage, nutrient deficiency, or water stress.",
+    ),
+    "ndvi.browning": (
+        "warning", "🍂 Browning Detected",
+        "Vegetation greenness has decreased by {change:.3f} in the last 16 days. Current NDVI: {ndvi:.2f}. "
+        "This may be seasonal or indicate emerging stress.",
+    ),
+    "ndvi.stress_warning": (
+        "warning", "🔻 Vegetation Stress Warning",
+        "NDVI is at {ndvi:.2f} (stressed range) and declining. Check soil moisture, irrigation systems, "
+        "and look for pest/disease signs.",
+    ),
+    "ndvi.greening": (
+        "positive", "🌱 Vegetation Recovery / Growth",
+        "Vegetation health is improving — NDVI increased by {change:.3f} in the last period. "
+        "Current: {ndvi:.2f}. Growth looks healthy.",
+    ),
+    "ndvi.stable": (
+        "info", "✅ Vegetation Stable",
+        "Current NDVI: {ndvi:.2f}. Vegetation health is stable with no significant changes detected. "
+        "Continue routine monitoring.",
+    ),
+
+    # ndvi_ml_service.generate_ml_advisory
+    "ml.insufficient": (
+        "info", "📡 Insufficient Prediction Data",
+        "Predictive ML analysis requires more historical readings to initialize.",
+    ),
+    "ml.stress": (
+        "critical", "🚨 ML Warning: Crop Stress Predicted",
+        "Our ML model predicts a significant crop health decline from {current:.2f} down to {future:.2f} "
+        "over the next 48 days. This indicates critical water stress or pest vulnerability. Increase soil "
+        "moisture monitoring and prepare irrigation backups.",
+    ),
+    "ml.decline": (
+        "warning", "📉 Predicted Health Decline",
+        "Vegetation index is predicted to drop by {change:.2f} in the coming weeks. Health may decrease "
+        "from {current:.2f} to {future:.2f}. Check for seasonal factors, nutrient deficits, or initial "
+        "pest indicators.",
+    ),
+    "ml.growth": (
+        "positive", "🌱 Predicted Crop Growth",
+        "Strong greening trend predicted! Crop health is expected to rise from {current:.2f} to "
+        "{future:.2f} (+{change:.2f}) over the next 6 weeks. Conditions are highly optimal.",
+    ),
+    "ml.stable": (
+        "positive", "✅ Crop Health Stable",
+        "Crop health is predicted to remain stable. Forecasted NDVI in 48 days is {future:.2f} "
+        "(current: {current:.2f}). Continue standard agricultural practices.",
+    ),
+
+    # risk_assessment_service._generate_advisory
+    "risk.drought.low": ("info", "Low", "Soil moisture levels look adequate for {crop}. Continue regular irrigation schedule."),
+    "risk.drought.moderate": ("warning", "Moderate", "Moderate drought stress possible. Consider increasing irrigation frequency for {crop} and applying mulch to retain soil moisture."),
+    "risk.drought.high": ("warning", "High", "High drought risk detected. Immediately increase irrigation for {crop}. Avoid transplanting young seedlings. Apply organic mulch and consider shade nets."),
+    "risk.drought.critical": ("critical", "Critical", "CRITICAL: Severe drought conditions expected. Emergency irrigation needed for {crop}. Postpone all planting. Prioritize water conservation — drip irrigation recommended."),
+    "risk.pest.low": ("info", "Low", "Low pest pressure expected. Maintain routine scouting for {crop} fields."),
+    "risk.pest.moderate": ("warning", "Moderate", "Moderate pest risk — warm, humid conditions favour insect activity. Increase scouting frequency for {crop}. Consider neem-based organic sprays as preventive."),
+    "risk.pest.high": ("warning", "High", "High pest risk: temperature and humidity in the danger zone for {crop}. Deploy pheromone traps, apply bio-pesticides, and inspect undersides of leaves daily."),
+    "risk.pest.critical": ("critical", "Critical", "CRITICAL pest outbreak conditions for {crop}. Immediate integrated pest management needed. Consult your local agricultural officer. Avoid broad-spectrum chemicals — use targeted bio-controls."),
+    "risk.flood.low": ("info", "Low", "Minimal flooding risk. Drainage systems should handle expected rainfall for {crop} fields."),
+    "risk.flood.moderate": ("warning", "Moderate", "Moderate flood risk — ensure field drainage channels are clear for {crop}. Avoid low-lying areas for new planting."),
+    "risk.flood.high": ("warning", "High", "High flood risk detected. Clear all drainage channels immediately. Consider temporary bunding around {crop} fields. Harvest mature crops early if possible."),
+    "risk.flood.critical": ("critical", "Critical", "CRITICAL: Severe flooding likely. Evacuate livestock from low-lying {crop} fields. Do NOT enter waterlogged fields. Contact district agriculture helpline for emergency support."),
+}
+
+def render(template_id: str, **params: Any) -> str:
+    """The English message for a template."""
+    return ADVISORY_TEMPLATES[template_id][2].format(**params)
+
+
+def advisory(template_id: str, **params: Any) -> Dict[str, Any]:
+    """
+    Advisory dict as returned by the APIs, plus a `speech` reference the
+    client can hand to POST /api/voice/advisory-tts for spliced audio.
+    """
+    severity, title, _ = ADVISORY_TEMPLATES[template_id]
+    return {
+        "severity": severity,
+        "title": title,
+        "message": render(template_id, **params),
+        "speech": {"template": template_id, "params": params},
+    }
@@ -0,0 +1,185 @@
+"""
+Audio Codec — EventHorizon AI
+==============================
+Every TTS engine here returns 24 kHz / 16-bit mono PCM WAV (~48 KB/s).
+This module re-encodes it to a compressed format for transport:
+
+  • "opus" — Ogg/Opus at 24 kbps (≈3 KB/s, best for speech on 2G/3G)
+  • "webm" — WebM/Opus, same codec (MediaSource-friendly in browsers)
+  • "mp3"  — MP3 at 32 kbps mono (universal playback)
+  • "wav"  — passthrough
+
+Formats are negotiated per request (explicit param first, then the Accept
+header, then the endpoint's default — WAV where existing clients expect
+it). Encoding goes through pydub + ffmpeg on a bounded worker pool
+(AUDIO_ENCODE_WORKERS) so concurrent requests never fork an unbounded
+number of ffmpeg processes; if ffmpeg is missing or encoding fails the
+original WAV is returned so callers can always send *something*.
+"""
+
+import io
+import os
+import time
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger("eventhorizon.audio_codec")
+
+# fmt -> (pydub/ffmpeg container, MIME type, export kwargs)
+AUDIO_FORMATS = {
+    "opus": ("ogg", "audio/ogg", {"codec": "libopus", "bitrate": "24k", "parameters": ["-application", "voip"]}),
+    "webm": ("webm", "audio/webm", {"codec": "libopus", "bitrate": "24k", "parameters": ["-application", "voip"]}),
+    "mp3": ("mp3", "audio/mpeg", {"bitrate": "32k", "parameters": ["-ac", "1"]}),
+    "wav": ("wav", "audio/wav", {}),
+}
+
+
+_ALIASES = {
+    "ogg": "opus", "oga": "opus", "audio/ogg": "opus", "audio/opus": "opus",
+    "audio/webm": "webm", "mpeg": "mp3", "audio/mpeg": "mp3", "audio/mp3": "mp3",
+    "audio/wav": "wav", "audio/wave": "wav", "audio/x-wav": "wav", "pcm": "wav",
+}
+
+ENCODE_WORKERS = int(os.getenv("AUDIO_ENCODE_WORKERS", "2"))
+_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def mime_for(fmt: str) -> str:
+    return AUDIO_FORMATS.get(fmt, AUDIO_FORMATS["wav"])[1]
+
+
+def normalize_format(fmt: Optional[str]) -> Optional[str]:
+    """Map a format name / MIME type to a key of AUDIO_FORMATS, or None if unknown."""
+    if not fmt:
+        return None
+    fmt = fmt.strip().lower().split(";")[0].strip()
+    fmt = _ALIASES.get(fmt, fmt)
+    return fmt if fmt in AUDIO_FORMATS else None
+
+
+def negotiate_format(requested: Optional[str] = None, accept: Optional[str] = None, default: str = "wav") -> str:
+    """
+    Pick the output format: an explicit request param wins, then the
+    highest-q supported type in the Accept header, then `default`.
+    """
+    explicit = normalize_format(requested)
+    if explicit:
+        return explicit
+    if accept:
+        candidates = []
+        for i, part in enumerate(accept.split(",")):
+            media, _, params = part.strip().partition(";")
+            q = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            fmt = normalize_format(media)
+            if fmt and q > 0:
+                candidates.append((-q, i, fmt))
+        if candidates:
+            return min(candidates)[2]
+    return default
+
+
+def _record(fmt: str, wav_len: int, out_len: int, ms: float, failed: bool):
+    with _stats_lock:
+        s = _stats.setdefault(fmt, {"encodes": 0, "failures": 0, "wav_bytes": 0, "encoded_bytes": 0, "encode_ms": 0.0})
+        s["encodes"] += 1
+        s["failures"] += int(failed)
+        s["wav_bytes"] += wav_len
+        s["encoded_bytes"] += out_len
+        s["encode_ms"] += ms
+
+
+def get_codec_stats() -> Dict[str, Dict[str, float]]:
+    """Per-format encode counts, bytes in/out, bytes saved and mean encode time."""
+    with _stats_lock:
+        report = {}
+        for fmt, s in _stats.items():
+            saved = s["wav_bytes"] - s["encoded_bytes"]
+            report[fmt] = {
+                **s,
+                "encode_ms": round(s["encode_ms"], 1),
+                "bytes_saved": saved,
+                "ratio": round(s["encoded_bytes"] / s["wav_bytes"], 3) if s["wav_bytes"] else None,
+                "avg_encode_ms": round(s["encode_ms"] / s["encodes"], 1) if s["encodes"] else None,
+            }
+        report["total_bytes_saved"] = sum(r["bytes_saved"] for r in report.values())
+        report["workers"] = ENCODE_WORKERS
+        return report
+
+
+def encode_wav(wav_bytes: bytes, fmt: str = "opus") -> Tuple[bytes, str]:
+    """
+    Encode WAV bytes to `fmt`. Returns (encoded_bytes, actual_fmt); falls
+    back to ("wav") on any failure. Blocking — run in a thread/pool.
+    """
+    fmt = normalize_format(fmt) or "wav"
+    if fmt == "wav" or not wav_bytes:
+        return wav_bytes, "wav"
+    container, _, kwargs = AUDIO_FORMATS[fmt]
+    t0 = time.perf_counter()
+    try:
+        from pydub import AudioSegment
+
+        segment = AudioSegment.from_file(io.BytesIO(wav_bytes), format="wav")
+        out = io.BytesIO()
+        segment.export(out, format=container, **kwargs)
+        encoded = out.getvalue()
+        _record(fmt, len(wav_bytes), len(encoded), (time.perf_counter() - t0) * 1000, failed=False)
+        return encoded, fmt
+    except Exception as e:
+        logger.warning(f"[AUDIO] {fmt} encode failed, sending WAV: {e}")
+        _record(fmt, len(wav_bytes), len(wav_bytes), (time.perf_counter() - t0) * 1000, failed=True)
+        return wav_bytes, "wav"
+
+
+def _get_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # Threads suffice: the heavy lifting happens in the ffmpeg child process
+                _pool = concurrent.futures.ThreadPoolExecutor(max_workers=ENCODE_WORKERS, thread_name_prefix="audio-encode")
+    return _pool
+
+
+async def encode_async(wav_bytes: bytes, fmt: Optional[str]) -> Tuple[bytes, str]:
+    """encode_wav on the bounded encoder pool."""
+    fmt = normalize_format(fmt) or "wav"
+    if fmt == "wav" or not wav_bytes:
+        return wav_bytes, "wav"
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), encode_wav, wav_bytes, fmt)
+
+
+def encode_in_pool(wav_bytes: bytes, fmt: Optional[str]) -> Tuple[bytes, str]:
+    """Blocking variant of encode_async for sync endpoints (still bounded by the pool)."""
+    fmt = normalize_format(fmt) or "wav"
+    if fmt == "wav" or not wav_bytes:
+        return wav_bytes, "wav"
+    return _get_pool().submit(encode_wav, wav_bytes, fmt).result()
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+        _pool = None
+
+
+def iter_frames(data: bytes, frame_size: int = 16 * 1024):
+    """Split encoded audio into transport-sized memoryview frames (no copies)."""
+    view = memoryview(data)
+    for offset in range(0, len(view), frame_size):
+        yield view[offset:offset + frame_size]
@@ -0,0 +1,210 @@
+"""
+TTS Audio Store — EventHorizon AI
+===================================
+Disk-backed, content-addressed store for synthesized speech. Replaces the
+in-memory TTS caches, which were lost on every deploy and kept large
+audio blobs on the Python heap.
+
+  • Key:    sha256(text, language, voice, requested format). The file
+            extension records the *actual* format (an encode that fell
+            back to WAV is stored as .wav under the opus key).
+  • Layout: AUDIO_STORE_DIR/ab/cd/abcd….{ext} — sharded on the hash prefix
+            so no directory grows huge.
+  • Writes go to a temp file in the same shard and are os.replace()d in,
+    so readers (and other workers) never see partial audio.
+  • Eviction is LRU by total bytes (AUDIO_STORE_MAX_BYTES). A hit bumps
+    the file's mtime, so recency survives restarts; the index is rebuilt
+    from a directory scan on first use.
+  • Workers share the directory: a key missing from this process's index
+    is probed on disk, so clips written by other workers (or after this
+    one started) are found and adopted. The index, byte accounting and
+    eviction are per process, though — AUDIO_STORE_MAX_BYTES bounds what
+    each worker tracks, so with N workers the directory can grow to about
+    N × AUDIO_STORE_MAX_BYTES. Size it per worker.
+  • Endpoints serve hits straight from disk with FileResponse.
+"""
+
+import os
+import re
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+logger = logging.getLogger("eventhorizon.audio_store")
+
+STORE_DIR = os.path.abspath(os.getenv("AUDIO_STORE_DIR", os.path.join(os.getcwd(), "audio_cache")))
+MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+ENABLED = os.getenv("AUDIO_STORE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+_EXTENSIONS = {"wav", "opus", "webm", "mp3"}
+_KEY = re.compile(r"[0-9a-f]{64}")
+
+
+def audio_key(text: str, language: str, voice: Optional[str], fmt: str) -> str:
+    """Content address for one utterance as requested (text, language, voice, format)."""
+    material = "\0".join((language or "", voice or "default", fmt or "wav", text))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AudioStore:
+    def __init__(self, root: str = STORE_DIR, max_bytes: int = MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, Tuple[Path, int]]" = OrderedDict()  # key -> (path, size), LRU order
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "evicted_bytes": 0, "errors": 0}
+
+    def _shard(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4]
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            found = []
+            if self.root.is_dir():
+                for path in self.root.glob("*/*/*.*"):
+                    key, _, ext = path.name.partition(".")
+                    if ext not in _EXTENSIONS:
+                        continue  # stray temp files from a crashed write
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, key, path, st.st_size))
+            for _, key, path, size in sorted(found):
+                self._index[key] = (path, size)
+                self._bytes += size
+            self._loaded = True
+            if found:
+                logger.info(f"[AudioStore] Indexed {len(found)} clips ({self._bytes / 1e6:.1f} MB) in {self.root}")
+        self._evict()
+
+    def lookup(self, key: str) -> Optional[Tuple[Path, str]]:
+        """(path, actual_format) for a stored clip, or None. Marks it most recently used."""
+        if not ENABLED:
+            return None
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None:
+                self._index.move_to_end(key)
+        if entry is None:
+            entry = self._adopt(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        path = entry[0]
+        try:
+            os.utime(path)
+        except OSError:
+            # Deleted underneath us (another worker evicted it)
+            with self._lock:
+                if self._index.pop(key, None) is not None:
+                    self._bytes -= entry[1]
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return path, path.suffix[1:]
+
+    def _adopt(self, key: str) -> Optional[Tuple[Path, int]]:
+        """Index a clip another worker stored under `key` since our directory scan."""
+        if not _KEY.fullmatch(key):
+            return None  # keys are sha256 hex; anything else may come from a URL
+        shard = self._shard(key)
+        for ext in _EXTENSIONS:
+            path = shard / f"{key}.{ext}"
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            with self._lock:
+                if key not in self._index:
+                    self._index[key] = (path, size)
+                    self._bytes += size
+                entry = self._index[key]
+            self._evict()
+            return entry
+        return None
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """(audio_bytes, actual_format) — for callers that need the bytes (WebSocket frames)."""
+        found = self.lookup(key)
+        if found is None:
+            return None
+        path, fmt = found
+        try:
+            return path.read_bytes(), fmt
+        except OSError:
+            self.stats["errors"] += 1
+            return None
+
+    def put(self, key: str, audio: bytes, fmt: str) -> Optional[Path]:
+        """Atomically store a clip under `key` with the actual format `fmt`. Blocking."""
+        if not ENABLED or not audio:
+            return None
+        self._ensure_loaded()
+        fmt = fmt if fmt in _EXTENSIONS else "wav"
+        shard = self._shard(key)
+        path = shard / f"{key}.{fmt}"
+        try:
+            shard.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=shard, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+        except OSError as e:
+            self.stats["errors"] += 1
+            logger.warning(f"[AudioStore] Write failed for {key[:12]}: {e}")
+            return None
+
+        with self._lock:
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+                if old[0] != path:
+                    self._unlink(old[0])
+            self._index[key] = (path, len(audio))
+            self._bytes += len(audio)
+            self.stats["writes"] += 1
+        self._evict()
+        return path
+
+    def _evict(self):
+        with self._lock:
+            while self._bytes > self.max_bytes and len(self._index) > 1:
+                _, (path, size) = self._index.popitem(last=False)
+                self._bytes -= size
+                self.stats["evictions"] += 1
+                self.stats["evicted_bytes"] += size
+                self._unlink(path)
+
+    @staticmethod
+    def _unlink(path: Path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "dir": str(self.root),
+            "enabled": ENABLED,
+        }
+
+
+audio_store = AudioStore()
@@ -11,7 +11,8 @@ SSML Strategy:
   • Natural pauses          → sentence-boundary <break> tags for breathing rhythm
 
 Cold-Start Elimination:
-  1. Per-voice Synthesizer Pool — each voice gets its own cached synthesizer
+  1. Per-voice Synthesizer Pools — up to AZURE_TTS_POOL_MAX_PER_VOICE warmed
+     synthesizers per voice, checked out by one request at a time
   2. Warm-up synthesis (".")  — forces full TCP→TLS→WebSocket→voice-model pipeline
   3. Background keep-alive    — pings every 50s to prevent idle disconnect
   4. Auto-reconnect           — detects stale connections, re-warms transparently
@@ -25,17 +26,275 @@ import time
 import struct
 import logging
 import threading
+import importlib.util
+import concurrent.futures
+from collections import deque
 from pathlib import Path
 from typing import Optional, Dict, Tuple
 
-try:
-    import azure.cognitiveservices.speech as speechsdk
-    AZURE_SDK_AVAILABLE = True
-except ImportError:
-    AZURE_SDK_AVAILABLE = False
+
+def _sdk_installed() -> bool:
+    try:
+        return importlib.util.find_spec("azure.cognitiveservices.speech") is not None
+    except ModuleNotFoundError:
+        return False
+
+
+# The Speech SDK is a large native library — probe for it here and import
+# it when the first engine is constructed (see _load_sdk).
+AZURE_SDK_AVAILABLE = _sdk_installed()
+speechsdk = None
+
+
+def _load_sdk():
+    global speechsdk
+    if speechsdk is None:
+        import azure.cognitiveservices.speech as _speechsdk
+        speechsdk = _speechsdk
+    return speechsdk
 
 logger = logging.getLogger("azure_tts_engine")
 
+# ── Synthesizer pool sizing ─────────────────────────────────────────────
+# One SpeechSynthesizer handles one request at a time, so the number of
+# synthesizers per voice *is* that voice's concurrency. The S0 tier
+# throttles bursts with 429s (which trigger the failover cascade), so each
+# voice is capped at a handful; raise the caps on higher tiers.
+POOL_MAX_PER_VOICE = int(os.getenv("AZURE_TTS_POOL_MAX_PER_VOICE", "4"))
+POOL_WARM_PER_VOICE = int(os.getenv("AZURE_TTS_POOL_WARM_PER_VOICE", "1"))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("AZURE_TTS_POOL_CHECKOUT_TIMEOUT", "10"))
+SYNTH_TIMEOUT = float(os.getenv("AZURE_TTS_SYNTH_TIMEOUT", "30"))
+
+# Long answers: synthesize the _segment_text chunks concurrently across the
+# voice's pool instead of one round trip after another
+PARALLEL_CHUNKS = os.getenv("AZURE_TTS_PARALLEL_CHUNKS", "1").lower() not in ("0", "false", "no")
+CHUNK_WORKERS = int(os.getenv("AZURE_TTS_CHUNK_WORKERS", "8"))
+
+# Checkout result meaning "you own a free slot — build a synthesizer for it"
+_CREATE = object()
+
+
+def _resolve_future(future, value) -> None:
+    if not future.done():
+        future.set_result(value)
+
+
+class _PooledSynth:
+    """One warmed synthesizer + its open connection, checked out by one request at a time."""
+
+    __slots__ = ("config", "synthesizer", "connection", "waiter", "stream", "uses")
+
+    def __init__(self, config, synthesizer, connection):
+        self.config = config
+        self.synthesizer = synthesizer
+        self.connection = connection
+        self.waiter = None  # (loop, future) while an async request is in flight
+        self.stream = None  # (loop, asyncio.Queue) while a streaming request is in flight
+        self.uses = 0
+
+    def on_chunk(self, evt) -> None:
+        """SDK callback (synthesizing): one incremental piece of audio."""
+        stream = self.stream
+        if stream is not None:
+            loop, queue = stream
+            loop.call_soon_threadsafe(queue.put_nowait, bytes(evt.result.audio_data))
+
+    def on_result(self, evt) -> None:
+        """SDK callback (synthesis_completed / synthesis_canceled), runs on an SDK thread."""
+        waiter = self.waiter
+        if waiter is not None:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_resolve_future, future, evt.result)
+        stream = self.stream
+        if stream is not None:
+            # Same FIFO as the chunks, so the result always arrives after the last one
+            loop, queue = stream
+            loop.call_soon_threadsafe(queue.put_nowait, evt.result)
+
+    def close(self) -> None:
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class _Waiter:
+    __slots__ = ("event", "loop", "future", "item")
+
+    def __init__(self, loop=None, future=None):
+        self.event = None if loop else threading.Event()
+        self.loop = loop
+        self.future = future
+        self.item = None
+
+
+class _VoicePool:
+    """
+    Bounded pool of synthesizers for one voice with checkout/return
+    semantics. Requests beyond `max_size` queue FIFO (thread or asyncio
+    waiters alike); a returned synthesizer is handed straight to the oldest
+    waiter. Tracks queue depth and wait times.
+    """
+
+    def __init__(self, voice_name: str, max_size: int):
+        self.voice_name = voice_name
+        self.max_size = max(1, max_size)
+        self.size = 0  # synthesizers alive or being built
+        self._idle: "deque[_PooledSynth]" = deque()
+        self._waiters: "deque[_Waiter]" = deque()
+        self._lock = threading.Lock()
+        self.stats = {
+            "checkouts": 0,
+            "queued": 0,
+            "timeouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "max_queue_depth": 0,
+        }
+
+    # ── internals (call with _lock held) ────────────────────────────────
+    def _take_locked(self):
+        if self._idle:
+            return self._idle.pop()  # LIFO: the most recently used connection is the warmest
+        if self.size < self.max_size:
+            self.size += 1
+            return _CREATE
+        return None
+
+    def _enqueue_locked(self, waiter: _Waiter) -> None:
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._waiters))
+
+    def _deliver_locked(self, item) -> bool:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if waiter.loop is None:
+                waiter.item = item
+                waiter.event.set()
+                return True
+            if not waiter.future.done():
+                waiter.loop.call_soon_threadsafe(self._deliver_async, waiter.future, item)
+                return True
+        return False
+
+    def _deliver_async(self, future, item) -> None:
+        if future.done():  # the waiter timed out in the meantime
+            self.release(item)
+        else:
+            future.set_result(item)
+
+    def _record_wait(self, t0: float) -> None:
+        waited = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self.stats["checkouts"] += 1
+            self.stats["wait_ms_total"] += waited
+            self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], waited)
+
+    # ── public ──────────────────────────────────────────────────────────
+    def checkout(self, timeout: float):
+        """Blocking. Returns a _PooledSynth, _CREATE (caller builds one), or None on timeout."""
+        t0 = time.perf_counter()
+        with self._lock:
+            item = self._take_locked()
+            if item is None:
+                waiter = _Waiter()
+                self._enqueue_locked(waiter)
+        if item is None:
+            if not waiter.event.wait(timeout):
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                        self.stats["timeouts"] += 1
+                        return None
+            item = waiter.item
+        self._record_wait(t0)
+        return item
+
+    async def checkout_async(self, timeout: float):
+        """Like checkout() but the wait parks a future instead of a thread."""
+        import asyncio
+
+        t0 = time.perf_counter()
+        with self._lock:
+            item = self._take_locked()
+            if item is None:
+                loop = asyncio.get_running_loop()
+                waiter = _Waiter(loop, loop.create_future())
+                self._enqueue_locked(waiter)
+        if item is None:
+            try:
+                item = await asyncio.wait_for(waiter.future, timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    self.stats["timeouts"] += 1
+                return None
+        self._record_wait(t0)
+        return item
+
+    def release(self, item) -> None:
+        """Return a synthesizer (or an unused _CREATE slot) to the pool."""
+        with self._lock:
+            if self._deliver_locked(item):
+                return
+            if item is _CREATE:
+                self.size -= 1
+            else:
+                self._idle.append(item)
+
+    def note_created(self) -> None:
+        with self._lock:
+            self.stats["created"] += 1
+
+    def discard(self, entry: _PooledSynth) -> None:
+        """Close a broken synthesizer; its slot goes to a waiter (who builds a fresh one) or is freed."""
+        entry.close()
+        with self._lock:
+            self.stats["discarded"] += 1
+        self.release(_CREATE)
+
+    def drain_idle(self) -> list:
+        """Remove and return every idle synthesizer (their slots are freed)."""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            self.size -= len(idle)
+        return idle
+
+    def idle_snapshot(self) -> list:
+        with self._lock:
+            return list(self._idle)
+
+    def remove_idle(self, entry: _PooledSynth) -> bool:
+        with self._lock:
+            try:
+                self._idle.remove(entry)
+            except ValueError:
+                return False  # checked out meanwhile — its user will discard it on failure
+            self.size -= 1
+        entry.close()
+        return True
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            checkouts = self.stats["checkouts"]
+            return {
+                **self.stats,
+                "wait_ms_total": round(self.stats["wait_ms_total"], 1),
+                "wait_ms_max": round(self.stats["wait_ms_max"], 1),
+                "avg_wait_ms": round(self.stats["wait_ms_total"] / checkouts, 1) if checkouts else 0.0,
+                "size": self.size,
+                "idle": len(self._idle),
+                "in_use": self.size - len(self._idle),
+                "queue_depth": len(self._waiters),
+                "max_size": self.max_size,
+            }
+
+
 
 class UniversalCasualIndianVoice:
     """
@@ -47,8 +306,9 @@ class UniversalCasualIndianVoice:
       - Intonation contour curves for regional languages
       - Smart sentence segmentation with natural pause injection
 
-    Backed by a per-voice synthesizer pool with pre-warmed connections
-    for zero cold-start latency.
+    Backed by per-voice synthesizer pools with pre-warmed connections
+    for zero cold-start latency; `speak_natural_async` awaits SDK
+    completion events instead of blocking a thread per request.
     """
 
     # ── Premium Azure Neural Voice Profiles ─────────────────────────────
@@ -189,9 +449,11 @@ class UniversalCasualIndianVoice:
         self._initialized = False
         self._use_mai_voice_2 = use_mai_voice_2
 
-        # Per-voice synthesizer pool: voice_name -> (config, synthesizer, connection)
-        self._synth_pool: Dict[str, Tuple] = {}
+        # Per-voice synthesizer pools: voice_name -> _VoicePool of warmed synthesizers
+        self._synth_pool: Dict[str, _VoicePool] = {}
         self._pool_lock = threading.Lock()
+        self._parallel_chunks = PARALLEL_CHUNKS
+        self._chunk_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
 
         self._last_activity_time = time.time()
         self._keepalive_stop = threading.Event()
@@ -208,6 +470,7 @@ class UniversalCasualIndianVoice:
             logger.warning("[CASUAL TTS] No subscription key found. Disabled.")
             return
 
+        _load_sdk()
         self._initialized = True
         logger.info(
             f"[CASUAL TTS] Engine ready — Region: {self._region}, "
@@ -324,7 +587,7 @@ class UniversalCasualIndianVoice:
         return text
 
     # ═══════════════════════════════════════════════════════════════════
-    #  PER-VOICE SYNTHESIZER POOL (ZERO COLD-START)
+    #  PER-VOICE SYNTHESIZER POOLS (ZERO COLD-START)
     # ═══════════════════════════════════════════════════════════════════
 
     def _build_config(self, voice_name: str) -> "speechsdk.SpeechConfig":
@@ -339,75 +602,148 @@ class UniversalCasualIndianVoice:
         config.speech_synthesis_voice_name = voice_name
         return config
 
-    def _get_or_create_synthesizer(
-        self, voice_name: str
-    ) -> Optional[Tuple]:
+    def _get_pool(self, voice_name: str) -> _VoicePool:
+        pool = self._synth_pool.get(voice_name)
+        if pool is None:
+            with self._pool_lock:
+                pool = self._synth_pool.get(voice_name)
+                if pool is None:
+                    pool = self._synth_pool[voice_name] = _VoicePool(voice_name, POOL_MAX_PER_VOICE)
+        return pool
+
+    def _create_entry(self, voice_name: str) -> Optional[_PooledSynth]:
         """
-        Get a cached synthesizer or create + warm a new one.
-        Each voice gets its own SpeechConfig + Synthesizer + Connection.
+        Create + warm one synthesizer for a voice.
+        Each gets its own SpeechConfig + Synthesizer + Connection.
         Warm-up synthesis forces the full pipeline to heat up.
         """
-        if voice_name in self._synth_pool:
-            return self._synth_pool[voice_name]
-
-        with self._pool_lock:
-            if voice_name in self._synth_pool:
-                return self._synth_pool[voice_name]
-
-            try:
-                t_start = time.perf_counter()
+        try:
+            t_start = time.perf_counter()
 
-                config = self._build_config(voice_name)
-                synthesizer = speechsdk.SpeechSynthesizer(
-                    speech_config=config,
-                    audio_config=None,  # in-memory, no speaker
-                )
+            config = self._build_config(voice_name)
+            synthesizer = speechsdk.SpeechSynthesizer(
+                speech_config=config,
+                audio_config=None,  # in-memory, no speaker
+            )
 
-                connection = speechsdk.Connection.from_speech_synthesizer(
-                    synthesizer
+            connection = speechsdk.Connection.from_speech_synthesizer(
+                synthesizer
+            )
+            connection.open(True)
+
+            # TRUE warm-up: synthesize a simple token/greeting to force the full
+            # TCP → TLS → WebSocket → voice-model-load pipeline.
+            # Note: Silent "." gets rejected by MAI-Voice-2 response quality filters,
+            # so we use a real short greeting word for MAI models.
+            warmup_text = "."
+            if ":MAI-Voice-2" in voice_name:
+                warmup_text = "नमस्ते" if "hi-IN" in voice_name else "Hello"
+
+            warmup = synthesizer.speak_text_async(warmup_text).get()
+            if warmup.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+                logger.warning(
+                    f"[CASUAL TTS] Warm-up failed/ignored for {voice_name} "
+                    f"(reason: {warmup.reason}, will retry on real call)"
                 )
-                connection.open(True)
-
-                # TRUE warm-up: synthesize a simple token/greeting to force the full
-                # TCP → TLS → WebSocket → voice-model-load pipeline.
-                # Note: Silent "." gets rejected by MAI-Voice-2 response quality filters,
-                # so we use a real short greeting word for MAI models.
-                warmup_text = "."
-                if ":MAI-Voice-2" in voice_name:
-                    warmup_text = "नमस्ते" if "hi-IN" in voice_name else "Hello"
-
-                warmup = synthesizer.speak_text_async(warmup_text).get()
-                if warmup.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
-                    logger.warning(
-                        f"[CASUAL TTS] Warm-up failed/ignored for {voice_name} "
-                        f"(reason: {warmup.reason}, will retry on real call)"
-                    )
 
-                elapsed = (time.perf_counter() - t_start) * 1000
-                self._synth_pool[voice_name] = (config, synthesizer, connection)
+            entry = _PooledSynth(config, synthesizer, connection)
+            # Async requests are completed from these events instead of a blocking .get()
+            synthesizer.synthesis_completed.connect(entry.on_result)
+            synthesizer.synthesis_canceled.connect(entry.on_result)
+            synthesizer.synthesizing.connect(entry.on_chunk)
+
+            elapsed = (time.perf_counter() - t_start) * 1000
+            self._get_pool(voice_name).note_created()
+            logger.info(
+                f"[CASUAL TTS 🔥] Pooled & warmed: "
+                f"{voice_name} ({elapsed:.0f}ms)"
+            )
+            return entry
 
-                logger.info(
-                    f"[CASUAL TTS 🔥] Pooled & warmed: "
-                    f"{voice_name} ({elapsed:.0f}ms)"
-                )
-                return self._synth_pool[voice_name]
+        except Exception as e:
+            logger.warning(
+                f"[CASUAL TTS] Pool creation failed for {voice_name}: {e}"
+            )
+            return None
 
-            except Exception as e:
-                logger.warning(
-                    f"[CASUAL TTS] Pool creation failed for {voice_name}: {e}"
-                )
-                return None
+    def _get_or_create_synthesizer(self, voice_name: str) -> Optional[_VoicePool]:
+        """
+        Make sure a voice's pool holds at least AZURE_TTS_POOL_WARM_PER_VOICE
+        warmed synthesizers (startup / warm_up). Returns the pool, or None
+        if no synthesizer could be created.
+        """
+        pool = self._get_pool(voice_name)
+        created = []
+        while pool.size < min(POOL_WARM_PER_VOICE, pool.max_size):
+            item = pool.checkout(timeout=0)
+            if item is None:
+                break
+            if item is _CREATE:
+                item = self._create_entry(voice_name)
+                if item is None:
+                    pool.release(_CREATE)
+                    break
+            created.append(item)
+        for entry in created:
+            pool.release(entry)
+        return pool if pool.size else None
+
+    def _checkout(self, voice_name: str, lang_code: str, error_type: str = "POOL_FAILED") -> Optional[_PooledSynth]:
+        """Check out a synthesizer, building one if the pool has a free slot."""
+        pool = self._get_pool(voice_name)
+        item = pool.checkout(POOL_CHECKOUT_TIMEOUT)
+        if item is _CREATE:
+            item = self._create_entry(voice_name)
+            if item is None:
+                pool.release(_CREATE)
+        if item is None:
+            self._emit_pool_failure(pool, error_type, lang_code)
+        return item
+
+    async def _checkout_async(self, voice_name: str, lang_code: str, error_type: str = "POOL_FAILED") -> Optional[_PooledSynth]:
+        import asyncio
+
+        pool = self._get_pool(voice_name)
+        item = await pool.checkout_async(POOL_CHECKOUT_TIMEOUT)
+        if item is _CREATE:
+            # Building + warming a synthesizer is a one-off blocking SDK call
+            item = await asyncio.to_thread(self._create_entry, voice_name)
+            if item is None:
+                pool.release(_CREATE)
+        if item is None:
+            self._emit_pool_failure(pool, error_type, lang_code)
+        return item
+
+    def _emit_pool_failure(self, pool: _VoicePool, error_type: str, lang_code: str) -> None:
+        if pool.size >= pool.max_size:
+            details = f"All {pool.max_size} synthesizers for {pool.voice_name} busy for {POOL_CHECKOUT_TIMEOUT:g}s"
+            self._emit_failover("POOL_EXHAUSTED", details, lang_code)
+        else:
+            self._emit_failover(error_type, f"Cannot create synthesizer for {pool.voice_name}", lang_code)
+
+    def _checkin(self, voice_name: str, entry: _PooledSynth, discard: bool = False) -> None:
+        pool = self._get_pool(voice_name)
+        entry.uses += 1
+        if discard:
+            pool.discard(entry)
+            logger.info(f"[CASUAL TTS] Discarded synthesizer: {voice_name}")
+        else:
+            pool.release(entry)
 
     def _evict_synthesizer(self, voice_name: str) -> None:
-        """Remove a stale synthesizer from the pool."""
-        with self._pool_lock:
-            entry = self._synth_pool.pop(voice_name, None)
-            if entry:
-                try:
-                    entry[2].close()
-                except Exception:
-                    pass
-                logger.info(f"[CASUAL TTS] Evicted: {voice_name}")
+        """Close every idle synthesizer for a voice (in-use ones are discarded by their users on failure)."""
+        pool = self._synth_pool.get(voice_name)
+        if pool is None:
+            return
+        idle = pool.drain_idle()
+        for entry in idle:
+            entry.close()
+        if idle:
+            logger.info(f"[CASUAL TTS] Evicted: {voice_name} ({len(idle)} idle)")
+
+    def get_pool_stats(self) -> Dict[str, dict]:
+        """Per-voice pool size, in-use / idle counts, queue depth and checkout wait times."""
+        return {voice: pool.get_stats() for voice, pool in list(self._synth_pool.items())}
 
     # ═══════════════════════════════════════════════════════════════════
     #  KEEP-ALIVE
@@ -428,20 +764,19 @@ class UniversalCasualIndianVoice:
         self._keepalive_thread.start()
 
     def _keepalive_loop(self) -> None:
-        """Ping pooled connections periodically to prevent idle timeout."""
+        """Ping idle pooled connections periodically to prevent idle timeout."""
         while not self._keepalive_stop.wait(timeout=self._KEEPALIVE_INTERVAL):
             idle = time.time() - self._last_activity_time
             if idle < self._KEEPALIVE_INTERVAL:
                 continue
 
-            stale = []
-            for vname, (_, _, conn) in list(self._synth_pool.items()):
-                try:
-                    conn.open(True)
-                except Exception:
-                    stale.append(vname)
-            for v in stale:
-                self._evict_synthesizer(v)
+            for vname, pool in list(self._synth_pool.items()):
+                for entry in pool.idle_snapshot():
+                    try:
+                        entry.connection.open(True)
+                    except Exception:
+                        if pool.remove_idle(entry):
+                            logger.info(f"[CASUAL TTS] Evicted stale connection: {vname}")
 
     # ═══════════════════════════════════════════════════════════════════
     #  VOICE RESOLUTION
@@ -492,7 +827,7 @@ class UniversalCasualIndianVoice:
 
     @property
     def warm_voices(self) -> list:
-        return list(self._synth_pool.keys())
+        return [voice for voice, pool in list(self._synth_pool.items()) if pool.size]
 
     def speak_natural(
         self,
@@ -515,27 +850,11 @@ class UniversalCasualIndianVoice:
         Returns:
             Raw WAV audio bytes (24kHz/16-bit/Mono) on success, None on failure.
         """
-        if not self.is_available:
-            self._emit_failover(
-                "ENGINE_UNAVAILABLE",
-                "Azure TTS engine is not initialized",
-                lang_code,
-            )
+        plan = self._plan_speech(text, lang_code)
+        if plan is None:
             return None
-
-        clean_text = self._clean_text(text)
-        if not clean_text:
-            logger.warning("[CASUAL TTS] Empty text — skipping.")
-            return None
-
-        profile = self._resolve_voice_profile(lang_code, try_mai=self._use_mai_voice_2)
+        clean_text, profile, is_mai, should_chunk = plan
         voice_name = profile["voice"]
-        label = profile["label"]
-
-        # Determine if we should chunk the text to avoid RTF timeouts
-        is_mai = ":MAI-Voice-2" in voice_name
-        word_count = len(clean_text.split())
-        should_chunk = (is_mai and word_count > 6) or (word_count > 15)
 
         try:
             t_start = time.perf_counter()
@@ -547,85 +866,77 @@ class UniversalCasualIndianVoice:
 
                 # If MAI-Voice-2 fails/timeouts, attempt transparent fallback to standard Neural voice
                 if (not audio_data or len(audio_data) <= 46) and self._use_mai_voice_2 and is_mai:
-                    logger.warning(
-                        f"[CASUAL TTS] MAI-Voice-2 synthesis failed/timed out for '{lang_code}'. "
-                        f"Attempting transparent fallback to standard Neural voice..."
-                    )
-                    profile = self._resolve_voice_profile(lang_code, try_mai=False)
+                    profile = self._neural_fallback(clean_text, lang_code)
                     voice_name = profile["voice"]
-                    label = profile["label"]
                     ssml = self._build_natural_ssml_with_profile(clean_text, profile)
-
-                    logger.info(
-                        f"[CASUAL TTS Fallback] Speaking standard Neural ({label} / {voice_name}): "
-                        f"'{clean_text[:60]}{'...' if len(clean_text) > 60 else ''}'"
-                    )
                     audio_data = self._synth_via_pool(ssml, voice_name, lang_code)
             else:
                 # Chunked synthesis path to guarantee success
-                chunks = self._segment_text(clean_text, max_words=8 if is_mai else 12)
-                logger.info(
-                    f"[CASUAL TTS] Speaking chunked ({len(chunks)} chunks | {label} / {voice_name}): "
-                    f"'{clean_text[:60]}{'...' if len(clean_text) > 60 else ''}'"
-                )
+                chunks = self._plan_chunks(clean_text, profile, is_mai)
+                jobs = [(chunk, profile, lang_code, idx, len(chunks)) for idx, chunk in enumerate(chunks)]
 
-                pcm_data = b""
-                success_count = 0
-
-                for idx, chunk in enumerate(chunks):
-                    # Try current voice profile
-                    ssml = self._build_natural_ssml_with_profile(chunk, profile)
-                    chunk_audio = self._synth_via_pool(ssml, voice_name, lang_code)
-
-                    # Transparent fallback per chunk
-                    if (not chunk_audio or len(chunk_audio) <= 46) and self._use_mai_voice_2 and is_mai:
-                        logger.warning(
-                            f"[CASUAL TTS] Chunk {idx+1}/{len(chunks)} failed on MAI-Voice-2. "
-                            f"Retrying chunk with standard Neural..."
-                        )
-                        fallback_profile = self._resolve_voice_profile(lang_code, try_mai=False)
-                        fallback_ssml = self._build_natural_ssml_with_profile(chunk, fallback_profile)
-                        chunk_audio = self._synth_via_pool(fallback_ssml, fallback_profile["voice"], lang_code)
-
-                    # WAV header is 44 bytes. Strip and append PCM
-                    if chunk_audio and len(chunk_audio) > 44:
-                        pcm_data += chunk_audio[44:]
-                        success_count += 1
-                    else:
-                        logger.warning(f"[CASUAL TTS] Chunk {idx+1}/{len(chunks)} failed completely.")
-
-                if success_count > 0:
-                    audio_data = self._create_wav_header(len(pcm_data)) + pcm_data
+                if self._parallel_chunks and len(chunks) > 1:
+                    # Order-preserving fan-out; the voice pool caps real concurrency
+                    chunk_audios = list(self._get_chunk_executor().map(lambda job: self._synth_chunk(*job), jobs))
                 else:
-                    audio_data = None
+                    chunk_audios = [self._synth_chunk(*job) for job in jobs]
 
-            elapsed_ms = (time.perf_counter() - t_start) * 1000
-            self._last_activity_time = time.time()
+                audio_data = self._join_chunks(chunk_audios)
 
-            # WAV header is ~46 bytes; anything ≤ that is effectively empty
-            if audio_data and len(audio_data) > 46:
-                duration_est = len(audio_data) / (24000 * 2)
-                logger.info(
-                    f"[CASUAL TTS ✓] {label} | "
-                    f"{len(audio_data):,} bytes | "
-                    f"~{duration_est:.1f}s audio | "
-                    f"{elapsed_ms:.0f}ms"
-                )
+            return self._finish_speech(audio_data, profile, lang_code, output_path, t_start)
+
+        except Exception as e:
+            self._evict_synthesizer(voice_name)
+            self._emit_failover(
+                "EXCEPTION",
+                f"{type(e).__name__}: {e}",
+                lang_code,
+            )
+            return None
+
+    async def speak_natural_async(
+        self,
+        text: str,
+        lang_code: str = "hi",
+        output_path: Optional[str] = None,
+    ) -> Optional[bytes]:
+        """
+        Async speak_natural: same SSML, chunking and MAI fallback, but each
+        synthesis awaits the SDK's completion event instead of pinning a
+        worker thread on `.get()`, and pool waits park a future.
+        """
+        import asyncio
+
+        plan = self._plan_speech(text, lang_code)
+        if plan is None:
+            return None
+        clean_text, profile, is_mai, should_chunk = plan
+        voice_name = profile["voice"]
 
-                if output_path:
-                    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-                    with open(output_path, "wb") as f:
-                        f.write(audio_data)
-                    logger.info(f"[CASUAL TTS] Saved: {output_path}")
+        try:
+            t_start = time.perf_counter()
+
+            if not should_chunk:
+                ssml = self._build_natural_ssml_with_profile(clean_text, profile)
+                audio_data = await self._synth_via_pool_async(ssml, voice_name, lang_code)
 
-                return audio_data
+                if (not audio_data or len(audio_data) <= 46) and self._use_mai_voice_2 and is_mai:
+                    profile = self._neural_fallback(clean_text, lang_code)
+                    voice_name = profile["voice"]
+                    ssml = self._build_natural_ssml_with_profile(clean_text, profile)
+                    audio_data = await self._synth_via_pool_async(ssml, voice_name, lang_code)
             else:
-                self._emit_failover(
-                    "EMPTY_AUDIO",
-                    f"Returned {len(audio_data) if audio_data else 0} bytes",
-                    lang_code,
-                )
-                return None
+                chunks = self._plan_chunks(clean_text, profile, is_mai)
+                jobs = [(chunk, profile, lang_code, idx, len(chunks)) for idx, chunk in enumerate(chunks)]
+
+                if self._parallel_chunks and len(chunks) > 1:
+                    chunk_audios = await asyncio.gather(*(self._synth_chunk_async(*job) for job in jobs))
+                else:
+                    chunk_audios = [await self._synth_chunk_async(*job) for job in jobs]
+
+                audio_data = self._join_chunks(chunk_audios)
+
+            return self._finish_speech(audio_data, profile, lang_code, output_path, t_start)
 
         except Exception as e:
             self._evict_synthesizer(voice_name)
@@ -636,33 +947,301 @@ class UniversalCasualIndianVoice:
             )
             return None
 
-    def _synth_via_pool(
-        self, ssml: str, voice_name: str, lang_code: str
-    ) -> Optional[bytes]:
+    async def stream_natural_async(self, text: str, lang_code: str = "hi"):
         """
-        Synthesize SSML using the pooled pre-warmed synthesizer.
-        Auto-retries once with a fresh connection on retryable errors.
+        Streaming speak_natural: an async iterator of raw 24 kHz / 16-bit
+        mono PCM pieces, fed by the SDK's `synthesizing` events as Azure
+        produces them. Long text is still split into chunks; all chunks
+        start synthesizing at once (bounded by the voice pool) and are
+        yielded strictly in order, so the first words play while later
+        chunks are still being generated.
         """
-        pool_entry = self._get_or_create_synthesizer(voice_name)
-        if not pool_entry:
+        import asyncio
+
+        plan = self._plan_speech(text, lang_code)
+        if plan is None:
+            return
+        clean_text, profile, is_mai, should_chunk = plan
+        pieces = self._plan_chunks(clean_text, profile, is_mai) if should_chunk else [clean_text]
+
+        async def produce(idx: int, piece: str, out: asyncio.Queue):
+            got_audio = False
+            try:
+                ssml = self._build_natural_ssml_with_profile(piece, profile)
+                async for pcm in self._stream_via_pool(ssml, profile["voice"], lang_code):
+                    got_audio = True
+                    out.put_nowait(pcm)
+                if not got_audio and self._use_mai_voice_2 and is_mai:
+                    fallback_profile = self._neural_fallback(piece, lang_code, idx if should_chunk else None, len(pieces))
+                    fallback_ssml = self._build_natural_ssml_with_profile(piece, fallback_profile)
+                    async for pcm in self._stream_via_pool(fallback_ssml, fallback_profile["voice"], lang_code):
+                        out.put_nowait(pcm)
+            finally:
+                out.put_nowait(None)
+
+        queues = [asyncio.Queue() for _ in pieces]
+        tasks = [asyncio.create_task(produce(i, piece, q)) for i, (piece, q) in enumerate(zip(pieces, queues))]
+        try:
+            for queue in queues:
+                while True:
+                    pcm = await queue.get()
+                    if pcm is None:
+                        break
+                    yield pcm
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._last_activity_time = time.time()
+
+    # ── speak_natural helpers (shared by the sync and async paths) ─────
+
+    def _plan_speech(self, text: str, lang_code: str) -> Optional[Tuple[str, dict, bool, bool]]:
+        """Returns (clean_text, profile, is_mai, should_chunk), or None if there is nothing to do."""
+        if not self.is_available:
             self._emit_failover(
-                "POOL_FAILED",
-                f"Cannot create synthesizer for {voice_name}",
+                "ENGINE_UNAVAILABLE",
+                "Azure TTS engine is not initialized",
                 lang_code,
             )
             return None
 
-        _, synthesizer, _ = pool_entry
-        result = synthesizer.speak_ssml_async(ssml).get()
+        clean_text = self._clean_text(text)
+        if not clean_text:
+            logger.warning("[CASUAL TTS] Empty text — skipping.")
+            return None
+
+        profile = self._resolve_voice_profile(lang_code, try_mai=self._use_mai_voice_2)
+
+        # Determine if we should chunk the text to avoid RTF timeouts
+        is_mai = ":MAI-Voice-2" in profile["voice"]
+        word_count = len(clean_text.split())
+        should_chunk = (is_mai and word_count > 6) or (word_count > 15)
+        return clean_text, profile, is_mai, should_chunk
+
+    def _plan_chunks(self, clean_text: str, profile: dict, is_mai: bool) -> list:
+        chunks = self._segment_text(clean_text, max_words=8 if is_mai else 12)
+        logger.info(
+            f"[CASUAL TTS] Speaking chunked ({len(chunks)} chunks | {profile['label']} / {profile['voice']}): "
+            f"'{clean_text[:60]}{'...' if len(clean_text) > 60 else ''}'"
+        )
+        return chunks
+
+    def _neural_fallback(self, text: str, lang_code: str, idx: Optional[int] = None, total: int = 0) -> dict:
+        """Standard Neural profile to retry with after a MAI-Voice-2 failure."""
+        if idx is None:
+            logger.warning(
+                f"[CASUAL TTS] MAI-Voice-2 synthesis failed/timed out for '{lang_code}'. "
+                f"Attempting transparent fallback to standard Neural voice..."
+            )
+        else:
+            logger.warning(
+                f"[CASUAL TTS] Chunk {idx+1}/{total} failed on MAI-Voice-2. "
+                f"Retrying chunk with standard Neural..."
+            )
+        profile = self._resolve_voice_profile(lang_code, try_mai=False)
+        if idx is None:
+            logger.info(
+                f"[CASUAL TTS Fallback] Speaking standard Neural ({profile['label']} / {profile['voice']}): "
+                f"'{text[:60]}{'...' if len(text) > 60 else ''}'"
+            )
+        return profile
+
+    def _synth_chunk(self, chunk: str, profile: dict, lang_code: str, idx: int, total: int) -> Optional[bytes]:
+        """One chunk on the current voice, with the per-chunk MAI → Neural fallback."""
+        ssml = self._build_natural_ssml_with_profile(chunk, profile)
+        chunk_audio = self._synth_via_pool(ssml, profile["voice"], lang_code)
+
+        # Transparent fallback per chunk
+        if (not chunk_audio or len(chunk_audio) <= 46) and self._use_mai_voice_2 and ":MAI-Voice-2" in profile["voice"]:
+            fallback_profile = self._neural_fallback(chunk, lang_code, idx, total)
+            fallback_ssml = self._build_natural_ssml_with_profile(chunk, fallback_profile)
+            chunk_audio = self._synth_via_pool(fallback_ssml, fallback_profile["voice"], lang_code)
+        return chunk_audio
+
+    async def _synth_chunk_async(self, chunk: str, profile: dict, lang_code: str, idx: int, total: int) -> Optional[bytes]:
+        ssml = self._build_natural_ssml_with_profile(chunk, profile)
+        chunk_audio = await self._synth_via_pool_async(ssml, profile["voice"], lang_code)
+
+        if (not chunk_audio or len(chunk_audio) <= 46) and self._use_mai_voice_2 and ":MAI-Voice-2" in profile["voice"]:
+            fallback_profile = self._neural_fallback(chunk, lang_code, idx, total)
+            fallback_ssml = self._build_natural_ssml_with_profile(chunk, fallback_profile)
+            chunk_audio = await self._synth_via_pool_async(fallback_ssml, fallback_profile["voice"], lang_code)
+        return chunk_audio
+
+    def _get_chunk_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._chunk_executor is None:
+            with self._pool_lock:
+                if self._chunk_executor is None:
+                    self._chunk_executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=CHUNK_WORKERS, thread_name_prefix="casual-tts-chunk"
+                    )
+        return self._chunk_executor
+
+    def _join_chunks(self, chunk_audios: list) -> Optional[bytes]:
+        """
+        Assemble per-chunk WAVs (in order) into one WAV with a single header.
+        The output buffer is allocated once at its final size and each
+        chunk's PCM is copied into place exactly once; None if all failed.
+        """
+        views = []
+        for idx, chunk_audio in enumerate(chunk_audios):
+            if chunk_audio and len(chunk_audio) > 44:
+                views.append(memoryview(chunk_audio)[44:])
+            else:
+                logger.warning(f"[CASUAL TTS] Chunk {idx+1}/{len(chunk_audios)} failed completely.")
+        if not views:
+            return None
+
+        pcm_len = sum(len(v) for v in views)
+        audio = bytearray(44 + pcm_len)
+        audio[:44] = self._create_wav_header(pcm_len)
+        offset = 44
+        for view in views:
+            audio[offset:offset + len(view)] = view
+            offset += len(view)
+        return bytes(audio)
+
+    def _finish_speech(
+        self, audio_data: Optional[bytes], profile: dict, lang_code: str, output_path: Optional[str], t_start: float
+    ) -> Optional[bytes]:
+        elapsed_ms = (time.perf_counter() - t_start) * 1000
+        self._last_activity_time = time.time()
+
+        # WAV header is ~46 bytes; anything ≤ that is effectively empty
+        if audio_data and len(audio_data) > 46:
+            duration_est = len(audio_data) / (24000 * 2)
+            logger.info(
+                f"[CASUAL TTS ✓] {profile['label']} | "
+                f"{len(audio_data):,} bytes | "
+                f"~{duration_est:.1f}s audio | "
+                f"{elapsed_ms:.0f}ms"
+            )
+
+            if output_path:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+                with open(output_path, "wb") as f:
+                    f.write(audio_data)
+                logger.info(f"[CASUAL TTS] Saved: {output_path}")
+
+            return audio_data
+
+        self._emit_failover(
+            "EMPTY_AUDIO",
+            f"Returned {len(audio_data) if audio_data else 0} bytes",
+            lang_code,
+        )
+        return None
+
+    # ── Pooled synthesis ───────────────────────────────────────────────
+
+    def _synth_via_pool(
+        self, ssml: str, voice_name: str, lang_code: str, is_retry: bool = False
+    ) -> Optional[bytes]:
+        """
+        Synthesize SSML on a checked-out pre-warmed synthesizer.
+        Auto-retries once with a fresh synthesizer on retryable errors.
+        """
+        entry = self._checkout(voice_name, lang_code, "RETRY_POOL_FAILED" if is_retry else "POOL_FAILED")
+        if entry is None:
+            return None
+
+        audio, discard, retry = None, True, False
+        try:
+            result = entry.synthesizer.speak_ssml_async(ssml).get()
+            audio, discard, retry = self._handle_result(result, voice_name, lang_code, is_retry)
+        finally:
+            self._checkin(voice_name, entry, discard)
+
+        if retry:
+            return self._synth_via_pool(ssml, voice_name, lang_code, is_retry=True)
+        return audio
+
+    async def _synth_via_pool_async(
+        self, ssml: str, voice_name: str, lang_code: str, is_retry: bool = False
+    ) -> Optional[bytes]:
+        """_synth_via_pool without a blocked thread: the result arrives via the synthesizer's events."""
+        import asyncio
+
+        entry = await self._checkout_async(voice_name, lang_code, "RETRY_POOL_FAILED" if is_retry else "POOL_FAILED")
+        if entry is None:
+            return None
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        entry.waiter = (loop, future)
+        audio, discard, retry = None, True, False
+        try:
+            entry.synthesizer.speak_ssml_async(ssml)  # returns immediately; see _PooledSynth.on_result
+            result = await asyncio.wait_for(future, SYNTH_TIMEOUT)
+            audio, discard, retry = self._handle_result(result, voice_name, lang_code, is_retry)
+        except asyncio.TimeoutError:
+            # The synthesizer may still be busy — never hand it to another request
+            self._emit_failover("SYNTH_TIMEOUT", f"{voice_name} gave no result in {SYNTH_TIMEOUT:g}s", lang_code)
+        finally:
+            entry.waiter = None
+            self._checkin(voice_name, entry, discard)
+
+        if retry:
+            return await self._synth_via_pool_async(ssml, voice_name, lang_code, is_retry=True)
+        return audio
+
+    async def _stream_via_pool(self, ssml: str, voice_name: str, lang_code: str, is_retry: bool = False):
+        """Yield PCM pieces for one SSML document as `synthesizing` events arrive."""
+        import asyncio
+
+        entry = await self._checkout_async(voice_name, lang_code, "RETRY_POOL_FAILED" if is_retry else "POOL_FAILED")
+        if entry is None:
+            return
 
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        entry.stream = (loop, queue)
+        discard, retry, yielded = True, False, False
+        try:
+            entry.synthesizer.speak_ssml_async(ssml)
+            while True:
+                item = await asyncio.wait_for(queue.get(), SYNTH_TIMEOUT)
+                if not isinstance(item, bytes):
+                    audio, discard, retry = self._handle_result(item, voice_name, lang_code, is_retry)
+                    if audio and not yielded and len(audio) > 44:
+                        yield audio[44:]  # no incremental events came through — send the whole clip
+                    break
+                if not yielded and item[:4] == b"RIFF":
+                    item = item[44:]  # the first piece carries the RIFF header
+                if item:
+                    yielded = True
+                    yield item
+        except asyncio.TimeoutError:
+            self._emit_failover("SYNTH_TIMEOUT", f"{voice_name} stalled for {SYNTH_TIMEOUT:g}s", lang_code)
+        finally:
+            # Also reached when the consumer stops early; a synthesizer still speaking is discarded
+            entry.stream = None
+            self._checkin(voice_name, entry, discard)
+
+        if retry and not yielded:
+            async for pcm in self._stream_via_pool(ssml, voice_name, lang_code, is_retry=True):
+                yield pcm
+
+    def _handle_result(self, result, voice_name: str, lang_code: str, is_retry: bool) -> Tuple[Optional[bytes], bool, bool]:
+        """Classify an SDK result. Returns (audio, discard_synthesizer, retry)."""
         if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            return result.audio_data
+            if is_retry:
+                logger.info(f"[CASUAL TTS ✓] Retry SUCCESS: {voice_name}")
+            return result.audio_data, False, False
 
         # ── Handle failure ───────────────────────────────────────────
         cancellation = result.cancellation_details
         error_code = str(cancellation.error_code) if cancellation else "UNKNOWN"
         error_msg = cancellation.error_details if cancellation else "No details"
 
+        if is_retry:
+            self._emit_failover(
+                "RETRY_FAILED", f"Retry also failed: {error_msg}", lang_code
+            )
+            return None, True, False
+
         # Retryable errors: timeout, stale connection, WebSocket reset
         is_retryable = any(
             kw in str(error_msg) + str(error_code)
@@ -672,10 +1251,9 @@ class UniversalCasualIndianVoice:
         if is_retryable:
             logger.warning(
                 f"[CASUAL TTS] Retryable error for {voice_name} — "
-                f"evicting and retrying..."
+                f"discarding synthesizer and retrying..."
             )
-            self._evict_synthesizer(voice_name)
-            return self._retry_synth(ssml, voice_name, lang_code)
+            return None, True, True
 
         # Non-retryable
         if "429" in str(error_msg) or "TooManyRequests" in str(error_msg):
@@ -684,48 +1262,21 @@ class UniversalCasualIndianVoice:
                 f"S0 tier rate limit: {error_msg}",
                 lang_code,
             )
-        elif "Forbidden" in error_code:
+            return None, False, False
+        if "Forbidden" in error_code:
             self._emit_failover(
                 "AUTH_FORBIDDEN",
                 f"Key invalid or quota exhausted: {error_msg}",
                 lang_code,
             )
-        else:
-            self._evict_synthesizer(voice_name)
-            self._emit_failover(
-                f"CANCELLED_{error_code}",
-                f"{error_msg}",
-                lang_code,
-            )
-        return None
-
-    def _retry_synth(
-        self, ssml: str, voice_name: str, lang_code: str
-    ) -> Optional[bytes]:
-        """Single retry with a freshly created + warmed synthesizer."""
-        pool_entry = self._get_or_create_synthesizer(voice_name)
-        if not pool_entry:
-            self._emit_failover(
-                "RETRY_POOL_FAILED",
-                f"Cannot recreate synthesizer for {voice_name}",
-                lang_code,
-            )
-            return None
-
-        _, synthesizer, _ = pool_entry
-        result = synthesizer.speak_ssml_async(ssml).get()
-
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            logger.info(f"[CASUAL TTS ✓] Retry SUCCESS: {voice_name}")
-            return result.audio_data
+            return None, False, False
 
-        cancellation = result.cancellation_details
-        error_msg = cancellation.error_details if cancellation else "Unknown"
-        self._evict_synthesizer(voice_name)
         self._emit_failover(
-            "RETRY_FAILED", f"Retry also failed: {error_msg}", lang_code
+            f"CANCELLED_{error_code}",
+            f"{error_msg}",
+            lang_code,
         )
-        return None
+        return None, True, False
 
     # ═══════════════════════════════════════════════════════════════════
     #  FAILOVER CASCADE & UTILITIES
@@ -838,15 +1389,50 @@ class UniversalCasualIndianVoice:
         self._keepalive_stop.set()
         if self._keepalive_thread and self._keepalive_thread.is_alive():
             self._keepalive_thread.join(timeout=3)
+        if self._chunk_executor is not None:
+            self._chunk_executor.shutdown(wait=False)
+            self._chunk_executor = None
         with self._pool_lock:
-            for _, (_, _, conn) in self._synth_pool.items():
-                try:
-                    conn.close()
-                except Exception:
-                    pass
+            pools = list(self._synth_pool.values())
             self._synth_pool.clear()
+        for pool in pools:
+            for entry in pool.drain_idle():
+                entry.close()
         logger.info("[CASUAL TTS] Engine shut down.")
 
 
-# ── Module-level singleton (import-ready, hi + ta + en_in pre-warmed) ─────
-casual_voice_engine = UniversalCasualIndianVoice()
+class _LazyVoiceEngine:
+    """
+    Module-level singleton handle. The engine (SDK import + hi/ta/en_in
+    pre-warm) is constructed on first use instead of at import time;
+    app startup calls `get()` in a worker thread to warm it off the event loop.
+    """
+
+    def __init__(self):
+        self._engine: Optional[UniversalCasualIndianVoice] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._engine is not None
+
+    def get(self) -> UniversalCasualIndianVoice:
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = UniversalCasualIndianVoice()
+        return self._engine
+
+    async def speak_natural_async(self, *args, **kwargs) -> Optional[bytes]:
+        # First use builds + pre-warms the engine — keep that off the event loop
+        import asyncio
+
+        engine = self._engine or await asyncio.to_thread(self.get)
+        return await engine.speak_natural_async(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+# ── Module-level singleton (lazy, hi + ta + en_in pre-warmed on first use) ─
+casual_voice_engine = _LazyVoiceEngine()
@@ -0,0 +1,397 @@
+"""
+Plant Disease Classifier Service — EventHorizon AI
+=====================================================
+Owns loading of the PlantVillage image classifier
+(`Abuzaid01/plant-disease-classifier`) so every worker does not hold its
+own private fp32 copy.
+
+Share modes (CLASSIFIER_SHARE_MODE):
+  • "mmap" (default) — the first load exports the weights once to a
+    persistent state-dict file in CLASSIFIER_CACHE_DIR, named after the
+    checkpoint revision so a new checkpoint gets a fresh export; every
+    worker then memory-maps that file (torch.load(mmap=True) +
+    load_state_dict(assign=True)), so the weight pages live in the OS page
+    cache and are shared read-only. A model left with any tensor on the
+    meta device falls back to the per-worker load.
+  • "prefork" — gunicorn loads the model in the master before forking
+    (see gunicorn.conf.py); workers inherit the tensors copy-on-write.
+  • "per_worker" — legacy behaviour: each worker runs from_pretrained.
+
+Downloads go to CLASSIFIER_CACHE_DIR (default ./model_cache) instead of a
+temp dir, so restarts do not re-download the model.
+
+Backends (CLASSIFIER_BACKEND):
+  • "torch" (default) — the HF PyTorch model, loaded per SHARE_MODE above.
+  • "onnx" / "onnx-int8" — onnxruntime on an exported copy of the model,
+    optionally with dynamic int8 weights and NumPy preprocessing
+    (see onnx_classifier). Falls back to torch if the export/load fails.
+
+Inference goes through ClassifierBatcher: concurrent /analyze-plant requests
+are coalesced into one forward pass under torch.inference_mode, with torch's
+intra-op thread count set once (CLASSIFIER_TORCH_THREADS).
+"""
+
+import os
+import re
+import time
+import hashlib
+import threading
+import logging
+from typing import Optional, Tuple, Dict, Any
+
+logger = logging.getLogger("eventhorizon.classifier")
+
+MODEL_NAME = os.getenv("CLASSIFIER_MODEL_NAME", "Abuzaid01/plant-disease-classifier")
+MODEL_CACHE_DIR = os.path.abspath(os.getenv("CLASSIFIER_CACHE_DIR", os.path.join(os.getcwd(), "model_cache")))
+SHARE_MODE = os.getenv("CLASSIFIER_SHARE_MODE", "mmap").strip().lower()
+BACKEND = os.getenv("CLASSIFIER_BACKEND", "torch").strip().lower()
+
+# Micro-batching: wait up to BATCH_MAX_WAIT_MS to fill a batch of BATCH_MAX_SIZE
+BATCH_MAX_SIZE = int(os.getenv("CLASSIFIER_BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = float(os.getenv("CLASSIFIER_BATCH_MAX_WAIT_MS", "8"))
+TORCH_THREADS = int(os.getenv("CLASSIFIER_TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 2) - 1)
+
+# Hugging Face downloads land in the persistent cache unless explicitly overridden
+os.environ.setdefault("HF_HOME", os.path.join(MODEL_CACHE_DIR, "hf"))
+
+_lock = threading.Lock()
+_loaded: Optional[Tuple[Any, Any]] = None  # (processor, model)
+memory_report: Dict[str, Any] = {}
+
+
+# ──────────────────────────────────────────────────────────────
+# Memory accounting
+# ──────────────────────────────────────────────────────────────
+
+def get_memory_mb() -> Dict[str, float]:
+    """
+    RSS / PSS / shared memory of this process in MB (Linux /proc; empty
+    elsewhere). PSS divides shared pages between the processes mapping
+    them, so it is the honest per-worker cost when weights are shared.
+    """
+    stats: Dict[str, float] = {}
+    for path, fields in (
+        ("/proc/self/smaps_rollup", ("Rss", "Pss", "Shared_Clean", "Shared_Dirty")),
+        ("/proc/self/status", ("VmRSS",)),
+    ):
+        try:
+            with open(path) as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in fields:
+                        stats[key] = round(int(rest.split()[0]) / 1024, 1)
+        except (OSError, ValueError, IndexError):
+            continue
+    if "Rss" not in stats and "VmRSS" in stats:
+        stats["Rss"] = stats["VmRSS"]
+    stats.pop("VmRSS", None)
+    return stats
+
+
+# ──────────────────────────────────────────────────────────────
+# Loading
+# ──────────────────────────────────────────────────────────────
+
+def _checkpoint_revision(config, model_name: str = MODEL_NAME) -> str:
+    """Hub commit of the checkpoint, or a fingerprint of a local model directory."""
+    commit = getattr(config, "_commit_hash", None)
+    if commit:
+        return commit[:12]
+    if os.path.isdir(model_name):
+        digest = hashlib.sha1()
+        for name in sorted(os.listdir(model_name)):
+            st = os.stat(os.path.join(model_name, name))
+            digest.update(f"{name}:{st.st_size}:{st.st_mtime_ns}".encode())
+        return digest.hexdigest()[:12]
+    return "unversioned"
+
+
+def _state_dict_path(revision: str) -> str:
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "__", MODEL_NAME)
+    return os.path.join(MODEL_CACHE_DIR, "shared", f"{safe_name}@{revision}.pt")
+
+
+def _remove_stale_exports(current: str):
+    """
+    Delete exports of other revisions next to `current` (a
+    "{name}@{revision}.ext" file): the other state dicts, or for ONNX the
+    other .onnx / .int8.onnx / .json files.
+    """
+    safe_name, _, rest = os.path.basename(current).rpartition("@")
+    prefix, revision = safe_name + "@", rest.split(".", 1)[0]
+    folder = os.path.dirname(current)
+    for name in os.listdir(folder):
+        path = os.path.join(folder, name)
+        if name.startswith(prefix) and name[len(prefix):].split(".", 1)[0] != revision:
+            try:
+                os.remove(path)  # workers still mapping it keep their pages until they exit
+                logger.info(f"[CLASSIFIER] Removed stale export {path}")
+            except OSError:
+                pass
+
+
+def _load_per_worker():
+    from transformers import AutoImageProcessor, AutoModelForImageClassification
+
+    proc = AutoImageProcessor.from_pretrained(MODEL_NAME)
+    mod = AutoModelForImageClassification.from_pretrained(MODEL_NAME)
+    mod.eval()
+    return proc, mod
+
+
+def _load_mmap():
+    import torch
+    from transformers import AutoConfig, AutoImageProcessor, AutoModelForImageClassification
+
+    proc = AutoImageProcessor.from_pretrained(MODEL_NAME)
+    config = AutoConfig.from_pretrained(MODEL_NAME)
+    path = _state_dict_path(_checkpoint_revision(config))
+
+    if not os.path.exists(path):
+        # First worker on this host exports the weights; write-then-rename so
+        # concurrently starting workers never map a partial file.
+        model = AutoModelForImageClassification.from_pretrained(MODEL_NAME)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        torch.save(model.state_dict(), tmp_path)
+        os.replace(tmp_path, path)
+        del model
+        logger.info(f"[CLASSIFIER] Exported shared weights to {path}")
+        _remove_stale_exports(path)
+
+    with torch.device("meta"):
+        model = AutoModelForImageClassification.from_config(config)
+    state_dict = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    # assign=True keeps the mmap-backed tensors instead of copying into fresh params
+    model.load_state_dict(state_dict, assign=True)
+    # Non-persistent buffers aren't in the state dict and would stay on meta,
+    # failing only at the first inference — catch that here so _load_torch falls back
+    on_meta = [name for name, t in (*model.named_parameters(), *model.named_buffers()) if t.is_meta]
+    if on_meta:
+        raise RuntimeError(f"{len(on_meta)} tensors left on the meta device (e.g. {on_meta[0]})")
+    model.eval()
+    return proc, model
+
+
+def _load_torch() -> Tuple[Tuple[Any, Any], str]:
+    mode = SHARE_MODE
+    try:
+        if mode in ("mmap", "prefork"):
+            return _load_mmap(), mode
+        return _load_per_worker(), mode
+    except Exception as e:
+        if mode == "per_worker":
+            raise
+        logger.warning(f"[CLASSIFIER] {mode} load failed ({e}); falling back to per-worker load")
+        return _load_per_worker(), "per_worker"
+
+
+def _load_backend() -> Tuple[Tuple[Any, Any], str, str]:
+    """Returns ((processor, model), backend, share_mode)."""
+    if BACKEND in ("onnx", "onnx-int8"):
+        try:
+            from app.services.onnx_classifier import load_onnx_classifier
+            loaded = load_onnx_classifier(MODEL_NAME, MODEL_CACHE_DIR, quantize=BACKEND == "onnx-int8", num_threads=TORCH_THREADS)
+            return loaded, BACKEND, "per_worker"
+        except Exception as e:
+            logger.warning(f"[CLASSIFIER] {BACKEND} backend unavailable ({e}); falling back to torch")
+    loaded, mode = _load_torch()
+    return loaded, "torch", mode
+
+
+def load_shared_classifier() -> Tuple[Any, Any]:
+    """
+    Load (or return the already-loaded) (processor, model) pair for this
+    process according to BACKEND / SHARE_MODE, recording RSS before/after.
+    Blocking — call from a worker thread or the gunicorn master.
+    """
+    global _loaded
+    if _loaded is not None:
+        return _loaded
+
+    with _lock:
+        if _loaded is not None:
+            return _loaded
+
+        before = get_memory_mb()
+        t0 = time.perf_counter()
+        loaded, backend, mode = _load_backend()
+
+        after = get_memory_mb()
+        memory_report.update({
+            "pid": os.getpid(),
+            "model": MODEL_NAME,
+            "backend": backend,
+            "share_mode": mode,
+            "load_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "before_mb": before,
+            "after_mb": after,
+        })
+        print(f"[CLASSIFIER] pid={os.getpid()} backend={backend} mode={mode} "
+              f"RSS {before.get('Rss', '?')}MB -> {after.get('Rss', '?')}MB "
+              f"(PSS {after.get('Pss', '?')}MB, shared {after.get('Shared_Clean', '?')}MB)")
+        _loaded = loaded
+        return _loaded
+
+
+def is_loaded() -> bool:
+    return _loaded is not None
+
+
+def get_classifier_status() -> Dict[str, Any]:
+    """Current share mode, load report and live memory for this worker."""
+    return {
+        "loaded": is_loaded(),
+        "model": MODEL_NAME,
+        "backend": BACKEND,
+        "share_mode": SHARE_MODE,
+        "cache_dir": MODEL_CACHE_DIR,
+        "load_report": dict(memory_report),
+        "memory_now_mb": get_memory_mb(),
+        "batching": {
+            "max_batch": BATCH_MAX_SIZE,
+            "max_wait_ms": BATCH_MAX_WAIT_MS,
+            "torch_threads": TORCH_THREADS,
+            **{k: v for b in _batchers.values() for k, v in b.stats.items()},
+        },
+    }
+
+
+# ──────────────────────────────────────────────────────────────
+# Micro-batching inference
+# ──────────────────────────────────────────────────────────────
+
+_torch_configured = False
+
+
+def configure_torch_threads():
+    """Pin torch intra-op threads once per process (left at 1 core for the event loop)."""
+    global _torch_configured
+    if _torch_configured:
+        return
+    import torch
+    torch.set_num_threads(TORCH_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already fixed once parallel work has started in this process
+        pass
+    _torch_configured = True
+
+
+def run_batch_inference(proc, mod, images) -> list:
+    """
+    One batched forward pass. Returns [(top_class_idx, confidence), ...]
+    in input order. `images` are PIL RGB images.
+    """
+    if hasattr(mod, "predict_batch"):
+        # ONNX backend: NumPy preprocessing + onnxruntime session
+        return mod.predict_batch(images)
+
+    import torch
+
+    configure_torch_threads()
+    inputs = proc(images=images, return_tensors="pt")
+    with torch.inference_mode():
+        logits = mod(**inputs).logits
+        probabilities = torch.nn.functional.softmax(logits, dim=-1)
+        confidences, indices = probabilities.max(dim=-1)
+    return list(zip(indices.tolist(), confidences.tolist()))
+
+
+class ClassifierBatcher:
+    """
+    Collects classification requests for up to BATCH_MAX_WAIT_MS or
+    BATCH_MAX_SIZE images, runs a single batched forward pass in a worker
+    thread and scatters the results back to each caller. One batch is in
+    flight at a time so torch's intra-op threads are not oversubscribed.
+    """
+
+    def __init__(self, proc, mod, max_batch: int = BATCH_MAX_SIZE, max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        import asyncio
+
+        self.proc = proc
+        self.mod = mod
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "asyncio.Queue" = asyncio.Queue()
+        self._runner: Optional["asyncio.Task"] = None
+        self.stats = {"requests": 0, "batches": 0, "images": 0, "max_batch_seen": 0}
+
+    async def classify(self, image_bytes: bytes) -> Tuple[int, float]:
+        """Returns (top_class_idx, confidence) for one image."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._runner is None or self._runner.done():
+            self._runner = loop.create_task(self._run())
+        fut = loop.create_future()
+        self.stats["requests"] += 1
+        await self._queue.put((image_bytes, fut))
+        return await fut
+
+    async def _run(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            self.stats["batches"] += 1
+            self.stats["images"] += len(batch)
+            self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch):
+        import asyncio
+        import io
+
+        def _decode_and_infer():
+            from PIL import Image
+
+            decoded, results = [], [None] * len(batch)
+            for i, (image_bytes, _) in enumerate(batch):
+                try:
+                    decoded.append((i, Image.open(io.BytesIO(image_bytes)).convert("RGB")))
+                except Exception as e:
+                    results[i] = e
+            if decoded:
+                outputs = run_batch_inference(self.proc, self.mod, [img for _, img in decoded])
+                for (i, _), out in zip(decoded, outputs):
+                    results[i] = out
+            return results
+
+        try:
+            results = await asyncio.to_thread(_decode_and_infer)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, fut), res in zip(batch, results):
+            if fut.done():
+                continue
+            if isinstance(res, Exception):
+                fut.set_exception(res)
+            else:
+                fut.set_result(res)
+
+
+_batchers: Dict[int, ClassifierBatcher] = {}
+
+
+def get_inference_batcher(proc, mod) -> ClassifierBatcher:
+    """Shared batcher for a loaded (processor, model) pair."""
+    batcher = _batchers.get(id(mod))
+    if batcher is None or batcher.mod is not mod:
+        batcher = ClassifierBatcher(proc, mod)
+        _batchers.clear()
+        _batchers[id(mod)] = batcher
+    return batcher
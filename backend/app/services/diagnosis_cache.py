@@ -0,0 +1,243 @@
+"""
+Diagnosis Result Cache — EventHorizon AI
+==========================================
+Farmers on flaky 2G links re-upload the same (or a re-compressed, slightly
+cropped) leaf photo over and over. This cache keys diagnosis results by
+perceptual image hashes so a retry returns instantly instead of re-running
+vision inference, price search, translation and TTS.
+
+  • Each image gets a 64-bit pHash (DCT of a 32×32 grey thumbnail) and a
+    64-bit dHash (horizontal gradient of a 9×8 thumbnail). Two images
+    match when both Hamming distances are within the thresholds
+    (DIAG_CACHE_PHASH_DISTANCE / DIAG_CACHE_DHASH_DISTANCE).
+  • An entry holds a language-independent *base* (e.g. the vision
+    diagnosis + remedy price) and per-language *variants* (the fully
+    translated/spoken response), so a Hindi request for a photo first
+    diagnosed in Telugu only re-runs translation and TTS.
+  • Entries expire after DIAG_CACHE_TTL (default 24h, remedy prices move)
+    and the cache is LRU-bounded by DIAG_CACHE_MAX_ENTRIES.
+"""
+
+import io
+import os
+import copy
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger("eventhorizon.diagnosis_cache")
+
+TTL_SECONDS = int(os.getenv("DIAG_CACHE_TTL", str(24 * 3600)))
+MAX_ENTRIES = int(os.getenv("DIAG_CACHE_MAX_ENTRIES", "512"))
+PHASH_DISTANCE = int(os.getenv("DIAG_CACHE_PHASH_DISTANCE", "8"))
+DHASH_DISTANCE = int(os.getenv("DIAG_CACHE_DHASH_DISTANCE", "10"))
+ENABLED = os.getenv("DIAG_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+_DCT_SIZE = 32
+_dct_matrix = None
+
+
+# ──────────────────────────────────────────────────────────────
+# Perceptual hashes
+# ──────────────────────────────────────────────────────────────
+
+def _bits_to_int(bits) -> int:
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bool(bit))
+    return value
+
+
+def _dct_2d(pixels):
+    import numpy as np
+
+    global _dct_matrix
+    if _dct_matrix is None:
+        n = np.arange(_DCT_SIZE)
+        k = n.reshape(-1, 1)
+        _dct_matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * _DCT_SIZE))
+    return _dct_matrix @ pixels @ _dct_matrix.T
+
+
+def image_hashes(image_bytes: bytes) -> Tuple[int, int]:
+    """Return (phash, dhash) for an encoded image. Blocking — run in a thread."""
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        grey = img.convert("L")
+
+        # pHash: low-frequency 8×8 DCT block compared against its median (DC excluded)
+        thumb = np.asarray(grey.resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS), dtype=np.float64)
+        low = _dct_2d(thumb)[:8, :8].flatten()
+        phash = _bits_to_int(low > np.median(low[1:]))
+
+        # dHash: is each pixel brighter than its right-hand neighbour?
+        small = np.asarray(grey.resize((9, 8), Image.LANCZOS), dtype=np.int16)
+        dhash = _bits_to_int((small[:, 1:] > small[:, :-1]).flatten())
+
+    return phash, dhash
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+# ──────────────────────────────────────────────────────────────
+# Cache
+# ──────────────────────────────────────────────────────────────
+
+class _Entry:
+    __slots__ = ("namespace", "phash", "dhash", "base", "variants", "created")
+
+    def __init__(self, namespace: str, phash: int, dhash: int):
+        self.namespace = namespace
+        self.phash = phash
+        self.dhash = dhash
+        self.base: Optional[Dict[str, Any]] = None
+        self.variants: Dict[str, Dict[str, Any]] = {}
+        self.created = time.time()
+
+    @property
+    def id(self) -> str:
+        return f"{self.phash:016x}{self.dhash:016x}"
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.namespace, self.id
+
+
+class DiagnosisCache:
+    """
+    Perceptual-hash keyed store of diagnosis results. Entries are scoped by
+    namespace (endpoint + query/location) and share one global LRU bound.
+    """
+
+    def __init__(self, ttl_seconds: int = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self.stats = {
+            "lookups": 0,
+            "variant_hits": 0,
+            "near_duplicate_hits": 0,
+            "base_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    async def fingerprint(self, image_bytes: bytes) -> Optional[Tuple[int, int]]:
+        """Hash off the event loop; None if the image cannot be decoded (cache bypassed)."""
+        import asyncio
+
+        if not ENABLED or not image_bytes:
+            return None
+        try:
+            return await asyncio.to_thread(image_hashes, image_bytes)
+        except Exception as e:
+            logger.warning(f"[DiagCache] Could not hash image, bypassing cache: {e}")
+            return None
+
+    def _find(self, namespace: str, fp: Tuple[int, int]) -> Tuple[Optional[_Entry], bool]:
+        """Returns (entry, exact) for the closest live entry within thresholds."""
+        entries = self._entries
+        phash, dhash = fp
+        now = time.time()
+
+        exact = entries.get((namespace, f"{phash:016x}{dhash:016x}"))
+        if exact is not None and now - exact.created < self.ttl:
+            entries.move_to_end(exact.key)
+            return exact, True
+
+        best, best_dist, expired = None, None, []
+        for key, entry in entries.items():
+            if now - entry.created >= self.ttl:
+                expired.append(key)
+                continue
+            if entry.namespace != namespace:
+                continue
+            dp = hamming(phash, entry.phash)
+            if dp > PHASH_DISTANCE or hamming(dhash, entry.dhash) > DHASH_DISTANCE:
+                continue
+            if best_dist is None or dp < best_dist:
+                best, best_dist = entry, dp
+        for key in expired:
+            del entries[key]
+        if best is not None:
+            entries.move_to_end(best.key)
+        return best, False
+
+    def lookup(self, namespace: str, fp: Optional[Tuple[int, int]], variant: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Returns (variant_result, base). variant_result is a ready response
+        for this language/variant; base is the language-independent part
+        when only that is cached. Both are copies.
+        """
+        if fp is None:
+            return None, None
+        self.stats["lookups"] += 1
+        entry, exact = self._find(namespace, fp)
+        if entry is not None and variant in entry.variants:
+            self.stats["variant_hits"] += 1
+            if not exact:
+                self.stats["near_duplicate_hits"] += 1
+            return copy.deepcopy(entry.variants[variant]), None
+        if entry is not None and entry.base is not None:
+            self.stats["base_hits"] += 1
+            return None, copy.deepcopy(entry.base)
+        self.stats["misses"] += 1
+        return None, None
+
+    def store(self, namespace: str, fp: Optional[Tuple[int, int]], variant: str,
+              result: Dict[str, Any], base: Optional[Dict[str, Any]] = None):
+        """Store a finished response (and optionally its language-independent base)."""
+        if fp is None:
+            return
+        entry, _ = self._find(namespace, fp)
+        if entry is None:
+            entry = _Entry(namespace, *fp)
+            self._entries[entry.key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        if base is not None:
+            entry.base = copy.deepcopy(base)
+        entry.variants[variant] = copy.deepcopy(result)
+        self.stats["stores"] += 1
+
+    def invalidate(self, namespace: Optional[str] = None, entry_id: Optional[str] = None) -> int:
+        """Drop one entry, one namespace, or everything. Returns the number of entries removed."""
+        doomed = [
+            key for key, entry in self._entries.items()
+            # "diagnose" also matches its per-query sub-namespaces ("diagnose|…")
+            if (not namespace or entry.namespace == namespace or entry.namespace.startswith(namespace + "|"))
+            and (not entry_id or entry.id == entry_id)
+        ]
+        for key in doomed:
+            del self._entries[key]
+        self.stats["invalidations"] += len(doomed)
+        return len(doomed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        hits = self.stats["variant_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "partial_hit_rate": round(self.stats["base_hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "enabled": ENABLED,
+            "ttl_s": self.ttl,
+            "thresholds": {"phash": PHASH_DISTANCE, "dhash": DHASH_DISTANCE},
+        }
+
+
+def variant_key(*parts: Optional[str]) -> str:
+    """Normalise the request parameters that change the response (language, query, …)."""
+    return "|".join(" ".join(str(p).lower().split()) if p else "" for p in parts)
+
+
+diagnosis_cache = DiagnosisCache()
@@ -24,6 +24,9 @@ GEMINI_FALLBACK_MODELS = [
     "gemini-1.5-flash"
 ]
 
+# Reply when every model failed — never worth caching
+NETWORK_ERROR_REPLY = "நண்பா, ஏதோ சின்ன நெட்வொர்க் பிரச்சனை. மீண்டும் ஒருமுறை சொல்லுங்க! (Network error, please try again)"
+
 # Preset names mapped to Natural Languages
 LANGUAGE_NAMES = {
     "ta": "Tamil (தமிழ்)",
@@ -38,7 +41,7 @@ LANGUAGE_NAMES = {
     "en": "English",
 }
 
-def build_system_prompt(context: str = "general", detected_language: str = "en") -> str:
+def build_system_prompt(context: str = "general", detected_language: str = "en", memory: Optional[str] = None) -> str:
     """
     Build system prompt to establish the highly detailed village-friend persona ('Horizon').
     """
@@ -162,6 +165,9 @@ Voice mode → Plain flowing sentences only, no special characters
     elif context == "page_analysis":
         base_persona += "\n\nFOCUS: The user is asking about the context of the page they are viewing. First say what page the user is on, in 1 simple sentence, and ask what they want to know. End with: 'Enna doubt? Kelunga!' (in their language)."
 
+    if memory:
+        base_persona += f"\n\n## EARLIER CONVERSATION (summary of older turns not included below)\n{memory}"
+
     return base_persona
 
 class GeminiService:
@@ -182,14 +188,16 @@ class GeminiService:
         context: str = "general",
         detected_language: str = "en",
         history: Optional[List[Dict[str, str]]] = None,
+        memory: Optional[str] = None,
     ) -> str:
         """
         Generate a text response from Gemini using primary and fallback models.
+        `memory` is the compacted summary of earlier turns (history_manager).
         """
         if not self.enabled:
             return self._mock_response(message)
 
-        system_prompt = build_system_prompt(context, detected_language)
+        system_prompt = build_system_prompt(context, detected_language, memory)
         contents = self._build_contents_payload(message, history)
         
         models_to_try = [GEMINI_BRAIN_MODEL] + GEMINI_FALLBACK_MODELS
@@ -212,7 +220,7 @@ class GeminiService:
             except Exception as e:
                 print(f"[GEMINI BRAIN EXCEPTION] Model {model} failed: {e}")
 
-        return "நண்பா, ஏதோ சின்ன நெட்வொர்க் பிரச்சனை. மீண்டும் ஒருமுறை சொல்லுங்க! (Network error, please try again)"
+        return NETWORK_ERROR_REPLY
 
     def generate_response_stream(
         self,
@@ -220,10 +228,11 @@ class GeminiService:
         context: str = "general",
         detected_language: str = "en",
         history: Optional[List[Dict[str, str]]] = None,
+        memory: Optional[str] = None,
     ):
         """
         Stream a text response from Gemini using primary and fallback models.
-        Yields text chunks.
+        Yields text chunks. `memory` as in generate_response.
         """
         if not self.enabled:
             mock_res = self._mock_response(message)
@@ -231,7 +240,7 @@ class GeminiService:
                 yield chunk + " "
             return
 
-        system_prompt = build_system_prompt(context, detected_language)
+        system_prompt = build_system_prompt(context, detected_language, memory)
         contents = self._build_contents_payload(message, history)
         
         models_to_try = [GEMINI_BRAIN_MODEL] + GEMINI_FALLBACK_MODELS
@@ -272,7 +281,7 @@ class GeminiService:
             except Exception as e:
                 print(f"[GEMINI BRAIN STREAM EXCEPTION] Model {model} failed: {e}")
 
-        yield "நண்பா, ஏதோ சின்ன நெட்வொர்க் பிரச்சனை. மீண்டும் ஒருமுறை சொல்லுங்க! (Network error, please try again)"
+        yield NETWORK_ERROR_REPLY
 
     def generate_tts(self, text: str, language: str = "en") -> Optional[bytes]:
         """
@@ -374,6 +383,48 @@ class GeminiService:
                 
         return None
 
+    def generate_tts_stream(self, text: str, language: str = "en"):
+        """
+        Streaming TTS: yields (raw_pcm_bytes, sample_rate) as the audio parts
+        of a streamGenerateContent SSE response arrive, instead of waiting
+        for the whole clip like generate_tts. Yields nothing on failure.
+        """
+        if not self.enabled or not GEMINI_API_KEY:
+            return
+
+        payload = {
+            "contents": [{"parts": [{"text": text}]}],
+            "generationConfig": {
+                "responseModalities": ["AUDIO"],
+                "speechConfig": {"voiceConfig": {"prebuiltVoiceConfig": {"voiceName": "Kore"}}},
+            },
+        }
+        model = "gemini-3.1-flash-tts-preview"
+        try:
+            url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:streamGenerateContent?key={GEMINI_API_KEY}&alt=sse"
+            response = self._session.post(url, json=payload, timeout=10, stream=True)
+            if response.status_code != 200:
+                print(f"[GEMINI TTS STREAM WARNING] Model {model} failed with status {response.status_code}")
+                return
+            for line in response.iter_lines():
+                if not line or not line.startswith(b"data: "):
+                    continue
+                parts = json.loads(line[6:]).get("candidates", [{}])[0].get("content", {}).get("parts", [])
+                for part in parts:
+                    inline = part.get("inlineData") or {}
+                    if not inline.get("data"):
+                        continue
+                    mime_type = inline.get("mimeType", "")
+                    sample_rate = 24000
+                    if "rate=" in mime_type:
+                        try:
+                            sample_rate = int(mime_type.split("rate=")[1].split(";")[0].strip())
+                        except ValueError:
+                            pass
+                    yield base64.b64decode(inline["data"]), sample_rate
+        except Exception as e:
+            print(f"[GEMINI TTS STREAM EXCEPTION] Model {model} exception: {e}")
+
     def _build_contents_payload(self, message: str, history: Optional[List[Dict[str, str]]]) -> List[Dict[str, Any]]:
         contents: List[Dict[str, Any]] = []
         if history:
@@ -392,6 +443,40 @@ class GeminiService:
         })
         return contents
 
+    def summarize_conversation(self, turns: List[Dict[str, str]], previous_summary: str = "") -> Optional[str]:
+        """
+        Fold older chat turns (and the previous summary) into a compact memory
+        string for history_manager. None if no model answered.
+        """
+        if not self.enabled:
+            return None
+
+        transcript = "\n".join(
+            f"{'Horizon' if t.get('role') in ('assistant', 'model', 'ai') else 'Farmer'}: {t.get('content', '')}"
+            for t in turns
+        )
+        prompt = (
+            "Update the running memory of a chat between a farmer and the assistant 'Horizon'.\n"
+            "Keep only what matters for later turns: the farmer's name, location, crops, land, "
+            "problems raised, advice already given and open questions. Write in English, at most "
+            "80 words, plain sentences, no preamble.\n\n"
+            f"Current memory:\n{previous_summary or '(empty)'}\n\nNew turns:\n{transcript}"
+        )
+        payload = {
+            "contents": [{"role": "user", "parts": [{"text": prompt}]}],
+            "generationConfig": {"temperature": 0.2, "maxOutputTokens": 200},
+        }
+        for model in [GEMINI_BRAIN_MODEL] + GEMINI_FALLBACK_MODELS[:2]:
+            try:
+                url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={GEMINI_API_KEY}"
+                response = self._session.post(url, json=payload, timeout=20)
+                if response.status_code == 200:
+                    return response.json()["candidates"][0]["content"]["parts"][0]["text"].strip()
+                print(f"[GEMINI SUMMARY WARNING] Model {model} failed with {response.status_code}. Trying next model...")
+            except Exception as e:
+                print(f"[GEMINI SUMMARY EXCEPTION] Model {model} failed: {e}")
+        return None
+
     def _mock_response(self, message: str) -> str:
         return f"[Mock Mode] I understand you asked: '{message}'. Gemini API key is not configured."
 
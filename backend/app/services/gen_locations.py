@@ -237,16 +237,9 @@ lines.append('    return {state: sorted(districts.keys()) for state, districts i
 lines.append('')
 
 lines.append('def find_nearest_district(lat, lon):')
-lines.append('    """Find the nearest district to given GPS coordinates."""')
-lines.append('    best = None')
-lines.append('    best_dist = float("inf")')
-lines.append('    for state, districts in INDIA_LOCATIONS.items():')
-lines.append('        for district, coords in districts.items():')
-lines.append('            d = (coords["lat"] - lat) ** 2 + (coords["lon"] - lon) ** 2')
-lines.append('            if d < best_dist:')
-lines.append('                best_dist = d')
-lines.append('                best = {"state": state, "district": district, "lat": coords["lat"], "lon": coords["lon"]}')
-lines.append('    return best')
+lines.append('    """Find the nearest district to given GPS coordinates (grid-indexed, see location_index.py)."""')
+lines.append('    from app.services.location_index import find_nearest_district as _find_nearest_indexed')
+lines.append('    return _find_nearest_indexed(lat, lon)')
 lines.append('')
 
 out.write_text('\n'.join(lines), encoding='utf-8')
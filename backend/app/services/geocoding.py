@@ -1,62 +1,249 @@
 import os
+import time
+import asyncio
+import sqlite3
+import threading
 import httpx
+from typing import Optional, Tuple
 from app.services.india_locations import get_coords_for_district
 
-async def get_coords_with_place(state: str, district: str, place: str = "", client: httpx.AsyncClient = None) -> tuple[float, float]:
-    """Resolves coordinates, prioritizing the specific place/mandal if available,
-    otherwise falling back to district coordinates.
-    """
-    api_key = os.getenv("OPENWEATHERMAP_API_KEY")
-    place_cleaned = place.strip() if place else ""
-    
-    if api_key and place_cleaned:
-        async def _geocode(query: str) -> tuple[float, float]:
-            url = f"http://api.openweathermap.org/geo/1.0/direct?q={query}&limit=1&appid={api_key}"
-            if client:
-                resp = await client.get(url, timeout=5)
-            else:
-                async with httpx.AsyncClient() as c:
-                    resp = await c.get(url, timeout=5)
-            if resp.status_code == 200 and resp.json():
-                geo = resp.json()[0]
-                return geo['lat'], geo['lon']
-            return None, None
-
-        # 1. Try: place, district, state, IN
+# ──────────────────────────────────────────────────────────────
+# Persistent geocode cache
+# ──────────────────────────────────────────────────────────────
+# Resolved coordinates are stored in a small SQLite file keyed by the
+# normalized (place, district, state). Successful place lookups are kept
+# for a long time; places the geocoder could not find (we fell back to the
+# district centroid) are kept for a shorter time so they are retried later.
+# Transient network failures are never cached.
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", os.path.join(os.getcwd(), "geocode_cache.db"))
+POSITIVE_TTL_SECONDS = int(os.getenv("GEOCODE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+NEGATIVE_TTL_SECONDS = int(os.getenv("GEOCODE_NEGATIVE_TTL_SECONDS", str(6 * 3600)))
+
+DEFAULT_COORDS = (11.0183, 76.971)  # Coimbatore
+
+
+def _normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).lower()
+
+
+def make_cache_key(state: str, district: str, place: str = "") -> str:
+    return f"{_normalize(place)}|{_normalize(district)}|{_normalize(state)}"
+
+
+class GeocodeCache:
+    """SQLite-backed geocode cache with separate TTLs for hits and misses."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "writes": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                " key TEXT PRIMARY KEY,"
+                " lat REAL NOT NULL,"
+                " lon REAL NOT NULL,"
+                " negative INTEGER NOT NULL DEFAULT 0,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
         try:
-            lat, lon = await _geocode(f"{place_cleaned},{district},{state},IN")
-            if lat is not None:
-                return lat, lon
-        except Exception:
-            pass
-        
-        # 2. Try: place, state, IN
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT lat, lon, negative, expires_at FROM geocode_cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[GEOCODE CACHE] Read failed: {e}")
+            return None
+
+        if row is None or row[3] < time.time():
+            self.stats["misses"] += 1
+            return None
+        self.stats["negative_hits" if row[2] else "hits"] += 1
+        return row[0], row[1]
+
+    def set(self, key: str, lat: float, lon: float, negative: bool = False):
+        ttl = NEGATIVE_TTL_SECONDS if negative else POSITIVE_TTL_SECONDS
         try:
-            lat, lon = await _geocode(f"{place_cleaned},{state},IN")
-            if lat is not None:
-                return lat, lon
-        except Exception:
-            pass
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (key, lat, lon, negative, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, lat, lon, 1 if negative else 0, time.time() + ttl),
+                )
+                conn.commit()
+            self.stats["writes"] += 1
+        except sqlite3.Error as e:
+            print(f"[GEOCODE CACHE] Write failed: {e}")
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one entry, or the whole cache when `key` is None."""
+        try:
+            with self._lock:
+                conn = self._connect()
+                if key is None:
+                    conn.execute("DELETE FROM geocode_cache")
+                else:
+                    conn.execute("DELETE FROM geocode_cache WHERE key = ?", (key,))
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"[GEOCODE CACHE] Invalidate failed: {e}")
+
+
+geocode_cache = GeocodeCache(GEOCODE_CACHE_PATH)
+
+
+# ──────────────────────────────────────────────────────────────
+# Resolution
+# ──────────────────────────────────────────────────────────────
+
+class _GeocodeUnavailable(Exception):
+    """Raised when the geocoder could not be reached (not cacheable)."""
+
+
+async def _geocode(client: httpx.AsyncClient, api_key: str, query: str) -> Optional[Tuple[float, float]]:
+    url = f"http://api.openweathermap.org/geo/1.0/direct?q={query}&limit=1&appid={api_key}"
+    try:
+        resp = await client.get(url, timeout=5)
+    except Exception as e:
+        raise _GeocodeUnavailable(str(e))
+    if resp.status_code != 200:
+        raise _GeocodeUnavailable(f"HTTP {resp.status_code}")
+    try:
+        data = resp.json()
+        if data:
+            return data[0]['lat'], data[0]['lon']
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        # Malformed body — treat like an outage (fall back, don't cache)
+        raise _GeocodeUnavailable(f"bad response: {e!r}")
+    return None
+
+
+async def _first_success(client: httpx.AsyncClient, api_key: str, queries) -> Tuple[Optional[Tuple[float, float]], bool]:
+    """
+    Run candidate queries concurrently and return (coords, definitive).
+    The first query that resolves wins and the rest are cancelled;
+    `definitive` is False if any query failed for transient reasons.
+    """
+    tasks = [asyncio.ensure_future(_geocode(client, api_key, q)) for q in queries]
+    definitive = True
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                coords = await next_done
+            except _GeocodeUnavailable:
+                definitive = False
+                continue
+            if coords is not None:
+                return coords, True
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+    return None, definitive
+
+
+async def _resolve(state: str, district: str, place: str, client: httpx.AsyncClient, api_key: Optional[str]):
+    """Returns (lat, lon, cacheable, negative)."""
+    definitive = True
+
+    # 1 & 2. place,district,state and place,state — concurrently, first success wins
+    if api_key and place:
+        coords, definitive = await _first_success(
+            client, api_key, [f"{place},{district},{state},IN", f"{place},{state},IN"]
+        )
+        if coords:
+            return coords[0], coords[1], True, False
 
     # 3. Fallback to static district coordinates
     lat, lon = get_coords_for_district(state, district)
     if lat is not None and lon is not None:
-        return lat, lon
+        # Place could not be geocoded — remember the miss for a shorter time
+        return lat, lon, definitive and bool(place), True
 
     # 4. Fallback to geocoding district as a backup
     if api_key and district:
+        coords, district_definitive = await _first_success(client, api_key, [f"{district},{state},IN"])
+        definitive = definitive and district_definitive
+        if coords:
+            return coords[0], coords[1], True, False
+
+    # Default fallback
+    return DEFAULT_COORDS[0], DEFAULT_COORDS[1], definitive, True
+
+
+async def get_coords_with_place(state: str, district: str, place: str = "", client: httpx.AsyncClient = None) -> tuple[float, float]:
+    """Resolves coordinates, prioritizing the specific place/mandal if available,
+    otherwise falling back to district coordinates.
+    Results are served from the persistent geocode cache when possible.
+    """
+    api_key = os.getenv("OPENWEATHERMAP_API_KEY")
+    place_cleaned = place.strip() if place else ""
+
+    # Without a place the static district table answers instantly
+    if not place_cleaned:
+        lat, lon = get_coords_for_district(state, district)
+        if lat is not None and lon is not None:
+            return lat, lon
+
+    key = make_cache_key(state, district, place_cleaned)
+    cached = await asyncio.to_thread(geocode_cache.get, key)
+    if cached:
+        return cached
+
+    if client is None:
+        async with httpx.AsyncClient() as local_client:
+            lat, lon, cacheable, negative = await _resolve(state, district, place_cleaned, local_client, api_key)
+    else:
+        lat, lon, cacheable, negative = await _resolve(state, district, place_cleaned, client, api_key)
+
+    if cacheable and api_key:
+        await asyncio.to_thread(geocode_cache.set, key, lat, lon, negative=negative)
+    return lat, lon
+
+
+async def preseed_from_user_profiles(max_locations: int = 500, concurrency: int = 4) -> int:
+    """
+    Warm the geocode cache with every distinct (state, district, mandal)
+    in user profiles. Returns the number of locations resolved.
+    """
+    from app.database import AuthSessionLocal
+    from app.models import User
+
+    def _load_locations():
+        db = AuthSessionLocal()
         try:
-            url = f"http://api.openweathermap.org/geo/1.0/direct?q={district},{state},IN&limit=1&appid={api_key}"
-            if client:
-                resp = await client.get(url, timeout=5)
-            else:
-                async with httpx.AsyncClient() as c:
-                    resp = await c.get(url, timeout=5)
-            if resp.status_code == 200 and resp.json():
-                geo = resp.json()[0]
-                return geo['lat'], geo['lon']
-        except Exception:
-            pass
-
-    # Default fallback (Coimbatore coordinates)
-    return 11.0183, 76.971
+            return (
+                db.query(User.state, User.district, User.mandal)
+                .filter(User.state.isnot(None), User.district.isnot(None))
+                .distinct()
+                .limit(max_locations)
+                .all()
+            )
+        finally:
+            db.close()
+
+    rows = await asyncio.to_thread(_load_locations)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        async def _warm(state, district, mandal):
+            async with semaphore:
+                try:
+                    await get_coords_with_place(state, district, mandal or "", client)
+                except Exception as e:
+                    print(f"[GEOCODE CACHE] Pre-seed failed for {mandal}, {district}, {state}: {e}")
+
+        await asyncio.gather(*[_warm(s, d, m) for s, d, m in rows])
+
+    print(f"[GEOCODE CACHE] Pre-seeded {len(rows)} profile locations")
+    return len(rows)
@@ -1,5 +1,4 @@
 import os
-from groq import Groq
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -8,13 +7,20 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
 class GroqService:
     def __init__(self):
+        # The groq SDK is imported on first use to keep app startup light
+        self._client = None
         if GROQ_API_KEY:
-            self.client = Groq(api_key=GROQ_API_KEY.strip())
             print("[GROQ ASR] Service Initialized (Model: whisper-large-v3).")
         else:
-            self.client = None
             print("[GROQ ASR] Warning: GROQ_API_KEY not found. Running in mock mode.")
 
+    @property
+    def client(self):
+        if self._client is None and GROQ_API_KEY:
+            from groq import Groq
+            self._client = Groq(api_key=GROQ_API_KEY.strip())
+        return self._client
+
     def transcribe_audio(self, audio_bytes: bytes, filename: str = "audio.webm") -> dict:
         """
         Transcribe voice audio bytes to text using Groq Whisper API.
@@ -0,0 +1,192 @@
+"""
+Chat History Manager — EventHorizon AI
+========================================
+Clients send the whole conversation as `history` on every turn. Sending it
+all to Gemini made request payloads (and time-to-first-token) grow with the
+session, and hashing it into the chat cache key meant no two turns of a
+long session could ever share a cache entry.
+
+`compact()` turns the client history into:
+
+  • window  — the most recent turns that fit HISTORY_TOKEN_BUDGET
+              (estimated tokens, at most HISTORY_MAX_TURNS, starting on a
+              user turn). This is what goes to Gemini and into cache keys.
+  • memory  — a compact summary of everything older, passed to Gemini in
+              the system prompt.
+
+Turns that fall out of the window are summarized in the background (one
+summarization per HISTORY_SUMMARIZE_EVERY dropped turns, never two at once
+per user): the previous summary plus the new turns are folded by
+gemini_service.summarize_conversation. Signed-in users' summaries are stored
+with memory_service (keys `conversation_summary` / `conversation_summary_through`)
+so they survive restarts and carry over to the next session. Anonymous
+callers only get a summary when the server issued them a session id (the
+assistant WebSocket does, one per connection); it is kept in memory under
+that id. Nothing the client sends — its history or a claimed user_id — ever
+selects a stored summary. Without either, older turns are simply left out,
+as they are until the first summary is ready.
+"""
+
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.cache_utils import TTLCache
+
+TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1200"))
+MAX_TURNS = int(os.getenv("HISTORY_MAX_TURNS", "16"))
+SUMMARIZE_EVERY = int(os.getenv("HISTORY_SUMMARIZE_EVERY", "4"))
+MAX_SUMMARY_INPUT_CHARS = 12000
+
+SUMMARY_KEY = "conversation_summary"
+THROUGH_KEY = "conversation_summary_through"
+
+_MODEL_ROLES = ("assistant", "model", "ai")
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 chars per token for ASCII, ~2 for Indic scripts (they tokenize into more pieces)."""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars + 1) // 2 + 4  # +4 per-turn overhead
+
+
+def _fingerprint(prev: str, turn: Dict[str, str]) -> str:
+    material = f"{prev}\0{turn.get('role', 'user')}\0{turn.get('content', '')}"
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class CompactHistory:
+    window: List[Dict[str, str]]
+    memory: Optional[str]
+    dropped: int
+    tokens_full: int
+    tokens_window: int
+
+
+class HistoryManager:
+    def __init__(self, summarize: Optional[Callable[[List[dict], str], Optional[str]]] = None,
+                 store=None, token_budget: int = TOKEN_BUDGET, max_turns: int = MAX_TURNS,
+                 summarize_every: int = SUMMARIZE_EVERY, background: bool = True):
+        self._summarize = summarize
+        self._store = store
+        self.token_budget = token_budget
+        self.max_turns = max_turns
+        self.summarize_every = summarize_every
+        self.background = background
+        self._sessions = TTLCache(ttl_seconds=6 * 3600)
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {"compactions": 0, "turns_dropped": 0, "tokens_saved": 0, "summaries": 0, "summary_failures": 0}
+
+    # ── Dependencies (lazy so tests and benchmarks can run offline) ──
+
+    def _summarizer(self):
+        if self._summarize is None:
+            from app.services.gemini_service import gemini_service
+            self._summarize = gemini_service.summarize_conversation
+        return self._summarize
+
+    def _memory_store(self):
+        if self._store is None:
+            from app.services.memory_service import memory_service
+            self._store = memory_service
+        return self._store
+
+    def _load(self, session: str, user_id: Optional[str]) -> Tuple[str, str]:
+        if user_id:
+            memory = self._memory_store().get_memory(user_id)
+            return memory.get(SUMMARY_KEY, ""), memory.get(THROUGH_KEY, "")
+        return self._sessions.get(session) or ("", "")
+
+    def _save(self, session: str, user_id: Optional[str], summary: str, through: str):
+        if user_id:
+            store = self._memory_store()
+            store.save_memory(user_id, SUMMARY_KEY, summary)
+            store.save_memory(user_id, THROUGH_KEY, through)
+        else:
+            self._sessions.set(session, (summary, through))
+
+    # ── Compaction ────────────────────────────────────────────
+
+    def compact(self, history: Optional[list], user_id: Optional[str] = None,
+                session_id: Optional[str] = None) -> CompactHistory:
+        """
+        Window + memory for one turn. Blocking only on a memory_service read;
+        summarization is backgrounded. `user_id` must be a verified identity
+        and `session_id` a server-issued one — with neither, no summary is
+        read or kept.
+        """
+        turns = [t for t in (history or []) if isinstance(t, dict) and t.get("content")]
+        costs = [estimate_tokens(str(t["content"])) for t in turns]
+
+        start, used = len(turns), 0
+        while start > 0 and len(turns) - start < self.max_turns and used + costs[start - 1] <= self.token_budget:
+            start -= 1
+            used += costs[start]
+        # Gemini expects the conversation to open with a user turn
+        while start < len(turns) and turns[start].get("role", "user") in _MODEL_ROLES:
+            used -= costs[start]
+            start += 1
+
+        window, older = turns[start:], turns[:start]
+        session = user_id or (f"session:{session_id}" if session_id else None)
+        summary, through = self._load(session, user_id) if session else ("", "")
+
+        if older and session:
+            fingerprints, prev = [], ""
+            for t in older:
+                prev = _fingerprint(prev, t)
+                fingerprints.append(prev)
+            pending = older[fingerprints.index(through) + 1:] if through in fingerprints else older
+            if len(pending) >= self.summarize_every or (pending and not summary):
+                self._schedule(session, user_id, summary, pending, fingerprints[-1])
+
+        self.stats["compactions"] += 1
+        self.stats["turns_dropped"] += len(older)
+        self.stats["tokens_saved"] += sum(costs) - used
+        return CompactHistory(window, summary or None, len(older), sum(costs), used)
+
+    def _schedule(self, session: str, user_id: Optional[str], summary: str, pending: List[dict], through: str):
+        with self._lock:
+            if session in self._in_flight:
+                return
+            self._in_flight.add(session)
+            if self.background and self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="history-summary")
+        if self.background:
+            self._executor.submit(self._run_summary, session, user_id, summary, pending, through)
+        else:
+            self._run_summary(session, user_id, summary, pending, through)
+
+    def _run_summary(self, session: str, user_id: Optional[str], summary: str, pending: List[dict], through: str):
+        try:
+            # Keep the newest part if a huge backlog fell out of the window at once
+            trimmed, size = [], 0
+            for t in reversed(pending):
+                size += len(str(t.get("content", "")))
+                if size > MAX_SUMMARY_INPUT_CHARS:
+                    break
+                trimmed.append(t)
+            new_summary = self._summarizer()(list(reversed(trimmed)), summary)
+            if new_summary:
+                self._save(session, user_id, new_summary, through)
+                self.stats["summaries"] += 1
+            else:
+                self.stats["summary_failures"] += 1
+        except Exception as e:
+            self.stats["summary_failures"] += 1
+            print(f"[HISTORY] Summarization failed for {session[:24]}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(session)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "in_flight": len(self._in_flight), "token_budget": self.token_budget}
+
+
+history_manager = HistoryManager()
@@ -431,13 +431,6 @@ def get_location_tree():
     return {state: sorted(districts.keys()) for state, districts in sorted(INDIA_LOCATIONS.items())}
 
 def find_nearest_district(lat, lon):
-    """Find the nearest district to given GPS coordinates."""
-    best = None
-    best_dist = float("inf")
-    for state, districts in INDIA_LOCATIONS.items():
-        for district, coords in districts.items():
-            d = (coords["lat"] - lat) ** 2 + (coords["lon"] - lon) ** 2
-            if d < best_dist:
-                best_dist = d
-                best = {"state": state, "district": district, "lat": coords["lat"], "lon": coords["lon"]}
-    return best
+    """Find the nearest district to given GPS coordinates (grid-indexed, see location_index.py)."""
+    from app.services.location_index import find_nearest_district as _find_nearest_indexed
+    return _find_nearest_indexed(lat, lon)
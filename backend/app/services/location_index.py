@@ -0,0 +1,212 @@
+"""
+District Spatial Index — EventHorizon AI
+==========================================
+Grid-bucket spatial index over the district centroids in INDIA_LOCATIONS,
+built once at import time. Replaces the linear scan in
+`find_nearest_district` that ran on every GPS request.
+
+Points are bucketed into 0.5° cells. A query walks rings of cells outward
+from the query cell and stops as soon as the k-th best haversine distance
+is below the lower bound for any unvisited ring, so a typical lookup
+touches a handful of districts instead of all of them.
+
+Batch queries (many points at once) use a vectorized NumPy haversine
+when NumPy is installed, and fall back to per-point grid queries otherwise.
+"""
+
+import math
+import heapq
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from app.services.india_locations import INDIA_LOCATIONS
+
+EARTH_RADIUS_KM = 6371.0088
+CELL_DEG = 0.5
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres."""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class DistrictIndex:
+    """Grid-bucket index supporting nearest, k-nearest, radius and batch queries."""
+
+    def __init__(self, locations: Dict[str, Dict[str, Dict[str, float]]], cell_deg: float = CELL_DEG):
+        self.cell_deg = cell_deg
+        self.entries: List[Dict[str, Any]] = []
+        self.lats: List[float] = []
+        self.lons: List[float] = []
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        for state, districts in locations.items():
+            for district, coords in districts.items():
+                idx = len(self.entries)
+                self.entries.append({"state": state, "district": district, "lat": coords["lat"], "lon": coords["lon"]})
+                self.lats.append(coords["lat"])
+                self.lons.append(coords["lon"])
+                self.cells.setdefault(self._cell(coords["lat"], coords["lon"]), []).append(idx)
+
+        if self.cells:
+            rows = [c[0] for c in self.cells]
+            cols = [c[1] for c in self.cells]
+            self._row_range = (min(rows), max(rows))
+            self._col_range = (min(cols), max(cols))
+            # Smallest cos(lat) over the indexed points (padded by one cell)
+            self._cos_floor = math.cos(math.radians(min(90.0, max(abs(v) for v in self.lats) + cell_deg)))
+        else:
+            self._row_range = self._col_range = (0, 0)
+            self._cos_floor = 1.0
+
+        self._np_coords = None  # (lat_rad, lon_rad) arrays, built on first batch query
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def _ring(self, row: int, col: int, r: int) -> Iterable[Tuple[int, int]]:
+        if r == 0:
+            yield row, col
+            return
+        for dc in range(-r, r + 1):
+            yield row - r, col + dc
+            yield row + r, col + dc
+        for dr in range(-r + 1, r):
+            yield row + dr, col - r
+            yield row + dr, col + r
+
+    def _max_ring(self, row: int, col: int) -> int:
+        return max(
+            abs(row - self._row_range[0]), abs(row - self._row_range[1]),
+            abs(col - self._col_range[0]), abs(col - self._col_range[1]),
+        )
+
+    def _ring_lower_bound_km(self, r: int, lat: float, lon: float) -> float:
+        """
+        Minimum distance from (lat, lon) to any point outside rings 0..r, i.e.
+        outside the (2r+1)² block of cells centred on the query cell. Longitude
+        gaps are scaled by the smallest cos(lat) involved, which keeps the
+        bound conservative away from the equator.
+        """
+        row, col = self._cell(lat, lon)
+        lat_gap = min(lat - (row - r) * self.cell_deg, (row + r + 1) * self.cell_deg - lat)
+        lon_gap = min(lon - (col - r) * self.cell_deg, (col + r + 1) * self.cell_deg - lon)
+        c_min = max(0.0, min(self._cos_floor, math.cos(math.radians(lat))))
+        lat_km = EARTH_RADIUS_KM * math.radians(lat_gap)
+        lon_km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, c_min * math.sin(math.radians(lon_gap) / 2)))
+        return min(lat_km, lon_km)
+
+    def _result(self, idx: int, dist: float) -> Dict[str, Any]:
+        return {**self.entries[idx], "distance_km": round(dist, 3)}
+
+    # ──────────────────────────────────────────────────────────
+    # Queries
+    # ──────────────────────────────────────────────────────────
+
+    def k_nearest(self, lat: float, lon: float, k: int = 1) -> List[Dict[str, Any]]:
+        """Return the k nearest districts, closest first, each with `distance_km`."""
+        if not self.entries or k <= 0:
+            return []
+        k = min(k, len(self.entries))
+        row, col = self._cell(lat, lon)
+        heap: List[Tuple[float, int]] = []  # max-heap of (-dist, idx)
+
+        for r in range(self._max_ring(row, col) + 1):
+            for cell in self._ring(row, col, r):
+                for idx in self.cells.get(cell, ()):
+                    d = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d, idx))
+                    elif d < -heap[0][0]:
+                        heapq.heapreplace(heap, (-d, idx))
+            if len(heap) == k and -heap[0][0] <= self._ring_lower_bound_km(r, lat, lon):
+                break
+
+        return [self._result(idx, -neg) for neg, idx in sorted(heap, reverse=True)]
+
+    def nearest(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Return the nearest district, or None for an empty index."""
+        found = self.k_nearest(lat, lon, 1)
+        return found[0] if found else None
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Dict[str, Any]]:
+        """Return every district within `radius_km`, closest first."""
+        if not self.entries or radius_km < 0:
+            return []
+        row, col = self._cell(lat, lon)
+        hits: List[Tuple[float, int]] = []
+
+        for r in range(self._max_ring(row, col) + 1):
+            for cell in self._ring(row, col, r):
+                for idx in self.cells.get(cell, ()):
+                    d = haversine_km(lat, lon, self.lats[idx], self.lons[idx])
+                    if d <= radius_km:
+                        hits.append((d, idx))
+            if self._ring_lower_bound_km(r, lat, lon) > radius_km:
+                break
+
+        return [self._result(idx, d) for d, idx in sorted(hits)]
+
+    def nearest_many(self, points: List[Tuple[float, float]]) -> List[Optional[Dict[str, Any]]]:
+        """Nearest district for each (lat, lon) in `points`, in order."""
+        if not points:
+            return []
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.nearest(lat, lon) for lat, lon in points]
+
+        if not self.entries:
+            return [None] * len(points)
+        if self._np_coords is None:
+            self._np_coords = (np.radians(np.asarray(self.lats)), np.radians(np.asarray(self.lons)))
+        d_lat, d_lon = self._np_coords
+
+        q = np.radians(np.asarray(points, dtype=float))
+        results: List[Optional[Dict[str, Any]]] = []
+        # Chunk so the (points x districts) matrix stays small
+        for start in range(0, len(q), 512):
+            chunk = q[start:start + 512]
+            q_lat = chunk[:, 0:1]
+            q_lon = chunk[:, 1:2]
+            a = (np.sin((d_lat - q_lat) / 2) ** 2
+                 + np.cos(q_lat) * np.cos(d_lat) * np.sin((d_lon - q_lon) / 2) ** 2)
+            dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+            best = dist.argmin(axis=1)
+            for row_i, idx in enumerate(best):
+                results.append(self._result(int(idx), float(dist[row_i, idx])))
+        return results
+
+
+DISTRICT_INDEX = DistrictIndex(INDIA_LOCATIONS)
+
+
+def find_nearest_district(lat, lon):
+    """Find the nearest district to given GPS coordinates."""
+    found = DISTRICT_INDEX.k_nearest(lat, lon, 1)
+    if not found:
+        return None
+    best = found[0]
+    return {"state": best["state"], "district": best["district"], "lat": best["lat"], "lon": best["lon"]}
+
+
+def find_nearest_districts(lat, lon, k: int = 5):
+    """Return the k nearest districts with `distance_km`."""
+    return DISTRICT_INDEX.k_nearest(lat, lon, k)
+
+
+def find_districts_within(lat, lon, radius_km: float):
+    """Return all districts within `radius_km` with `distance_km`."""
+    return DISTRICT_INDEX.within_radius(lat, lon, radius_km)
+
+
+def find_nearest_district_many(points):
+    """Batch nearest-district lookup for a list of (lat, lon) pairs."""
+    return DISTRICT_INDEX.nearest_many(points)
@@ -28,7 +28,7 @@ class MemoryService:
             with open(user_file, "w", encoding="utf-8") as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
                 
-            print(f"[MEMORY SERVICE] Saved: user_id={user_id}, {key}={value}")
+            print(f"[MEMORY SERVICE] Saved: user_id={user_id}, key={key} ({len(str(value))} chars)")
             return True
         except Exception as e:
             print(f"[MEMORY SERVICE ERROR] Save failed: {e}")
@@ -6,32 +6,27 @@ Uses Meta's Prophet for advanced time-series forecasting, with a fallback
 to Scikit-Learn Linear Regression with seasonal components if Prophet is unavailable.
 """
 
-import pandas as pd
-import numpy as np
+import logging
+import importlib.util
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Tuple
+from typing import TYPE_CHECKING, List, Dict, Any, Tuple
 
-# Try importing Prophet
-try:
-    from prophet import Prophet
-    import logging
-    # Suppress cmdstanpy / prophet logging
-    logging.getLogger('prophet').setLevel(logging.ERROR)
-    logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
-    PROPHET_AVAILABLE = True
-except ImportError:
-    PROPHET_AVAILABLE = False
+if TYPE_CHECKING:
+    import numpy as np
 
-# Import Scikit-Learn
-try:
-    from sklearn.linear_model import Ridge
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
+# pandas / numpy / Prophet / scikit-learn are heavy (seconds of import time),
+# so only probe for them here and import inside the forecasting functions.
+PROPHET_AVAILABLE = importlib.util.find_spec("prophet") is not None
+SKLEARN_AVAILABLE = importlib.util.find_spec("sklearn") is not None
 
+# Suppress cmdstanpy / prophet logging
+logging.getLogger('prophet').setLevel(logging.ERROR)
+logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
 
-def _extract_seasonal_features(dates: List[datetime]) -> Tuple[np.ndarray, np.ndarray]:
+
+def _extract_seasonal_features(dates: List[datetime]) -> Tuple["np.ndarray", "np.ndarray"]:
     """Helper to compute sine/cosine day of year features for seasonality."""
+    import numpy as np
     days = np.array([d.timetuple().tm_yday for d in dates])
     # Map 1-365 day of year to 0-2pi radians
     angles = 2 * np.pi * days / 365.25
@@ -48,6 +43,9 @@ def forecast_ndvi_sklearn(history: List[Dict[str, Any]], periods_to_predict: int
         return _forecast_arithmetic_fallback(history, periods_to_predict)
 
     try:
+        import numpy as np
+        from sklearn.linear_model import Ridge
+
         # Parse history
         parsed = []
         for p in history:
@@ -114,6 +112,10 @@ def forecast_ndvi_prophet(history: List[Dict[str, Any]], periods_to_predict: int
         return forecast_ndvi_sklearn(history, periods_to_predict)
 
     try:
+        import numpy as np
+        import pandas as pd
+        from prophet import Prophet
+
         # Prepare DataFrame for Prophet
         df = pd.DataFrame([
             {"ds": pd.to_datetime(p["date"]), "y": p["ndvi"]}
@@ -175,8 +177,8 @@ def _forecast_arithmetic_fallback(history: List[Dict[str, Any]], periods_to_pred
 
     # Calculate mean difference
     ndvis = [p["ndvi"] for p in history]
-    diffs = np.diff(ndvis)
-    avg_diff = float(np.mean(diffs))
+    diffs = [b - a for a, b in zip(ndvis, ndvis[1:])]
+    avg_diff = float(sum(diffs) / len(diffs))
     
     latest_val = ndvis[-1]
     latest_date = datetime.strptime(history[-1]["date"], "%Y-%m-%d")
@@ -198,67 +200,32 @@ def _forecast_arithmetic_fallback(history: List[Dict[str, Any]], periods_to_pred
 def generate_ml_advisory(history: List[Dict[str, Any]], forecast: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Analyzes historical trends and forecasted values to construct a predictive warning
-    and advisory alert for the farmer.
+    and advisory alert for the farmer (texts in advisory_templates).
     """
+    from app.services.advisory_templates import advisory
+
     if not history or not forecast:
-        return {
-            "severity": "info",
-            "title": "📡 Insufficient Prediction Data",
-            "message": "Predictive ML analysis requires more historical readings to initialize."
-        }
+        return advisory("ml.insufficient")
 
-    current_ndvi = history[-1]["ndvi"]
+    current_ndvi = round(float(history[-1]["ndvi"]), 2)
     future_ndvis = [f["ndvi"] for f in forecast]
     min_future_ndvi = min(future_ndvis)
-    max_future_ndvi = max(future_ndvis)
-    final_future_ndvi = future_ndvis[-1]
+    final_future_ndvi = round(float(future_ndvis[-1]), 2)
     
     # Calculate difference between current and predicted end value
-    predicted_change = final_future_ndvi - current_ndvi
+    predicted_change = float(future_ndvis[-1]) - float(history[-1]["ndvi"])
     
     # 1. Critical drop prediction (Drought / Pest stress anomaly)
     if min_future_ndvi < 0.35 and predicted_change < -0.10:
-        return {
-            "severity": "critical",
-            "title": "🚨 ML Warning: Crop Stress Predicted",
-            "message": (
-                f"Our ML model predicts a significant crop health decline from {current_ndvi:.2f} "
-                f"down to {final_future_ndvi:.2f} over the next 48 days. This indicates critical "
-                f"water stress or pest vulnerability. Increase soil moisture monitoring and prepare "
-                f"irrigation backups."
-            )
-        }
+        return advisory("ml.stress", current=current_ndvi, future=final_future_ndvi)
     
     # 2. Moderate drop/browning warning
     if predicted_change < -0.05:
-        return {
-            "severity": "warning",
-            "title": "📉 Predicted Health Decline",
-            "message": (
-                f"Vegetation index is predicted to drop by {abs(predicted_change):.2f} "
-                f"in the coming weeks. Health may decrease from {current_ndvi:.2f} to {final_future_ndvi:.2f}. "
-                f"Check for seasonal factors, nutrient deficits, or initial pest indicators."
-            )
-        }
+        return advisory("ml.decline", change=round(abs(predicted_change), 2), current=current_ndvi, future=final_future_ndvi)
         
     # 3. Growth/recovery signal
     if predicted_change > 0.05:
-        return {
-            "severity": "positive",
-            "title": "🌱 Predicted Crop Growth",
-            "message": (
-                f"Strong greening trend predicted! Crop health is expected to rise from "
-                f"{current_ndvi:.2f} to {final_future_ndvi:.2f} (+{predicted_change:.2f}) over the next "
-                f"6 weeks. Conditions are highly optimal."
-            )
-        }
+        return advisory("ml.growth", change=round(predicted_change, 2), current=current_ndvi, future=final_future_ndvi)
         
     # 4. Stable prediction
-    return {
-        "severity": "positive",
-        "title": "✅ Crop Health Stable",
-        "message": (
-            f"Crop health is predicted to remain stable. Forecasted NDVI in 48 days is "
-            f"{final_future_ndvi:.2f} (current: {current_ndvi:.2f}). Continue standard agricultural practices."
-        )
-    }
+    return advisory("ml.stable", current=current_ndvi, future=final_future_ndvi)
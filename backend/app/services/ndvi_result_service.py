@@ -0,0 +1,247 @@
+"""
+NDVI Result Service — EventHorizon AI
+=======================================
+Single computation path behind /ndvi, /ndvi/predict and /ndvi/compare.
+
+The frontend calls those endpoints back to back for the same field, so
+each upstream fetch (Sentinel Hub, MODIS) and the nearest-district lookup
+is memoized per (snapped lat/lon, periods, source) with single-flight:
+concurrent callers for the same key await one shared task instead of
+repeating the work. Endpoints project the shared result into their own
+response shape and must treat it as read-only (use `copy.deepcopy`).
+"""
+
+import asyncio
+import copy
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+
+import httpx
+
+from app.cache_utils import TTLCache
+from app.services.satellite_ndvi_service import get_ndvi_analysis
+from app.services.sentinel_hub_service import is_sentinel_hub_configured, fetch_sentinel_ndvi
+from app.services.india_locations import find_nearest_district
+
+# ──────────────────────────────────────────────────────────────
+# Configuration
+# ──────────────────────────────────────────────────────────────
+
+# 3 decimals ≈ 110m — finer than MODIS (250m) and the 1km Sentinel bbox
+SNAP_DECIMALS = 3
+
+SOURCE_AUTO = "auto"
+SOURCE_SENTINEL = "sentinel"
+SOURCE_MODIS = "modis"
+
+_result_cache = TTLCache(ttl_seconds=3600)
+_persisted_cache = TTLCache(ttl_seconds=3600)
+_inflight: Dict[Tuple, "asyncio.Task"] = {}
+
+
+def snap_coords(lat: float, lon: float) -> Tuple[float, float]:
+    """Snap coordinates to the memoization grid."""
+    return round(lat, SNAP_DECIMALS), round(lon, SNAP_DECIMALS)
+
+
+async def _single_flight(key: Tuple, factory: Callable[[], Awaitable[Optional[Dict[str, Any]]]]):
+    """
+    Return the cached value for `key`, or join the in-flight computation,
+    or start it. Only successful results (with a `current` reading) are cached.
+    """
+    cached = _result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(key)
+    if task is None:
+        async def _run():
+            result = await factory()
+            if result and result.get("current"):
+                _result_cache.set(key, result)
+            return result
+
+        task = asyncio.ensure_future(_run())
+        _inflight[key] = task
+        task.add_done_callback(lambda _t: _inflight.pop(key, None))
+
+    # Shield so one disconnecting caller does not cancel the shared fetch
+    return await asyncio.shield(task)
+
+
+def build_advisory(ndvi: float, trend: dict) -> dict:
+    """Generate advisory from NDVI + trend data."""
+    signal = trend.get("signal", "normal")
+    drops = trend.get("consecutive_drops", 0)
+
+    if signal == "drought_alert":
+        return {
+            "severity": "critical",
+            "title": "⚠️ Early Drought Signal Detected",
+            "message": f"Vegetation index declining for {drops} consecutive periods, now at {ndvi:.2f} (stressed). Increase irrigation immediately.",
+        }
+    elif signal == "persistent_decline":
+        return {
+            "severity": "warning",
+            "title": "📉 Persistent Vegetation Decline",
+            "message": f"NDVI dropped for {drops} consecutive periods. Current: {ndvi:.2f}. Check for pest, nutrient, or water stress.",
+        }
+    elif signal in ("browning", "stress_warning"):
+        return {
+            "severity": "warning",
+            "title": "🍂 Vegetation Stress" if signal == "stress_warning" else "🍂 Browning Detected",
+            "message": f"NDVI declining, now at {ndvi:.2f}. May be seasonal or indicate emerging stress.",
+        }
+    elif signal == "greening":
+        return {
+            "severity": "positive",
+            "title": "🌱 Vegetation Recovery / Growth",
+            "message": f"NDVI improving, current: {ndvi:.2f}. Growth looks healthy.",
+        }
+    else:
+        return {
+            "severity": "info",
+            "title": "✅ Vegetation Stable",
+            "message": f"Current NDVI: {ndvi:.2f}. No significant changes detected.",
+        }
+
+
+# ──────────────────────────────────────────────────────────────
+# Per-source fetches (memoized)
+# ──────────────────────────────────────────────────────────────
+
+async def _get_sentinel(lat: float, lon: float, periods: int) -> Optional[Dict[str, Any]]:
+    async def _fetch():
+        sentinel_data = await fetch_sentinel_ndvi(lat, lon, days_back=periods * 5)
+        if not sentinel_data or not sentinel_data.get("current"):
+            return None
+        return {
+            **sentinel_data,
+            "product": "Sentinel-2 L2A",
+            "advisory": build_advisory(sentinel_data["current"]["ndvi"], sentinel_data["trend"]),
+            "data_source": "Copernicus Sentinel Hub (10m)",
+            "last_updated": datetime.utcnow().isoformat() + "Z",
+        }
+
+    return await _single_flight((lat, lon, periods, SOURCE_SENTINEL), _fetch)
+
+
+async def _get_modis(lat: float, lon: float, periods: int) -> Dict[str, Any]:
+    async def _fetch():
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            return await get_ndvi_analysis(lat, lon, periods=periods, client=client)
+
+    return await _single_flight((lat, lon, periods, SOURCE_MODIS), _fetch)
+
+
+# ──────────────────────────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────────────────────────
+
+async def get_ndvi_result(
+    lat: float,
+    lon: float,
+    periods: int = 6,
+    source: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Shared NDVI computation for a field.
+
+    Args:
+        lat, lon: Location (snapped to SNAP_DECIMALS internally)
+        periods: Number of periods (MODIS: 16-day, Sentinel: 5-day)
+        source: None/'auto' (Sentinel preferred, MODIS fallback), 'sentinel' or 'modis'
+
+    Returns:
+        {
+          "latitude", "longitude", "periods", "source",
+          "primary":  analysis chosen for the requested source,
+          "sentinel_fallback": True when Sentinel was preferred but MODIS was used,
+          "nearest":  nearest district dict or None,
+        }
+        The nested dicts are shared — callers must deepcopy before mutating.
+    """
+    lat, lon = snap_coords(lat, lon)
+    source = source or SOURCE_AUTO
+    use_sentinel = is_sentinel_hub_configured() and source != SOURCE_MODIS
+
+    async def _compute():
+        primary = None
+        if use_sentinel:
+            primary = await _get_sentinel(lat, lon, periods)
+        sentinel_fallback = primary is None and use_sentinel
+        if primary is None:
+            primary = await _get_modis(lat, lon, periods)
+        return {
+            "latitude": lat,
+            "longitude": lon,
+            "periods": periods,
+            "source": source,
+            "primary": primary,
+            "current": (primary or {}).get("current"),
+            "sentinel_fallback": sentinel_fallback,
+            "nearest": find_nearest_district(lat, lon),
+        }
+
+    return await _single_flight((lat, lon, periods, source, "result"), _compute)
+
+
+async def get_ndvi_sources(lat: float, lon: float, periods: int = 6) -> Dict[str, Any]:
+    """Both sources side by side (Sentinel is None when unconfigured or unavailable)."""
+    lat, lon = snap_coords(lat, lon)
+    modis_task = _get_modis(lat, lon, periods)
+    if is_sentinel_hub_configured():
+        modis_res, sentinel_res = await asyncio.gather(
+            modis_task, _get_sentinel(lat, lon, periods), return_exceptions=True
+        )
+    else:
+        modis_res, sentinel_res = await modis_task, None
+
+    if isinstance(modis_res, Exception):
+        print(f"[NDVIResult] MODIS error: {modis_res}")
+        modis_res = {}
+    if isinstance(sentinel_res, Exception):
+        print(f"[NDVIResult] Sentinel error: {sentinel_res}")
+        sentinel_res = None
+
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "modis": modis_res,
+        "sentinel": sentinel_res,
+        "nearest": find_nearest_district(lat, lon),
+    }
+
+
+def format_location(nearest: Optional[dict], place: Optional[str], lat: float, lon: float) -> str:
+    """Human-readable location label for a projected response."""
+    if nearest:
+        return f"{place}, {nearest['district']}, {nearest['state']}" if place else f"{nearest['district']}, {nearest['state']}"
+    return f"{place}, {lat:.2f}°N, {lon:.2f}°E" if place else f"{lat:.2f}°N, {lon:.2f}°E"
+
+
+def project_analysis(ndvi_result: Dict[str, Any], place: Optional[str]) -> Dict[str, Any]:
+    """Deep-copied analysis dict with the location label attached."""
+    result = copy.deepcopy(ndvi_result["primary"])
+    result["location"] = format_location(
+        ndvi_result["nearest"], place, ndvi_result["latitude"], ndvi_result["longitude"]
+    )
+    return result
+
+
+def _persist_key(ndvi_result: Dict[str, Any], crop: str) -> tuple:
+    return (ndvi_result["latitude"], ndvi_result["longitude"], ndvi_result["periods"], ndvi_result["source"], crop)
+
+
+def should_persist(ndvi_result: Dict[str, Any], crop: str) -> bool:
+    """
+    False if this (result, crop) pair was written within the TTL, so
+    back-to-back /ndvi and /ndvi/predict calls write readings once.
+    Call mark_persisted after the write succeeds.
+    """
+    return not _persisted_cache.get(_persist_key(ndvi_result, crop))
+
+
+def mark_persisted(ndvi_result: Dict[str, Any], crop: str):
+    """Record a successful write of this (result, crop) pair's readings."""
+    _persisted_cache.set(_persist_key(ndvi_result, crop), True)
@@ -0,0 +1,242 @@
+"""
+ONNX Runtime Classifier Backend — EventHorizon AI
+===================================================
+CPU inference for the PlantVillage classifier without PyTorch at request
+time. Selected with CLASSIFIER_BACKEND=onnx (fp32) or onnx-int8 (dynamic
+int8 weight quantization) — see classifier_service.
+
+On first use the HF model is exported once to CLASSIFIER_CACHE_DIR/onnx/
+together with a small JSON sidecar (labels + preprocessing config), named
+after the checkpoint revision like the shared state dict, so a new
+checkpoint is re-exported and older exports are pruned. Later loads need
+only onnxruntime, NumPy and Pillow (without transformers the newest
+existing export is used). Preprocessing reproduces the
+HF image processor (resize → rescale → normalize → NCHW) in NumPy.
+"""
+
+import os
+import re
+import json
+import logging
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger("eventhorizon.classifier")
+
+ONNX_OPSET = int(os.getenv("CLASSIFIER_ONNX_OPSET", "17"))
+
+
+def _safe_name(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+def _revision(model_name: str, cache_dir: str) -> str:
+    """Checkpoint revision from the HF config; without transformers, the newest export on disk."""
+    try:
+        from transformers import AutoConfig
+    except ImportError:
+        folder, prefix = os.path.join(cache_dir, "onnx"), _safe_name(model_name) + "@"
+        metas = [os.path.join(folder, n) for n in os.listdir(folder)
+                 if n.startswith(prefix) and n.endswith(".json")] if os.path.isdir(folder) else []
+        if not metas:
+            return "unversioned"
+        newest = os.path.basename(max(metas, key=os.path.getmtime))
+        return newest[len(prefix):-len(".json")]
+    from app.services.classifier_service import _checkpoint_revision
+    return _checkpoint_revision(AutoConfig.from_pretrained(model_name), model_name)
+
+
+def _paths(model_name: str, cache_dir: str, revision: str) -> Dict[str, str]:
+    base = os.path.join(cache_dir, "onnx", f"{_safe_name(model_name)}@{revision}")
+    return {
+        "fp32": f"{base}.onnx",
+        "int8": f"{base}.int8.onnx",
+        "meta": f"{base}.json",
+    }
+
+
+# ──────────────────────────────────────────────────────────────
+# Export
+# ──────────────────────────────────────────────────────────────
+
+def _processor_meta(proc) -> Dict[str, Any]:
+    """Pull the fields the NumPy preprocessor needs out of an HF image processor."""
+    size = dict(getattr(proc, "size", None) or {"height": 224, "width": 224})
+    crop = getattr(proc, "crop_size", None)
+    return {
+        "size": size,
+        "do_resize": bool(getattr(proc, "do_resize", True)),
+        "resample": int(getattr(proc, "resample", 2)),
+        "do_center_crop": bool(getattr(proc, "do_center_crop", False)),
+        "crop_size": dict(crop) if crop else None,
+        "do_rescale": bool(getattr(proc, "do_rescale", True)),
+        "rescale_factor": float(getattr(proc, "rescale_factor", 1 / 255)),
+        "do_normalize": bool(getattr(proc, "do_normalize", True)),
+        "image_mean": list(getattr(proc, "image_mean", None) or [0.5, 0.5, 0.5]),
+        "image_std": list(getattr(proc, "image_std", None) or [0.5, 0.5, 0.5]),
+    }
+
+
+def export_onnx(model_name: str, cache_dir: str, quantize: bool = False) -> Dict[str, str]:
+    """
+    Export the HF classifier to ONNX (and optionally an int8 copy) if not
+    already present. Needs torch + transformers; write-then-rename so
+    concurrently starting workers never open a partial file.
+    """
+    paths = _paths(model_name, cache_dir, _revision(model_name, cache_dir))
+    os.makedirs(os.path.dirname(paths["fp32"]), exist_ok=True)
+    pid = os.getpid()
+
+    if not (os.path.exists(paths["fp32"]) and os.path.exists(paths["meta"])):
+        import torch
+        from transformers import AutoImageProcessor, AutoModelForImageClassification
+
+        proc = AutoImageProcessor.from_pretrained(model_name)
+        model = AutoModelForImageClassification.from_pretrained(model_name)
+        model.eval()
+        meta = _processor_meta(proc)
+        meta["id2label"] = {str(k): v for k, v in model.config.id2label.items()}
+
+        class _LogitsOnly(torch.nn.Module):
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, pixel_values):
+                return self.inner(pixel_values=pixel_values).logits
+
+        height, width = _output_hw(meta)
+        dummy = torch.zeros(1, 3, height, width, dtype=torch.float32)
+        tmp_path = f"{paths['fp32']}.{pid}.tmp"
+        torch.onnx.export(
+            _LogitsOnly(model), (dummy,), tmp_path,
+            input_names=["pixel_values"], output_names=["logits"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "logits": {0: "batch"}},
+            opset_version=ONNX_OPSET,
+        )
+        os.replace(tmp_path, paths["fp32"])
+
+        tmp_meta = f"{paths['meta']}.{pid}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_meta, paths["meta"])
+        logger.info(f"[CLASSIFIER] Exported ONNX model to {paths['fp32']}")
+
+        from app.services.classifier_service import _remove_stale_exports
+        _remove_stale_exports(paths["fp32"])
+
+    if quantize and not os.path.exists(paths["int8"]):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+
+        tmp_path = f"{paths['int8']}.{pid}.tmp"
+        quantize_dynamic(paths["fp32"], tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, paths["int8"])
+        logger.info(f"[CLASSIFIER] Wrote int8 dynamic-quantized model to {paths['int8']}")
+
+    return paths
+
+
+# ──────────────────────────────────────────────────────────────
+# NumPy preprocessing
+# ──────────────────────────────────────────────────────────────
+
+def _output_hw(meta: Dict[str, Any]) -> Tuple[int, int]:
+    if meta.get("do_center_crop") and meta.get("crop_size"):
+        crop = meta["crop_size"]
+        return int(crop["height"]), int(crop["width"])
+    size = meta["size"]
+    if "height" in size:
+        return int(size["height"]), int(size["width"])
+    edge = int(size["shortest_edge"])
+    return edge, edge
+
+
+class NumpyPreprocessor:
+    """Minimal stand-in for the HF image processor: PIL images → NCHW float32 batch."""
+
+    def __init__(self, meta: Dict[str, Any]):
+        import numpy as np
+
+        self.meta = meta
+        self.height, self.width = _output_hw(meta)
+        self.mean = np.asarray(meta["image_mean"], dtype=np.float32).reshape(1, 1, 3)
+        self.std = np.asarray(meta["image_std"], dtype=np.float32).reshape(1, 1, 3)
+
+    def _resize(self, image):
+        meta = self.meta
+        if not meta["do_resize"]:
+            return image
+        size = meta["size"]
+        if "height" in size:
+            return image.resize((int(size["width"]), int(size["height"])), resample=meta["resample"])
+        # shortest_edge: scale so the short side matches, keep aspect ratio
+        edge = int(size["shortest_edge"])
+        w, h = image.size
+        scale = edge / min(w, h)
+        return image.resize((max(1, round(w * scale)), max(1, round(h * scale))), resample=meta["resample"])
+
+    def _center_crop(self, arr):
+        h, w = arr.shape[:2]
+        top = max(0, (h - self.height) // 2)
+        left = max(0, (w - self.width) // 2)
+        return arr[top:top + self.height, left:left + self.width]
+
+    def __call__(self, images: List[Any]):
+        import numpy as np
+
+        batch = np.empty((len(images), 3, self.height, self.width), dtype=np.float32)
+        for i, image in enumerate(images):
+            arr = np.asarray(self._resize(image.convert("RGB")), dtype=np.float32)
+            if self.meta["do_center_crop"] or arr.shape[:2] != (self.height, self.width):
+                arr = self._center_crop(arr)
+            if self.meta["do_rescale"]:
+                arr *= self.meta["rescale_factor"]
+            if self.meta["do_normalize"]:
+                arr = (arr - self.mean) / self.std
+            batch[i] = arr.transpose(2, 0, 1)
+        return batch
+
+
+# ──────────────────────────────────────────────────────────────
+# Runtime
+# ──────────────────────────────────────────────────────────────
+
+class OnnxClassifier:
+    """
+    onnxruntime session with the same surface the scanner uses from the HF
+    model (`config.id2label`) plus `predict_batch` for the batcher.
+    """
+
+    def __init__(self, model_path: str, meta: Dict[str, Any], num_threads: int):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = num_threads
+        opts.inter_op_num_threads = 1
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.model_path = model_path
+        self.preprocessor = NumpyPreprocessor(meta)
+        self.config = SimpleNamespace(id2label={int(k): v for k, v in meta["id2label"].items()})
+
+    def predict_proba(self, images: List[Any]):
+        import numpy as np
+
+        logits = self.session.run(["logits"], {"pixel_values": self.preprocessor(images)})[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict_batch(self, images: List[Any]) -> List[Tuple[int, float]]:
+        probabilities = self.predict_proba(images)
+        indices = probabilities.argmax(axis=-1)
+        return [(int(i), float(probabilities[row, i])) for row, i in enumerate(indices)]
+
+
+def load_onnx_classifier(model_name: str, cache_dir: str, quantize: bool, num_threads: int):
+    """Return (preprocessor, OnnxClassifier), exporting on first use."""
+    paths = export_onnx(model_name, cache_dir, quantize=quantize)
+    with open(paths["meta"], encoding="utf-8") as f:
+        meta = json.load(f)
+    model = OnnxClassifier(paths["int8"] if quantize else paths["fp32"], meta, num_threads)
+    return model.preprocessor, model
@@ -0,0 +1,290 @@
+"""
+Phrase-level TTS — EventHorizon AI
+====================================
+Advisory texts are built from a small set of templates (advisory_templates)
+where only a few tokens change: NDVI values, day counts, crop names. Rather
+than synthesizing every advisory from scratch, this module
+
+  1. pre-synthesizes (batch job: presynth_phrases.py) the fixed phrases of
+     every template for every language in the Azure VOICE_DB, storing them
+     in the disk audio store;
+  2. at playback, splices the cached phrase clips with freshly synthesized
+     (and from then on cached) dynamic parts. Clips are trimmed of edge
+     silence, faded over a few ms and joined with a short pause in one
+     preallocated PCM buffer, so the joins don't click.
+
+Non-English templates are localized by translating the English template
+with its fields replaced by markers ([1], [2], …), so each language keeps
+its own word order. If a translation drops a marker, that template is
+spoken whole in that language (still cached) instead of spliced. The
+translated templates are kept in a phrasebook next to the audio store.
+
+All clips come from the Azure voice of the language so the splice sounds
+like one speaker; without Azure, speak_template returns None and callers
+fall back to the regular TTS tiers.
+"""
+
+import os
+import re
+import json
+import array
+import string
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.services.advisory_templates import ADVISORY_TEMPLATES
+from app.services.audio_store import audio_store, audio_key
+
+logger = logging.getLogger("eventhorizon.phrase_tts")
+
+PHRASE_VOICE = "phrase"  # audio_store voice namespace for phrase clips
+JOIN_GAP_MS = int(os.getenv("PHRASE_JOIN_GAP_MS", "60"))
+EDGE_PAD_MS = 30
+FADE_MS = 8
+SILENCE_LEVEL = 400
+
+_MARKER = re.compile(r"\[(\d+)\]")
+_PHRASEBOOK_PATH = os.path.join(str(audio_store.root), "phrasebook.json")
+_phrasebook: Optional[Dict[str, Dict[str, Optional[list]]]] = None
+_phrasebook_lock = threading.Lock()
+
+stats = {"spliced": 0, "whole": 0, "segments_cached": 0, "segments_synthesized": 0, "failures": 0}
+
+
+# ──────────────────────────────────────────────────────────────
+# Template segmentation / localization
+# ──────────────────────────────────────────────────────────────
+
+def english_segments(template_id: str) -> list:
+    """[literal | (field_name, format_spec), …] for the English template."""
+    parts = []
+    for literal, field, spec, _ in string.Formatter().parse(ADVISORY_TEMPLATES[template_id][2]):
+        if literal:
+            parts.append(literal)
+        if field is not None:
+            parts.append((field, spec or ""))
+    return parts
+
+
+def _localize(template_id: str, language: str) -> Optional[list]:
+    """Translate a template with fields as [n] markers and split it back; None if a marker was lost."""
+    from app.services.translator import translator
+
+    segments = english_segments(template_id)
+    fields = [seg for seg in segments if isinstance(seg, tuple)]
+    marked = "".join(seg if isinstance(seg, str) else f"[{fields.index(seg) + 1}]" for seg in segments)
+    translated = translator.translate_from_english(marked, language)
+    if not translated or translated == marked:  # translation failed and returned the input
+        return None
+
+    found = [int(n) for n in _MARKER.findall(translated)]
+    if sorted(found) != list(range(1, len(fields) + 1)):
+        return None
+    out, pos = [], 0
+    for m in _MARKER.finditer(translated):
+        if m.start() > pos:
+            out.append(translated[pos:m.start()])
+        out.append(list(fields[int(m.group(1)) - 1]))
+        pos = m.end()
+    if pos < len(translated):
+        out.append(translated[pos:])
+    return out
+
+
+def _load_phrasebook() -> Dict[str, Dict[str, Optional[list]]]:
+    global _phrasebook
+    if _phrasebook is None:
+        with _phrasebook_lock:
+            if _phrasebook is None:
+                try:
+                    with open(_PHRASEBOOK_PATH, encoding="utf-8") as f:
+                        _phrasebook = json.load(f)
+                except (OSError, ValueError):
+                    _phrasebook = {}
+    return _phrasebook
+
+
+def _save_phrasebook():
+    os.makedirs(os.path.dirname(_PHRASEBOOK_PATH), exist_ok=True)
+    tmp = _PHRASEBOOK_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_load_phrasebook(), f, ensure_ascii=False, indent=1)
+    os.replace(tmp, _PHRASEBOOK_PATH)
+
+
+def template_segments(template_id: str, language: str, translate: bool = False) -> Optional[list]:
+    """Segments of a template in `language` (English is native; others come from the phrasebook)."""
+    if language.startswith("en"):
+        return english_segments(template_id)
+    book = _load_phrasebook().setdefault(language, {})
+    if template_id not in book and translate:
+        book[template_id] = _localize(template_id, language)
+    segs = book.get(template_id)
+    return [tuple(s) if isinstance(s, list) else s for s in segs] if segs else None
+
+
+def _speakable(text: str) -> bool:
+    return any(ch.isalnum() for ch in text)
+
+
+# ──────────────────────────────────────────────────────────────
+# Clips
+# ──────────────────────────────────────────────────────────────
+
+def phrase_clip(text: str, language: str, synthesize: bool = True) -> Optional[bytes]:
+    """WAV for one phrase from the audio store, synthesizing (and storing) it on a miss. Blocking."""
+    text = " ".join(text.split())
+    key = audio_key(text, language, PHRASE_VOICE, "wav")
+    cached = audio_store.get(key)
+    if cached is not None:
+        stats["segments_cached"] += 1
+        return cached[0]
+    if not synthesize:
+        return None
+
+    from app.services.azure_tts_engine import casual_voice_engine
+
+    if not casual_voice_engine.is_available:
+        return None
+    wav = casual_voice_engine.speak_natural(text, language)
+    if wav:
+        stats["segments_synthesized"] += 1
+        audio_store.put(key, wav, "wav")
+    return wav
+
+
+def _trim(pcm: array.array, sample_rate: int) -> array.array:
+    """Cut leading/trailing silence down to EDGE_PAD_MS and fade both edges."""
+    pad = sample_rate * EDGE_PAD_MS // 1000
+    start, end = 0, len(pcm)
+    while start < end and abs(pcm[start]) < SILENCE_LEVEL:
+        start += 1
+    while end > start and abs(pcm[end - 1]) < SILENCE_LEVEL:
+        end -= 1
+    clip = pcm[max(0, start - pad):min(len(pcm), end + pad)]
+    fade = min(len(clip) // 2, sample_rate * FADE_MS // 1000)
+    for i in range(fade):
+        gain = i / fade
+        clip[i] = int(clip[i] * gain)
+        clip[-1 - i] = int(clip[-1 - i] * gain)
+    return clip
+
+
+def splice_wavs(clips: List[bytes], gap_ms: int = JOIN_GAP_MS) -> Optional[bytes]:
+    """Join WAV clips (same sample rate) into one WAV: trimmed, faded, short pause between."""
+    from app.services.streaming_tts import wav_pcm, pcm_to_wav
+
+    parts, sample_rate = [], None
+    for clip in clips:
+        pcm_view, rate = wav_pcm(clip)
+        if sample_rate is None:
+            sample_rate = rate
+        elif rate != sample_rate:
+            return None
+        samples = array.array("h")
+        samples.frombytes(bytes(pcm_view[:len(pcm_view) & ~1]))
+        parts.append(_trim(samples, rate))
+    if not parts:
+        return None
+
+    gap = sample_rate * gap_ms // 1000
+    total = sum(len(p) for p in parts) + gap * (len(parts) - 1)
+    out = array.array("h", bytes(total * 2))  # preallocated, zero = silence for the gaps
+    offset = 0
+    for i, part in enumerate(parts):
+        out[offset:offset + len(part)] = part
+        offset += len(part) + gap
+    return pcm_to_wav(out.tobytes(), sample_rate)
+
+
+def _format_field(value: Any, spec: str) -> str:
+    try:
+        return format(value, spec)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def speak_template(template_id: str, language: str, params: Dict[str, Any]) -> Optional[bytes]:
+    """
+    Spliced WAV for a rendered template: cached fixed phrases + dynamic
+    parts. Falls back to synthesizing the whole rendered text (cached under
+    the same phrase namespace) when the template isn't localized for the
+    language. Blocking. None if Azure can't produce it.
+    """
+    from app.services.advisory_templates import render
+
+    segments = template_segments(template_id, language)
+    if segments is None:
+        text = render(template_id, **params)
+        if not language.startswith("en"):
+            from app.services.translator import translator
+            text = translator.translate_from_english(text, language)
+        wav = phrase_clip(text, language)
+        stats["whole" if wav else "failures"] += 1
+        return wav
+
+    clips = []
+    for seg in segments:
+        text = seg if isinstance(seg, str) else _format_field(params.get(seg[0], ""), seg[1])
+        if not _speakable(text):
+            continue
+        clip = phrase_clip(text, language)
+        if not clip:
+            stats["failures"] += 1
+            return None
+        clips.append(clip)
+
+    wav = splice_wavs(clips)
+    stats["spliced" if wav else "failures"] += 1
+    return wav
+
+
+# ──────────────────────────────────────────────────────────────
+# Batch pre-synthesis
+# ──────────────────────────────────────────────────────────────
+
+def presynthesize(languages: Optional[List[str]] = None, numbers: bool = False) -> Dict[str, Any]:
+    """
+    Localize every advisory template and synthesize all fixed phrases (with
+    `numbers` also the NDVI values 0.00–1.00 and day counts 1–12) for each
+    language. Already-stored clips are skipped, so
+    re-running is cheap. Blocking — meant for presynth_phrases.py.
+    """
+    from app.services.azure_tts_engine import UniversalCasualIndianVoice
+
+    languages = languages or [lang for lang in UniversalCasualIndianVoice.VOICE_DB if lang != "en_in"]
+    report = {}
+    for language in languages:
+        phrases = set()
+        localized = 0
+        for template_id in ADVISORY_TEMPLATES:
+            segments = template_segments(template_id, language, translate=True)
+            if segments is None:
+                continue
+            localized += 1
+            phrases.update(" ".join(s.split()) for s in segments if isinstance(s, str) and _speakable(s))
+        if numbers:
+            phrases.update(f"{n / 100:.2f}" for n in range(101))
+            phrases.update(str(n) for n in range(1, 13))
+
+        before = stats["segments_synthesized"]
+        failed = [p for p in sorted(phrases) if not phrase_clip(p, language)]
+        report[language] = {
+            "templates_localized": localized,
+            "phrases": len(phrases),
+            "synthesized": stats["segments_synthesized"] - before,
+            "failed": len(failed),
+        }
+        logger.info(f"[PhraseTTS] {language}: {report[language]}")
+    _save_phrasebook()
+    return report
+
+
+def get_phrase_stats() -> Dict[str, Any]:
+    used = stats["segments_cached"] + stats["segments_synthesized"]
+    return {
+        **stats,
+        "segment_cache_rate": round(stats["segments_cached"] / used, 3) if used else 0.0,
+        "languages_localized": sorted(_load_phrasebook()),
+    }
@@ -139,38 +139,11 @@ def _compute_flood_score(day_data: Dict[str, Any]) -> float:
 # ---------------------------------------------------------------------------
 
 def _generate_advisory(risk_type: str, score: float, day_data: Dict[str, Any], crop: str) -> str:
-    """Generate human-readable advisory for a risk type."""
-    label = _label(score)
-
-    if risk_type == "drought":
-        if label == "Low":
-            return f"Soil moisture levels look adequate for {crop}. Continue regular irrigation schedule."
-        elif label == "Moderate":
-            return f"Moderate drought stress possible. Consider increasing irrigation frequency for {crop} and applying mulch to retain soil moisture."
-        elif label == "High":
-            return f"High drought risk detected. Immediately increase irrigation for {crop}. Avoid transplanting young seedlings. Apply organic mulch and consider shade nets."
-        else:
-            return f"CRITICAL: Severe drought conditions expected. Emergency irrigation needed for {crop}. Postpone all planting. Prioritize water conservation — drip irrigation recommended."
-
-    elif risk_type == "pest":
-        if label == "Low":
-            return f"Low pest pressure expected. Maintain routine scouting for {crop} fields."
-        elif label == "Moderate":
-            return f"Moderate pest risk — warm, humid conditions favour insect activity. Increase scouting frequency for {crop}. Consider neem-based organic sprays as preventive."
-        elif label == "High":
-            return f"High pest risk: temperature and humidity in the danger zone for {crop}. Deploy pheromone traps, apply bio-pesticides, and inspect undersides of leaves daily."
-        else:
-            return f"CRITICAL pest outbreak conditions for {crop}. Immediate integrated pest management needed. Consult your local agricultural officer. Avoid broad-spectrum chemicals — use targeted bio-controls."
-
-    else:  # flood
-        if label == "Low":
-            return f"Minimal flooding risk. Drainage systems should handle expected rainfall for {crop} fields."
-        elif label == "Moderate":
-            return f"Moderate flood risk — ensure field drainage channels are clear for {crop}. Avoid low-lying areas for new planting."
-        elif label == "High":
-            return f"High flood risk detected. Clear all drainage channels immediately. Consider temporary bunding around {crop} fields. Harvest mature crops early if possible."
-        else:
-            return f"CRITICAL: Severe flooding likely. Evacuate livestock from low-lying {crop} fields. Do NOT enter waterlogged fields. Contact district agriculture helpline for emergency support."
+    """Generate human-readable advisory for a risk type (texts in advisory_templates)."""
+    from app.services.advisory_templates import render
+
+    risk_type = risk_type if risk_type in ("drought", "pest") else "flood"
+    return render(f"risk.{risk_type}.{_label(score).lower()}", crop=crop)
 
 
 # ---------------------------------------------------------------------------
@@ -331,66 +331,22 @@ async def _get_ndvi_analysis_impl(
 
 
 def _build_advisory(ndvi: float, trend: Dict[str, Any]) -> Dict[str, str]:
-    """Generate human-readable advisory from NDVI data."""
+    """Generate human-readable advisory from NDVI data (texts in advisory_templates)."""
+    from app.services.advisory_templates import advisory
+
     signal = trend["signal"]
-    direction = trend["direction"]
-
-    if signal == "drought_alert":
-        return {
-            "severity": "critical",
-            "title": "⚠️ Early Drought Signal Detected",
-            "message": (
-                f"Vegetation index has been declining for {trend['consecutive_drops']} consecutive "
-                f"periods and is now at {ndvi:.2f} (stressed level). This is a strong early indicator "
-                f"of drought stress. Increase irrigation immediately and consider mulching."
-            ),
-        }
-    elif signal == "persistent_decline":
-        return {
-            "severity": "warning",
-            "title": "📉 Persistent Vegetation Decline",
-            "message": (
-                f"Vegetation health has dropped for {trend['consecutive_drops']} consecutive periods. "
-                f"Current NDVI: {ndvi:.2f}. Monitor closely and check for pest damage, nutrient "
-                f"deficiency, or water stress."
-            ),
-        }
+    ndvi = round(float(ndvi), 2)
+
+    if signal in ("drought_alert", "persistent_decline"):
+        return advisory(f"ndvi.{signal}", drops=int(trend["consecutive_drops"]), ndvi=ndvi)
     elif signal == "browning":
-        return {
-            "severity": "warning",
-            "title": "🍂 Browning Detected",
-            "message": (
-                f"Vegetation greenness has decreased by {abs(trend['change_16day']):.3f} in the last "
-                f"16 days. Current NDVI: {ndvi:.2f}. This may be seasonal or indicate emerging stress."
-            ),
-        }
+        return advisory("ndvi.browning", change=round(abs(float(trend["change_16day"])), 3), ndvi=ndvi)
     elif signal == "stress_warning":
-        return {
-            "severity": "warning",
-            "title": "🔻 Vegetation Stress Warning",
-            "message": (
-                f"NDVI is at {ndvi:.2f} (stressed range) and declining. Check soil moisture, "
-                f"irrigation systems, and look for pest/disease signs."
-            ),
-        }
+        return advisory("ndvi.stress_warning", ndvi=ndvi)
     elif signal == "greening":
-        return {
-            "severity": "positive",
-            "title": "🌱 Vegetation Recovery / Growth",
-            "message": (
-                f"Vegetation health is improving — NDVI increased by {trend['change_16day']:.3f} "
-                f"in the last period. Current: {ndvi:.2f}. Growth looks healthy."
-            ),
-        }
+        return advisory("ndvi.greening", change=round(float(trend["change_16day"]), 3), ndvi=ndvi)
     else:
-        return {
-            "severity": "info",
-            "title": "✅ Vegetation Stable",
-            "message": (
-                f"Current NDVI: {ndvi:.2f}. Vegetation health is stable with no significant "
-                f"changes detected. Continue routine monitoring."
-            ),
-        }
+        return advisory("ndvi.stable", ndvi=ndvi)
 
 
 def _fallback_response(lat: float, lon: float, reason: str) -> Dict[str, Any]:
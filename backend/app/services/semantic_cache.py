@@ -0,0 +1,335 @@
+"""
+Semantic Chat Cache — EventHorizon AI
+=======================================
+The exact chat cache keys on SHA-256(message + full history), so "tomato
+price today?", "what is the tomato rate today" and "aaj tamatar ka bhav"
+are three misses. This layer sits behind it and matches on normalized
+intent instead:
+
+  1. normalize — NFKC, lowercase, punctuation stripped; Indic scripts are
+     mapped onto Devanagari (the Unicode blocks are parallel) and then
+     romanized with schwa deletion and short vowels, so "टमाटर" and a
+     typed "tamatar" come out the same; a few spelling variants are folded
+     (bhaav → bhav, rate → price) and stopwords in English and romanized
+     Hindi are dropped.
+  2. embed — hashed character 3/4-grams plus word unigrams into a sparse,
+     L2-normalized vector (no model, ~0.1 ms per query on CPU). The last
+     user turn of the history is mixed in at a lower weight, so a
+     follow-up like "and onions?" only matches under the same topic.
+  3. look up — brute-force cosine over the entries of the same scope
+     (language, page_context); the hit threshold is per scope
+     (SEMANTIC_CACHE_THRESHOLDS, most specific wins). Queries with numbers
+     hit only if the numbers match exactly, and a negated question ("not",
+     "don't", "never", "nahi", "mat" …) never matches an un-negated one.
+  4. TTL by topic — prices/mandi answers expire after
+     SEMANTIC_CACHE_TTL_PRICE_S, weather after SEMANTIC_CACHE_TTL_WEATHER_S,
+     anything else after SEMANTIC_CACHE_TTL_S.
+"""
+
+import os
+import re
+import math
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("eventhorizon.semantic_cache")
+
+ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+DEFAULT_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.82"))
+MAX_ENTRIES_PER_SCOPE = int(os.getenv("SEMANTIC_CACHE_MAX_PER_SCOPE", "2000"))
+TTL_DEFAULT_S = int(os.getenv("SEMANTIC_CACHE_TTL_S", "21600"))
+TTL_PRICE_S = int(os.getenv("SEMANTIC_CACHE_TTL_PRICE_S", "900"))
+TTL_WEATHER_S = int(os.getenv("SEMANTIC_CACHE_TTL_WEATHER_S", "1800"))
+HISTORY_WEIGHT = 0.35
+DIMENSIONS = 1 << 18
+
+
+def _parse_thresholds(spec: str) -> Dict[str, float]:
+    """'hi=0.85,market=0.9,hi/market=0.92' -> {scope: threshold}."""
+    out = {}
+    for part in spec.split(","):
+        scope, _, value = part.partition("=")
+        if scope.strip() and value.strip():
+            out[scope.strip()] = float(value)
+    return out
+
+
+THRESHOLDS = {
+    # Market answers differ by crop and mandi — demand near-identical questions
+    "market": 0.9,
+    **_parse_thresholds(os.getenv("SEMANTIC_CACHE_THRESHOLDS", "")),
+}
+
+
+# ──────────────────────────────────────────────────────────────
+# Normalization
+# ──────────────────────────────────────────────────────────────
+
+_DEVANAGARI = 0x0900
+_INDIC_BLOCKS = range(0x0900, 0x0D80)  # Devanagari … Malayalam, 128 code points each, parallel layout
+
+_VOWELS = {
+    0x05: "a", 0x06: "a", 0x07: "i", 0x08: "i", 0x09: "u", 0x0A: "u", 0x0B: "ri",
+    0x0E: "e", 0x0F: "e", 0x10: "ai", 0x12: "o", 0x13: "o", 0x14: "au",
+}
+_MATRAS = {
+    0x3E: "a", 0x3F: "i", 0x40: "i", 0x41: "u", 0x42: "u", 0x43: "ri",
+    0x46: "e", 0x47: "e", 0x48: "ai", 0x4A: "o", 0x4B: "o", 0x4C: "au",
+}
+_CONSONANTS = dict(zip(range(0x15, 0x3A), [
+    "k", "kh", "g", "gh", "n", "ch", "chh", "j", "jh", "n", "t", "th", "d", "dh", "n",
+    "t", "th", "d", "dh", "n", "n", "p", "ph", "b", "bh", "m", "y", "r", "r", "l", "l",
+    "l", "v", "sh", "sh", "s", "h",
+]))
+_VIRAMA, _ANUSVARA = 0x4D, 0x02
+_DIGITS = range(0x66, 0x70)
+
+
+def _romanize_indic(text: str) -> str:
+    out: List[str] = []
+    pending_a = False  # a consonant's inherent vowel not yet confirmed or replaced
+    for ch in text:
+        cp = ord(ch)
+        if cp not in _INDIC_BLOCKS:
+            if pending_a and not ch.isalpha():
+                pending_a = False  # schwa deletion at the end of a word
+            elif pending_a:
+                out.append("a")
+                pending_a = False
+            out.append(ch)
+            continue
+        offset = (cp - _DEVANAGARI) % 0x80
+        if offset in _CONSONANTS:
+            if pending_a:
+                out.append("a")
+            out.append(_CONSONANTS[offset])
+            pending_a = True
+        elif offset in _MATRAS:
+            out.append(_MATRAS[offset])
+            pending_a = False
+        elif offset == _VIRAMA:
+            pending_a = False
+        elif offset in _VOWELS:
+            if pending_a:
+                out.append("a")
+                pending_a = False
+            out.append(_VOWELS[offset])
+        elif offset == _ANUSVARA:
+            if pending_a:
+                out.append("a")
+                pending_a = False
+            out.append("n")
+        elif offset in _DIGITS:
+            out.append(str(offset - 0x66))
+        # nukta, visarga, avagraha, danda … carry no sound we need
+    return "".join(out)
+
+
+_FOLDS = [
+    (re.compile(r"aa|ā"), "a"),                # bhaav / bhav, paani / pani
+    (re.compile(r"ee|ii|ī"), "i"),
+    (re.compile(r"oo|uu|ū"), "u"),
+    (re.compile(r"\b(rate|rates|cost|prices|daam|dam|bhav)\b"), "price"),
+    (re.compile(r"\b(aj|todays)\b"), "today"),
+    (re.compile(r"\b(kal)\b"), "tomorrow"),
+    (re.compile(r"\b(mausam|mosam)\b"), "weather"),
+    (re.compile(r"\b(barish|baarish|barsat)\b"), "rain"),
+    (re.compile(r"\b(nahin|nahi|nai|nhi|never)\b"), "not"),
+]
+
+# Negation markers after folding: a question with one never hits an entry without
+NEGATIONS = {"not", "no", "na", "mat", "n"}  # "n" is a bare न after schwa deletion
+_CONTRACTED_NOT = re.compile(r"n['’]t\b")      # don't / can't / won't / shouldn't -> "… not"
+
+STOPWORDS = {
+    # English
+    "a", "an", "the", "is", "are", "was", "be", "of", "for", "to", "in", "on", "at", "my", "me", "i",
+    "what", "whats", "how", "much", "tell", "please", "can", "you", "give", "about", "and", "or",
+    "do", "does", "current", "now", "s", "should", "will", "it", "this", "that", "there", "any",
+    # romanized Hindi / Hinglish
+    "ka", "ki", "ke", "ko", "kya", "hai", "he", "hain", "kitna", "kitni", "batao", "bataiye",
+    "mujhe", "mera", "meri", "se", "me", "mein", "aur", "kaise", "kyon", "ji", "bhai", "abhi",
+}
+
+_PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def normalize(message: str) -> str:
+    text = unicodedata.normalize("NFKC", message).lower()
+    text = _romanize_indic(text)
+    text = _CONTRACTED_NOT.sub(" not", text)
+    text = _PUNCT.sub(" ", text)
+    for pattern, repl in _FOLDS:
+        text = pattern.sub(repl, text)
+    return " ".join(w for w in text.split() if w not in STOPWORDS)
+
+
+def _negated(normalized: str) -> bool:
+    return any(w in NEGATIONS for w in normalized.split())
+
+
+# ──────────────────────────────────────────────────────────────
+# Embedding
+# ──────────────────────────────────────────────────────────────
+
+def _hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little") % DIMENSIONS
+
+
+def _features(text: str, weight: float, vec: Dict[int, float]):
+    for word in text.split():
+        h = _hash("w:" + word)
+        vec[h] = vec.get(h, 0.0) + 2.0 * weight
+        padded = f" {word} "
+        for n in (3, 4):
+            for i in range(len(padded) - n + 1):
+                h = _hash(padded[i:i + n])
+                vec[h] = vec.get(h, 0.0) + weight
+
+
+def embed(normalized: str, context: str = "") -> Dict[int, float]:
+    """Sparse hashed n-gram vector (L2-normalized) of a normalized query, with optional context mixed in."""
+    vec: Dict[int, float] = {}
+    _features(normalized, 1.0, vec)
+    if context:
+        _features(context, HISTORY_WEIGHT, vec)
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {k: v / norm for k, v in vec.items()}
+
+
+def _cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def topic_ttl(normalized: str) -> Tuple[str, int]:
+    words = set(normalized.split())
+    if words & {"price", "mandi", "market", "sell", "msp", "quintal"}:
+        return "price", TTL_PRICE_S
+    if words & {"weather", "rain", "forecast", "temperature", "tomorrow", "today", "humidity", "wind"}:
+        return "weather", TTL_WEATHER_S
+    return "general", TTL_DEFAULT_S
+
+
+def _last_user_turn(history: Optional[list]) -> str:
+    for turn in reversed(history or []):
+        if isinstance(turn, dict) and turn.get("role", "user") not in ("assistant", "model", "ai"):
+            text = turn.get("content", "")
+            if text:
+                return str(text)
+    return ""
+
+
+# ──────────────────────────────────────────────────────────────
+# Cache
+# ──────────────────────────────────────────────────────────────
+
+class _Entry:
+    __slots__ = ("vector", "numbers", "negated", "normalized", "response", "expires", "topic")
+
+    def __init__(self, vector, numbers, negated, normalized, response, expires, topic):
+        self.vector = vector
+        self.numbers = numbers
+        self.negated = negated
+        self.normalized = normalized
+        self.response = response
+        self.expires = expires
+        self.topic = topic
+
+
+class SemanticChatCache:
+    def __init__(self, clock=time.time):
+        self._scopes: Dict[Tuple[str, str], "OrderedDict[str, _Entry]"] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+        self.stats = {"lookups": 0, "hits": 0, "misses": 0, "expired": 0, "number_mismatch": 0,
+                      "negation_mismatch": 0, "stores": 0}
+
+    @staticmethod
+    def threshold(language: str, page_context: str) -> float:
+        for scope in (f"{language}/{page_context}", page_context, language):
+            if scope in THRESHOLDS:
+                return THRESHOLDS[scope]
+        return DEFAULT_THRESHOLD
+
+    def _query(self, message: str, history: Optional[list]):
+        normalized = normalize(message)
+        context = normalize(_last_user_turn(history))
+        return normalized, embed(normalized, context), frozenset(_NUMBER.findall(normalized)), _negated(normalized)
+
+    def get(self, message: str, language: str, page_context: str,
+            history: Optional[list] = None) -> Optional[Tuple[str, float]]:
+        """(response, similarity) of the nearest live entry in scope above its threshold, else None."""
+        if not ENABLED:
+            return None
+        normalized, vector, numbers, negated = self._query(message, history)
+        if not normalized:
+            return None
+        threshold = self.threshold(language, page_context)
+        now = self._clock()
+        self.stats["lookups"] += 1
+        best, best_sim = None, 0.0
+        with self._lock:
+            entries = self._scopes.get((language, page_context))
+            if entries:
+                for key in [k for k, e in entries.items() if e.expires <= now]:
+                    del entries[key]
+                    self.stats["expired"] += 1
+                for key, entry in entries.items():
+                    sim = _cosine(vector, entry.vector)
+                    if sim > best_sim:
+                        best, best_sim = key, sim
+            if best is not None and best_sim >= threshold:
+                entry = entries[best]
+                if entry.numbers != numbers:
+                    self.stats["number_mismatch"] += 1
+                elif entry.negated != negated:
+                    self.stats["negation_mismatch"] += 1
+                else:
+                    entries.move_to_end(best)
+                    self.stats["hits"] += 1
+                    return entry.response, best_sim
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, message: str, language: str, page_context: str, response: str,
+            history: Optional[list] = None):
+        if not ENABLED or not response:
+            return
+        normalized, vector, numbers, negated = self._query(message, history)
+        if not normalized:
+            return
+        topic, ttl = topic_ttl(normalized)
+        key = hashlib.sha256(f"{normalized}\0{_last_user_turn(history)}".encode("utf-8")).hexdigest()
+        with self._lock:
+            entries = self._scopes.setdefault((language, page_context), OrderedDict())
+            entries[key] = _Entry(vector, numbers, negated, normalized, response, self._clock() + ttl, topic)
+            entries.move_to_end(key)
+            while len(entries) > MAX_ENTRIES_PER_SCOPE:
+                entries.popitem(last=False)
+            self.stats["stores"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            sizes = {f"{lang}/{ctx}": len(e) for (lang, ctx), e in self._scopes.items()}
+        lookups = self.stats["lookups"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": sizes,
+            "enabled": ENABLED,
+        }
+
+
+semantic_chat_cache = SemanticChatCache()
@@ -10,10 +10,11 @@ Uses OAuth2 client_credentials flow — no extra libraries needed.
 
 import os
 import time
+import asyncio
 import requests
 import httpx
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,8 +30,15 @@ TOKEN_URL = "https://identity.dataspace.copernicus.eu/auth/realms/CDSE/protocol/
 STATS_URL = "https://sh.dataspace.copernicus.eu/api/v1/statistics"
 
 _token_cache: Dict[str, Any] = {"token": None, "expires_at": 0}
+_token_lock = asyncio.Lock()
 _sh_cache = TTLCache(ttl_seconds=14400)  # 4-hour cache
 
+# Batching — requests arriving within the window are flushed together
+# and sent concurrently under one shared semaphore / HTTP connection pool.
+BATCH_WINDOW_SECONDS = float(os.getenv("SENTINELHUB_BATCH_WINDOW_MS", "25")) / 1000.0
+BATCH_MAX_SIZE = int(os.getenv("SENTINELHUB_BATCH_MAX_SIZE", "16"))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("SENTINELHUB_MAX_CONCURRENCY", "4"))
+
 # NDVI evalscript for Sentinel-2 L2A
 NDVI_EVALSCRIPT = """
 //VERSION=3
@@ -70,12 +78,31 @@ def is_sentinel_hub_configured() -> bool:
     return bool(cid) and bool(secret)
 
 
-async def _get_access_token(client: httpx.AsyncClient) -> Optional[str]:
-    """Get OAuth2 access token using client_credentials flow."""
-    # Check cache
+def _cached_token() -> Optional[str]:
     if _token_cache["token"] and time.time() < _token_cache["expires_at"] - 60:
         return _token_cache["token"]
+    return None
+
 
+async def _get_access_token(client: httpx.AsyncClient) -> Optional[str]:
+    """
+    Get OAuth2 access token using client_credentials flow.
+    Refreshes are serialized behind a lock so concurrent callers that all
+    see an expired token trigger a single token request between them.
+    """
+    token = _cached_token()
+    if token:
+        return token
+
+    async with _token_lock:
+        # Another coroutine may have refreshed while we waited
+        token = _cached_token()
+        if token:
+            return token
+        return await _refresh_access_token(client)
+
+
+async def _refresh_access_token(client: httpx.AsyncClient) -> Optional[str]:
     cid, secret = _get_credentials()
     if not cid or not secret:
         return None
@@ -126,26 +153,137 @@ async def fetch_sentinel_ndvi(
     """
     Fetch NDVI time series from Sentinel Hub Statistical API.
 
+    Requests are queued on the shared batcher, which flushes every
+    BATCH_WINDOW_SECONDS and fans the results back out to each caller.
+
     Args:
         lat, lon: Location coordinates
         days_back: How many days of history (default 90)
         interval_days: Aggregation interval in days (default 5)
-        client: Optional shared httpx AsyncClient
+        client: Optional shared httpx AsyncClient (used only when batching
+                is disabled with SENTINELHUB_BATCH_WINDOW_MS=0)
 
     Returns:
         Parsed NDVI data dict or None on failure.
     """
-    cache_key = f"sh_ndvi_{round(lat, 3)}_{round(lon, 3)}_{days_back}"
+    cache_key = _cache_key(lat, lon, days_back, interval_days)
     cached = _sh_cache.get(cache_key)
     if cached:
         return cached
 
-    if client is None:
-        async with httpx.AsyncClient(timeout=30.0) as local_client:
-            return await _fetch_sentinel_ndvi_impl(lat, lon, days_back, interval_days, local_client, cache_key)
-    else:
+    if BATCH_WINDOW_SECONDS <= 0:
+        if client is None:
+            async with httpx.AsyncClient(timeout=30.0) as local_client:
+                return await _fetch_sentinel_ndvi_impl(lat, lon, days_back, interval_days, local_client, cache_key)
         return await _fetch_sentinel_ndvi_impl(lat, lon, days_back, interval_days, client, cache_key)
 
+    return await _batcher.submit(lat, lon, days_back, interval_days)
+
+
+async def fetch_sentinel_ndvi_many(
+    points: List[Tuple[float, float]],
+    days_back: int = 90,
+    interval_days: int = 5,
+) -> List[Optional[Dict[str, Any]]]:
+    """Fetch NDVI for many fields at once. Results are in the same order as `points`."""
+    return await asyncio.gather(*[
+        fetch_sentinel_ndvi(lat, lon, days_back=days_back, interval_days=interval_days)
+        for lat, lon in points
+    ])
+
+
+def _cache_key(lat: float, lon: float, days_back: int, interval_days: int) -> str:
+    return f"sh_ndvi_{round(lat, 3)}_{round(lon, 3)}_{days_back}_{interval_days}"
+
+
+class _SentinelBatcher:
+    """
+    Collects pending Statistical API requests over a short window and
+    submits them together: identical requests are coalesced, distinct ones
+    run concurrently under a shared semaphore on one pooled HTTP client,
+    and a single token refresh serves the whole batch.
+    """
+
+    def __init__(self, window: float, max_size: int, max_concurrency: int):
+        self.window = window
+        self.max_size = max_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending: Dict[str, Tuple[float, float, int, int, List[asyncio.Future]]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats = {"requests": 0, "coalesced": 0, "batches": 0, "upstream_calls": 0}
+
+    def submit(self, lat: float, lon: float, days_back: int, interval_days: int) -> "asyncio.Future":
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        key = _cache_key(lat, lon, days_back, interval_days)
+        self.stats["requests"] += 1
+
+        if key in self._pending:
+            self._pending[key][4].append(fut)
+            self.stats["coalesced"] += 1
+        else:
+            self._pending[key] = (lat, lon, days_back, interval_days, [fut])
+
+        if len(self._pending) >= self.max_size:
+            self._schedule_flush(loop, immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop)
+        return fut
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, immediate: bool = False):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        if immediate:
+            self._flush_handle = None
+            batch, self._pending = self._pending, {}
+            self._start_batch(loop, batch)
+        else:
+            self._flush_handle = loop.call_later(self.window, self._on_timer, loop)
+
+    def _start_batch(self, loop: asyncio.AbstractEventLoop, batch):
+        # The loop only keeps weak references to tasks; hold one until the batch finishes
+        task = loop.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_timer(self, loop: asyncio.AbstractEventLoop):
+        self._flush_handle = None
+        if self._pending:
+            batch, self._pending = self._pending, {}
+            self._start_batch(loop, batch)
+
+    async def _run_batch(self, batch: Dict[str, Tuple[float, float, int, int, List[asyncio.Future]]]):
+        self.stats["batches"] += 1
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            # Refresh the token once up front so the batch does not stampede the IdP
+            await _get_access_token(client)
+
+            async def _one(key, lat, lon, days_back, interval_days, waiters):
+                try:
+                    async with self._semaphore:
+                        self.stats["upstream_calls"] += 1
+                        result = await _fetch_sentinel_ndvi_impl(lat, lon, days_back, interval_days, client, key)
+                except Exception as e:
+                    print(f"[SentinelHub] Batched fetch failed for {key}: {e}")
+                    result = None
+                for fut in waiters:
+                    if not fut.done():
+                        fut.set_result(result)
+
+            await asyncio.gather(*[
+                _one(key, lat, lon, days_back, interval_days, waiters)
+                for key, (lat, lon, days_back, interval_days, waiters) in batch.items()
+            ])
+
+
+_batcher = _SentinelBatcher(BATCH_WINDOW_SECONDS, BATCH_MAX_SIZE, MAX_CONCURRENT_REQUESTS)
+
+
+def get_batcher_stats() -> Dict[str, int]:
+    """Counters for the request batcher (requests, coalesced, batches, upstream_calls)."""
+    return dict(_batcher.stats)
+
 
 async def _fetch_sentinel_ndvi_impl(
     lat: float,
@@ -0,0 +1,119 @@
+"""
+Stage DAG Executor — EventHorizon AI
+======================================
+Runs a request pipeline as a small dependency graph: every stage starts as
+soon as the stages it depends on have *finished* (in any state), so
+independent stages overlap. Each stage has its own timeout; a failed or
+timed-out non-critical stage just leaves its output missing, while a
+critical failure cancels the remaining stages and is raised to the caller.
+
+Used by VisionDiagnosticService.diagnose (vision → price ∥ translate → tts).
+"""
+
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+OK = "ok"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+
+
+class StageFailed(Exception):
+    """A critical stage failed or timed out."""
+
+    def __init__(self, stage: str, status: str, error: Optional[str]):
+        super().__init__(f"{stage} {status}: {error}")
+        self.stage = stage
+        self.status = status
+        self.error = error
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[[], Awaitable[Any]], deps: Iterable[str], timeout: float, critical: bool):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.critical = critical
+        self.status: Optional[str] = None
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.start_ms: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+
+
+class StageExecutor:
+    def __init__(self):
+        self._stages: Dict[str, _Stage] = {}
+        self._t0: Optional[float] = None
+
+    def add(self, name: str, fn: Callable[[], Awaitable[Any]], deps: Iterable[str] = (),
+            timeout: float = 30.0, critical: bool = False):
+        """Register a stage. `fn` is a zero-arg coroutine factory; deps must be added first."""
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stages: {missing}")
+        self._stages[name] = _Stage(name, fn, deps, timeout, critical)
+
+    async def _run_stage(self, stage: _Stage, handles: Dict[str, asyncio.Task]):
+        if stage.deps:
+            await asyncio.gather(*(handles[d] for d in stage.deps), return_exceptions=True)
+        stage.start_ms = (time.perf_counter() - self._t0) * 1000
+        t0 = time.perf_counter()
+        try:
+            stage.result = await asyncio.wait_for(stage.fn(), timeout=stage.timeout)
+            stage.status = SKIPPED if stage.result is SKIPPED else OK
+        except asyncio.TimeoutError:
+            stage.status = TIMEOUT
+            stage.error = f"exceeded {stage.timeout:g}s"
+        except asyncio.CancelledError:
+            stage.status = CANCELLED
+            raise
+        except Exception as e:
+            stage.status = FAILED
+            stage.error = str(e)
+        finally:
+            stage.duration_ms = (time.perf_counter() - t0) * 1000
+
+        if stage.critical and stage.status not in (OK, SKIPPED):
+            raise StageFailed(stage.name, stage.status, stage.error)
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every stage; returns {name: result} for stages that completed OK."""
+        self._t0 = time.perf_counter()
+        handles: Dict[str, asyncio.Task] = {}
+        for name, stage in self._stages.items():
+            handles[name] = asyncio.create_task(self._run_stage(stage, handles))
+        try:
+            for handle in asyncio.as_completed(list(handles.values())):
+                await handle
+        except BaseException:
+            for handle in handles.values():
+                if not handle.done():
+                    handle.cancel()
+            await asyncio.gather(*handles.values(), return_exceptions=True)
+            raise
+        return {name: s.result for name, s in self._stages.items() if s.status == OK}
+
+    def status(self, name: str) -> Optional[str]:
+        return self._stages[name].status
+
+    def timings(self) -> Dict[str, Any]:
+        """Per-stage status, start offset and duration (ms) for response metadata."""
+        return {
+            name: {
+                "status": s.status or CANCELLED,
+                "start_ms": round(s.start_ms, 1) if s.start_ms is not None else None,
+                "duration_ms": round(s.duration_ms, 1) if s.duration_ms is not None else None,
+                **({"error": s.error} if s.error else {}),
+            }
+            for name, s in self._stages.items()
+        }
+
+    @property
+    def partial(self) -> list:
+        """Non-critical stages that failed or timed out."""
+        return [n for n, s in self._stages.items() if not s.critical and s.status in (FAILED, TIMEOUT)]
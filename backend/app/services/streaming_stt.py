@@ -0,0 +1,296 @@
+"""
+Incremental Streaming STT — EventHorizon AI
+=============================================
+The assistant WebSocket used to send the *whole* accumulated recording to
+Whisper on every 3rd mic chunk, so cost and latency grew quadratically
+with utterance length. This module transcribes each stretch of speech once:
+
+  1. The encoded mic buffer (MediaRecorder webm/opus by default) is decoded
+     to 16 kHz mono PCM. A webm stream can't be decoded from the middle, so
+     every pass still re-decodes the whole recording (decode work grows
+     quadratically, but it is cheap next to ASR); only the samples not seen
+     before are fed to the VAD.
+  2. An energy VAD splits the PCM into speech segments at pauses
+     (STT_VAD_MIN_SILENCE_MS), forcing a cut at STT_VAD_MAX_SEGMENT_S.
+  3. Each *closed* segment is sent to the ASR backend exactly once (as a
+     small WAV) and its text is kept; previews stitch the closed segments
+     (STT_PREVIEW_EVERY chunks, at most every STT_PREVIEW_MIN_INTERVAL_MS).
+  4. The final pass closes the trailing segment and only transcribes what
+     is still missing, reusing every preview result. If the VAD found no
+     speech at all (quiet mic, soft speaker) the whole recording goes to
+     ASR once, as before.
+
+ASR backends are pluggable (STT_BACKEND=groq | mock); MockASR is a local,
+deterministic stand-in for tests and offline development.
+"""
+
+import io
+import os
+import time
+import array
+import struct
+import asyncio
+import logging
+from typing import Dict, List, Optional, Protocol
+
+logger = logging.getLogger("eventhorizon.streaming_stt")
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+INCREMENTAL_ENABLED = os.getenv("STT_INCREMENTAL", "1").lower() not in ("0", "false", "no")
+PREVIEW_EVERY_CHUNKS = int(os.getenv("STT_PREVIEW_EVERY", "3"))
+PREVIEW_MIN_INTERVAL_MS = float(os.getenv("STT_PREVIEW_MIN_INTERVAL_MS", "800"))
+VAD_MIN_RMS = float(os.getenv("STT_VAD_MIN_RMS", "300"))
+VAD_MIN_SILENCE_MS = int(os.getenv("STT_VAD_MIN_SILENCE_MS", "450"))
+VAD_MIN_SPEECH_MS = int(os.getenv("STT_VAD_MIN_SPEECH_MS", "200"))
+VAD_MAX_SEGMENT_S = float(os.getenv("STT_VAD_MAX_SEGMENT_S", "15"))
+VAD_PAD_MS = 150
+
+
+# ──────────────────────────────────────────────────────────────
+# ASR backends
+# ──────────────────────────────────────────────────────────────
+
+class ASRBackend(Protocol):
+    def transcribe(self, audio_bytes: bytes, language: Optional[str] = None, filename: str = "segment.wav") -> Dict[str, str]:
+        """Blocking. Returns {"transcript": str, "language_detected": str}."""
+        ...
+
+
+class GroqASR:
+    """Groq Whisper via the shared groq_service."""
+
+    def transcribe(self, audio_bytes: bytes, language: Optional[str] = None, filename: str = "segment.wav") -> Dict[str, str]:
+        from app.services.groq_service import groq_service
+        return groq_service.transcribe_audio(audio_bytes, filename=filename)
+
+
+class MockASR:
+    """
+    Deterministic local backend: each segment becomes "seg<N>(<seconds>s)".
+    Records every call so tests can assert nothing is transcribed twice.
+    """
+
+    def __init__(self, language: str = "en"):
+        self.language = language
+        self.calls: List[int] = []
+
+    def transcribe(self, audio_bytes: bytes, language: Optional[str] = None, filename: str = "segment.wav") -> Dict[str, str]:
+        pcm_len = max(0, len(audio_bytes) - 44)
+        self.calls.append(pcm_len)
+        seconds = pcm_len / (SAMPLE_RATE * 2)
+        return {"transcript": f"seg{len(self.calls)}({seconds:.1f}s)", "language_detected": language or self.language}
+
+
+def get_asr_backend(name: Optional[str] = None) -> ASRBackend:
+    name = (name or os.getenv("STT_BACKEND", "groq")).strip().lower()
+    if name == "mock":
+        return MockASR()
+    return GroqASR()
+
+
+# ──────────────────────────────────────────────────────────────
+# PCM helpers
+# ──────────────────────────────────────────────────────────────
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    header = struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", len(pcm),
+    )
+    return header + pcm
+
+
+def decode_to_pcm(encoded: bytes, input_format: str = "webm") -> bytes:
+    """Decode a (possibly still growing) recording to 16 kHz mono s16le PCM. Blocking."""
+    if input_format == "pcm":
+        return encoded
+    from pydub import AudioSegment
+
+    segment = AudioSegment.from_file(io.BytesIO(encoded), format=input_format)
+    return segment.set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2).raw_data
+
+
+# ──────────────────────────────────────────────────────────────
+# Energy VAD
+# ──────────────────────────────────────────────────────────────
+
+class VadSegmenter:
+    """
+    Streaming energy VAD over 30 ms frames. The speech threshold adapts to
+    the background: max(STT_VAD_MIN_RMS, 3 × running noise floor).
+    Segments are (start_sample, end_sample) and include a little padding.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * FRAME_MS // 1000
+        self.noise_floor = VAD_MIN_RMS / 3
+        self._pos = 0                  # samples consumed
+        self._carry = array.array("h")  # partial frame
+        self._seg_start: Optional[int] = None
+        self._last_voice: Optional[int] = None
+        self.closed: List[tuple] = []
+
+    def _ms(self, samples: int) -> float:
+        return samples * 1000 / self.sample_rate
+
+    def feed(self, pcm: bytes):
+        samples = array.array("h")
+        samples.frombytes(pcm[: len(pcm) - (len(pcm) % 2)])
+        if self._carry:
+            samples = self._carry + samples
+        n_frames = len(samples) // self.frame_len
+        for i in range(n_frames):
+            frame = samples[i * self.frame_len:(i + 1) * self.frame_len]
+            rms = (sum(x * x for x in frame) / len(frame)) ** 0.5
+            start = self._pos
+            self._pos += self.frame_len
+            voiced = rms >= max(VAD_MIN_RMS, self.noise_floor * 3)
+            if not voiced:
+                self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+            self._step(voiced, start)
+        self._carry = samples[n_frames * self.frame_len:]
+
+    def _step(self, voiced: bool, frame_start: int):
+        if voiced:
+            if self._seg_start is None:
+                self._seg_start = frame_start
+            self._last_voice = self._pos
+            if self._ms(self._pos - self._seg_start) >= VAD_MAX_SEGMENT_S * 1000:
+                self._close(self._pos)
+        elif self._seg_start is not None and self._ms(self._pos - self._last_voice) >= VAD_MIN_SILENCE_MS:
+            self._close(self._last_voice)
+
+    def _close(self, end: int):
+        start = self._seg_start
+        self._seg_start = None
+        self._last_voice = None
+        if self._ms(end - start) < VAD_MIN_SPEECH_MS:
+            return  # click / cough
+        pad = self.sample_rate * VAD_PAD_MS // 1000
+        self.closed.append((max(0, start - pad), end + pad))
+
+    def flush(self):
+        """Close the trailing segment (end of utterance)."""
+        if self._seg_start is not None:
+            self._close(self._last_voice or self._pos)
+
+    @property
+    def consumed_samples(self) -> int:
+        return self._pos + len(self._carry)
+
+
+# ──────────────────────────────────────────────────────────────
+# Incremental transcriber (one per utterance)
+# ──────────────────────────────────────────────────────────────
+
+class IncrementalTranscriber:
+    def __init__(self, asr: Optional[ASRBackend] = None, input_format: str = "webm", language: Optional[str] = None,
+                 preview_every: int = PREVIEW_EVERY_CHUNKS, preview_min_interval_ms: float = PREVIEW_MIN_INTERVAL_MS):
+        self.asr = asr or get_asr_backend()
+        self.input_format = input_format
+        self.language = language
+        self.preview_every = max(1, preview_every)
+        self.preview_min_interval = preview_min_interval_ms / 1000
+        self.encoded = bytearray()
+        self.pcm = bytearray()
+        self.vad = VadSegmenter()
+        self.texts: Dict[int, Dict[str, str]] = {}  # segment index -> ASR result
+        self.chunks = 0
+        self._last_preview = 0.0
+        self._lock = asyncio.Lock()
+        self.stats = {"asr_calls": 0, "asr_audio_s": 0.0, "previews": 0, "reused_segments": 0, "decode_failures": 0,
+                      "decoded_audio_s": 0.0, "vad_fallbacks": 0}
+
+    def add_chunk(self, chunk) -> None:
+        """Append an encoded mic chunk (bytes or memoryview)."""
+        self.encoded.extend(chunk)
+        self.chunks += 1
+
+    def should_preview(self) -> bool:
+        return (
+            self.chunks % self.preview_every == 0
+            and time.monotonic() - self._last_preview >= self.preview_min_interval
+            and not self._lock.locked()
+        )
+
+    async def _advance(self) -> bool:
+        """Decode the recording so far and feed only the new PCM to the VAD."""
+        try:
+            pcm = await asyncio.to_thread(decode_to_pcm, bytes(self.encoded), self.input_format)
+        except Exception as e:
+            # Usually a half-written container cluster; the next chunk fixes it
+            self.stats["decode_failures"] += 1
+            logger.debug(f"[STT] Decode failed ({e}); waiting for more audio")
+            return False
+        self.stats["decoded_audio_s"] += len(pcm) / (2 * SAMPLE_RATE)
+        if len(pcm) > len(self.pcm):
+            new = pcm[len(self.pcm):]
+            self.pcm.extend(new)
+            self.vad.feed(new)
+        return True
+
+    async def _transcribe_missing(self):
+        pending = [i for i in range(len(self.vad.closed)) if i not in self.texts]
+        if not pending:
+            return
+
+        def run(i):
+            start, end = self.vad.closed[i]
+            pcm = bytes(self.pcm[start * 2:min(end, len(self.pcm) // 2) * 2])
+            return self.asr.transcribe(pcm_to_wav(pcm), self.language)
+
+        results = await asyncio.gather(*(asyncio.to_thread(run, i) for i in pending))
+        for i, res in zip(pending, results):
+            start, end = self.vad.closed[i]
+            self.stats["asr_calls"] += 1
+            self.stats["asr_audio_s"] += (end - start) / SAMPLE_RATE
+            self.texts[i] = res
+
+    def _stitch(self) -> Dict[str, str]:
+        parts = [self.texts[i].get("transcript", "").strip() for i in sorted(self.texts)]
+        langs = [self.texts[i].get("language_detected") for i in sorted(self.texts) if self.texts[i].get("language_detected")]
+        return {
+            "transcript": " ".join(p for p in parts if p),
+            "language_detected": langs[-1] if langs else (self.language or "en"),
+        }
+
+    async def preview(self) -> Dict[str, str]:
+        """Transcribe newly closed segments and return the stitched text so far."""
+        async with self._lock:
+            self._last_preview = time.monotonic()
+            self.stats["previews"] += 1
+            if await self._advance():
+                await self._transcribe_missing()
+            return self._stitch()
+
+    async def finalize(self) -> Dict[str, object]:
+        """Close the trailing segment, transcribe only what is missing, stitch."""
+        async with self._lock:
+            decoded = await self._advance()
+            if not decoded and not self.pcm:
+                # Could not decode at all: fall back to one whole-recording ASR call
+                result = await asyncio.to_thread(
+                    self.asr.transcribe, bytes(self.encoded), self.language, f"voice.{self.input_format}"
+                )
+                self.stats["asr_calls"] += 1
+                return {**result, "segments": 0, "stats": dict(self.stats)}
+            self.vad.flush()
+            if not self.vad.closed and self.pcm:
+                # Decoded audio but nothing crossed the VAD threshold (quiet mic, soft
+                # speaker): let ASR judge the whole recording rather than dropping it
+                self.stats["vad_fallbacks"] += 1
+                result = await asyncio.to_thread(self.asr.transcribe, pcm_to_wav(bytes(self.pcm)), self.language)
+                self.stats["asr_calls"] += 1
+                self.stats["asr_audio_s"] += len(self.pcm) / (2 * SAMPLE_RATE)
+                return {**result, "segments": 0, "stats": dict(self.stats)}
+            # Segments the final pass takes from preview results instead of re-transcribing
+            self.stats["reused_segments"] = len(self.texts)
+            await self._transcribe_missing()
+            return {**self._stitch(), "segments": len(self.vad.closed), "stats": dict(self.stats)}
+
+    def reset(self):
+        self.__init__(self.asr, self.input_format, self.language, self.preview_every, self.preview_min_interval * 1000)
@@ -0,0 +1,239 @@
+"""
+Streaming TTS — EventHorizon AI
+=================================
+All three TTS tiers used to hand back a finished clip, so nothing played
+until the whole sentence was synthesized. TTSStream turns a sentence into
+an async iterator of 16-bit mono PCM frames that starts yielding as soon as
+the first audio exists:
+
+  • azure  — SpeechSynthesizer `synthesizing` events (stream_natural_async)
+  • gemini — audio parts of a streamGenerateContent SSE response
+  • sarvam — REST only, so its clip is framed once it arrives
+
+Providers are tried in order (the caller's preferred one first) and the
+next one takes over only if a provider produced *no* audio — once frames
+have been sent, switching voices mid-sentence would be worse than a short
+clip. Time-to-first-audio (TTFA) is recorded per provider.
+
+Frames are raw PCM (format "pcm", rate in `TTSStream.sample_rate`);
+`wav_stream_header` lets HTTP clients receive them as one streaming WAV.
+"""
+
+import os
+import time
+import struct
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("eventhorizon.streaming_tts")
+
+FRAME_MS = int(os.getenv("TTS_STREAM_FRAME_MS", "200"))
+PROVIDERS = ["azure", "sarvam", "gemini"]
+DEFAULT_SAMPLE_RATE = 24000
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, dict] = {}
+
+
+def wav_pcm(wav: bytes) -> Tuple[memoryview, int]:
+    """(PCM payload view, sample_rate) of a WAV clip; non-RIFF input is treated as raw 24 kHz PCM."""
+    view = memoryview(wav)
+    if wav[:4] != b"RIFF" or wav[8:12] != b"WAVE":
+        return view, DEFAULT_SAMPLE_RATE
+    sample_rate, offset = DEFAULT_SAMPLE_RATE, 12
+    while offset + 8 <= len(wav):
+        chunk_id, size = struct.unpack_from("<4sI", wav, offset)
+        if chunk_id == b"fmt ":
+            sample_rate = struct.unpack_from("<I", wav, offset + 12)[0]
+        elif chunk_id == b"data":
+            return view[offset + 8:offset + 8 + size], sample_rate
+        offset += 8 + size + (size & 1)
+    return view[44:], sample_rate
+
+
+def wav_stream_header(sample_rate: int = DEFAULT_SAMPLE_RATE) -> bytes:
+    """RIFF header with 'unknown' (maximal) sizes for a WAV whose length isn't known yet."""
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 0xFFFFFFFF, b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", 0xFFFFFFFF - 36,
+    )
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = DEFAULT_SAMPLE_RATE) -> bytes:
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + len(pcm), b"WAVE", b"fmt ", 16, 1, 1,
+        sample_rate, sample_rate * 2, 2, 16, b"data", len(pcm),
+    ) + pcm
+
+
+# ──────────────────────────────────────────────────────────────
+# Provider sources: async iterators of (pcm, sample_rate)
+# ──────────────────────────────────────────────────────────────
+
+async def _azure_source(text: str, language: str):
+    from app.services.azure_tts_engine import casual_voice_engine
+
+    # First use builds + pre-warms the engine — keep that off the event loop
+    engine = await asyncio.to_thread(casual_voice_engine.get)
+    if not engine.is_available:
+        return
+    async for pcm in engine.stream_natural_async(text, language):
+        yield pcm, DEFAULT_SAMPLE_RATE
+
+
+async def _sarvam_source(text: str, language: str):
+    from app.services.tts_fallback import tts_fallback_service
+
+    if not tts_fallback_service.sarvam_enabled:
+        return
+    wav = await asyncio.to_thread(tts_fallback_service.generate_speech, text, language)
+    if wav:
+        pcm, sample_rate = wav_pcm(wav)
+        yield pcm, sample_rate
+
+
+async def _gemini_source(text: str, language: str):
+    from app.services.gemini_service import gemini_service
+
+    parts = gemini_service.generate_tts_stream(text, language)
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            # Shielded so a cancelled consumer doesn't lose track of the thread still inside next()
+            pending = asyncio.ensure_future(asyncio.to_thread(next, parts, None))
+            item = await asyncio.shield(pending)
+            if item is None:
+                break
+            yield item
+    finally:
+        if pending is not None and not pending.done():
+            # The worker thread is still executing the generator; closing it now
+            # would raise "generator already executing" and leave the HTTP
+            # stream open, so close it as soon as that next() returns.
+            pending.add_done_callback(lambda fut: _close_parts(parts, fut))
+        else:
+            _close_parts(parts, pending)
+
+
+def _close_parts(parts, fut: Optional[asyncio.Future]):
+    if fut is not None and not fut.cancelled():
+        fut.exception()  # retrieved, so a failed read isn't reported as unhandled
+    try:
+        parts.close()
+    except ValueError as e:
+        logger.warning(f"[TTS STREAM] gemini stream close failed: {e}")
+
+
+_SOURCES = {"azure": _azure_source, "sarvam": _sarvam_source, "gemini": _gemini_source}
+
+
+# ──────────────────────────────────────────────────────────────
+# Stream
+# ──────────────────────────────────────────────────────────────
+
+class TTSStream:
+    """
+    One sentence as an async iterator of PCM frames (≤ TTS_STREAM_FRAME_MS
+    each, always whole samples). After iteration `provider`, `sample_rate`,
+    `ttfa_ms`, `total_ms` and `bytes` describe what was sent; `provider`
+    and `sample_rate` are already set when the first frame is yielded.
+    """
+
+    def __init__(self, text: str, language: str, preferred: Optional[str] = None,
+                 providers: Optional[List[str]] = None, frame_ms: int = FRAME_MS):
+        order = list(providers or PROVIDERS)
+        if preferred in order:
+            order.remove(preferred)
+            order.insert(0, preferred)
+        self.text = text
+        self.language = language
+        self.providers = order
+        self.frame_ms = frame_ms
+        self.provider: Optional[str] = None
+        self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.ttfa_ms: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.bytes = 0
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._frames()
+
+    async def _frames(self):
+        t0 = time.perf_counter()
+        for name in self.providers:
+            pending = bytearray()
+            source = _SOURCES[name](self.text, self.language)
+            try:
+                async for pcm, sample_rate in source:
+                    if not self.bytes and not pending:
+                        self.provider, self.sample_rate = name, sample_rate
+                    pending.extend(pcm)
+                    frame_bytes = max(2, self.sample_rate * 2 * self.frame_ms // 1000) & ~1
+                    # The first frame goes out immediately (TTFA); later ones are full frames
+                    while len(pending) >= (2 if not self.bytes else frame_bytes):
+                        size = min(len(pending), frame_bytes) & ~1
+                        frame = bytes(pending[:size])
+                        del pending[:size]
+                        if not self.bytes:
+                            self.ttfa_ms = (time.perf_counter() - t0) * 1000
+                        self.bytes += len(frame)
+                        yield frame
+            except Exception as e:
+                logger.warning(f"[TTS STREAM] {name} failed after {self.bytes} bytes: {e}")
+            finally:
+                await source.aclose()
+
+            if len(pending) >= 2:
+                frame = bytes(pending[:len(pending) & ~1])
+                if not self.bytes:
+                    self.ttfa_ms = (time.perf_counter() - t0) * 1000
+                self.bytes += len(frame)
+                yield frame
+
+            if self.bytes:
+                break
+            _record(name, None, None)
+            logger.info(f"[TTS STREAM] {name} produced no audio, trying next provider")
+
+        self.total_ms = (time.perf_counter() - t0) * 1000
+        if self.bytes:
+            _record(self.provider, self.ttfa_ms, self.total_ms)
+
+
+def _record(provider: str, ttfa_ms: Optional[float], total_ms: Optional[float]):
+    with _stats_lock:
+        s = _stats.setdefault(provider, {"streams": 0, "failures": 0, "total_ms": 0.0, "ttfa": deque(maxlen=500)})
+        if ttfa_ms is None:
+            s["failures"] += 1
+            return
+        s["streams"] += 1
+        s["total_ms"] += total_ms
+        s["ttfa"].append(ttfa_ms)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(pct * len(ordered)))], 1)
+
+
+def get_streaming_stats() -> Dict[str, dict]:
+    """Per-provider stream counts, failures and time-to-first-audio p50/p90 (last 500 streams)."""
+    with _stats_lock:
+        report = {}
+        for provider, s in _stats.items():
+            ttfa = list(s["ttfa"])
+            report[provider] = {
+                "streams": s["streams"],
+                "failures": s["failures"],
+                "ttfa_p50_ms": _percentile(ttfa, 0.5),
+                "ttfa_p90_ms": _percentile(ttfa, 0.9),
+                "avg_total_ms": round(s["total_ms"] / s["streams"], 1) if s["streams"] else None,
+            }
+        return report
@@ -0,0 +1,176 @@
+"""
+TTS Chunking — EventHorizon AI
+================================
+Splits the streamed LLM answer into pieces for the TTS workers.
+
+`extract_tts_chunks` is the original splitter: a chunk ends at a sentence
+delimiter, or at a comma/semicolon/colon once it is 10+ characters long. It
+means the first audio waits for Gemini's whole first sentence.
+
+`AdaptiveTTSChunker` gets the first sound out sooner and then favours
+fewer, larger synthesis calls:
+
+  • First chunk — cut at a delimiter as before, or earlier at a word
+    boundary once TTS_FIRST_CHUNK_WORDS complete words have arrived, or
+    once TTS_FIRST_CHUNK_BUDGET_MS has passed since the first token with
+    at least two words in hand.
+  • Later chunks — the minimum size doubles each time (from
+    TTS_CHUNK_BASE_CHARS, growth TTS_CHUNK_GROWTH, capped at
+    TTS_CHUNK_MAX_CHARS), so short sentences are merged and cut only at a
+    sentence end (or a clause end past 2× the minimum). Past the cap the
+    chunk is cut at the last clause or word boundary.
+
+Delimiters are script-aware: the Devanagari danda / double danda (। ॥) and
+the Urdu full stop / question mark (۔ ؟) end sentences. A '.' between
+digits (NDVI 0.42, ₹2.5) or a single-letter abbreviation ("Dr.") does not.
+Words are never split — a cut always lands on whitespace that has been
+followed by more text.
+"""
+
+import os
+import time
+from typing import List, Optional
+
+ADAPTIVE_ENABLED = os.getenv("TTS_ADAPTIVE_CHUNKING", "1").lower() not in ("0", "false", "no")
+FIRST_CHUNK_WORDS = int(os.getenv("TTS_FIRST_CHUNK_WORDS", "5"))
+FIRST_CHUNK_BUDGET_MS = float(os.getenv("TTS_FIRST_CHUNK_BUDGET_MS", "700"))
+BASE_CHARS = int(os.getenv("TTS_CHUNK_BASE_CHARS", "60"))
+GROWTH = float(os.getenv("TTS_CHUNK_GROWTH", "2.0"))
+MAX_CHARS = int(os.getenv("TTS_CHUNK_MAX_CHARS", "300"))
+
+STRONG_DELIMS = {'.', '!', '?', '।', '॥', '۔', '؟', '\n', '\r'}
+WEAK_DELIMS = {',', ';', ':', '،'}
+
+
+def extract_tts_chunks(buffer: str, is_final: bool = False):
+    """
+    Extracts complete clauses/sentences from buffer.
+    Returns (chunks_list, remaining_buffer).
+    """
+    chunks = []
+    strong_delims = {'.', '!', '?', '।', '\n', '\r'}
+    weak_delims = {',', ';', ':'}
+    MIN_CHUNK_LENGTH = 10
+
+    current_idx = 0
+    start_idx = 0
+    n = len(buffer)
+
+    while current_idx < n:
+        char = buffer[current_idx]
+        if char in strong_delims:
+            chunk = buffer[start_idx:current_idx + 1].strip()
+            if chunk:
+                chunks.append(chunk)
+            start_idx = current_idx + 1
+        elif char in weak_delims:
+            chunk_candidate = buffer[start_idx:current_idx + 1].strip()
+            if len(chunk_candidate) >= MIN_CHUNK_LENGTH:
+                chunks.append(chunk_candidate)
+                start_idx = current_idx + 1
+        current_idx += 1
+
+    remaining = buffer[start_idx:]
+    if is_final and remaining.strip():
+        chunks.append(remaining.strip())
+        remaining = ""
+
+    return chunks, remaining
+
+
+def _is_sentence_end(text: str, i: int) -> Optional[bool]:
+    """Whether text[i] (a strong delimiter) ends a sentence; None if the next character isn't known yet."""
+    ch = text[i]
+    if ch != '.':
+        return True
+    if i + 1 >= len(text):
+        return None
+    nxt = text[i + 1]
+    if nxt.isdigit() and i > 0 and text[i - 1].isdigit():
+        return False  # decimal number
+    if nxt in '.':
+        return False  # ellipsis continues
+    if i >= 1 and text[i - 1].isalpha() and (i == 1 or text[i - 2].isspace()):
+        return False  # single-letter abbreviation / initial
+    return nxt.isspace() or nxt in '"\')»”'
+
+
+class AdaptiveTTSChunker:
+    """Feed streamed text with `feed`; each call returns the chunks ready for synthesis. `flush` at the end."""
+
+    def __init__(self, first_words: int = FIRST_CHUNK_WORDS, first_budget_ms: float = FIRST_CHUNK_BUDGET_MS,
+                 base_chars: int = BASE_CHARS, growth: float = GROWTH, max_chars: int = MAX_CHARS):
+        self.first_words = first_words
+        self.first_budget = first_budget_ms / 1000
+        self.base_chars = base_chars
+        self.growth = growth
+        self.max_chars = max_chars
+        self.buffer = ""
+        self.emitted = 0
+        self._first_token_at: Optional[float] = None
+
+    def _min_chars(self) -> int:
+        return int(min(self.max_chars, self.base_chars * self.growth ** (self.emitted - 1)))
+
+    def feed(self, text: str, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        if self._first_token_at is None and text.strip():
+            self._first_token_at = now
+        self.buffer += text
+        chunks = []
+        while True:
+            chunk = self._next_chunk(now)
+            if chunk is None:
+                break
+            chunks.append(chunk)
+        return chunks
+
+    def flush(self) -> List[str]:
+        rest, self.buffer = self.buffer.strip(), ""
+        if rest:
+            self.emitted += 1
+            return [rest]
+        return []
+
+    def _take(self, end: int) -> Optional[str]:
+        chunk, self.buffer = self.buffer[:end].strip(), self.buffer[end:]
+        if not chunk:
+            return None
+        self.emitted += 1
+        return chunk
+
+    def _next_chunk(self, now: float) -> Optional[str]:
+        buf = self.buffer
+        first = self.emitted == 0
+        min_chars = 10 if first else self._min_chars()
+        lead = len(buf) - len(buf.lstrip())
+        last_weak = last_space = None
+
+        for i, ch in enumerate(buf):
+            size = i + 1 - lead  # stripped length of buf[:i + 1] when it ends on a delimiter
+            if ch in STRONG_DELIMS:
+                end = _is_sentence_end(buf, i)
+                if end is None:
+                    break  # wait for the next character
+                if end and size >= (1 if first else min_chars):
+                    return self._take(i + 1)
+            elif ch in WEAK_DELIMS:
+                if size >= (min_chars if first else 2 * min_chars):
+                    return self._take(i + 1)
+                last_weak = i + 1
+            elif ch.isspace() and i > 0 and not buf[i - 1].isspace():
+                last_space = i
+            if not first and i + 1 >= self.max_chars:
+                cut = last_weak or last_space
+                if cut:
+                    return self._take(cut)
+
+        if not first or last_space is None:
+            return None
+        # First chunk: speak early at a word boundary (only words followed by whitespace are complete)
+        words = buf[:last_space].split()
+        budget_spent = self._first_token_at is not None and now - self._first_token_at >= self.first_budget
+        if len(words) >= self.first_words or (budget_spent and len(words) >= 2):
+            return self._take(last_space)
+        return None
+
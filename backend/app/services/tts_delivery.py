@@ -0,0 +1,214 @@
+"""
+Ordered TTS Delivery — EventHorizon AI
+========================================
+handle_chat_stream synthesizes sentences on several tts_workers at once.
+Each worker used to send its `audio_chunk` the moment it finished, so chunks
+reached the client out of order, the client had to reorder by `seq`, and a
+slow early sentence held playback back while later clips piled up in the
+browser.
+
+OrderedAudioDelivery sits between the workers and the socket:
+
+  • Workers hand results to `complete(seq, …)`; one sender task emits them
+    strictly in `seq` order.
+  • Look-ahead is bounded: a worker waits in `slot(seq)` before
+    synthesizing a sentence more than TTS_DELIVERY_WINDOW ahead of the one
+    being played, so finished clips never pile up server-side either.
+  • Every chunk has a deadline. The sender keeps an estimate of when the
+    client's playback of the audio sent so far will end; the head-of-line
+    chunk may be late by at most TTS_DELIVERY_GRACE_MS past that point (the
+    first chunk gets TTS_DELIVERY_FIRST_DEADLINE_MS from being queued). A
+    chunk that misses it is skipped — sent as text with `skipped: true` and
+    no audio — and its audio is dropped if it turns up later. Workers don't
+    start synthesizing chunks that were already skipped.
+
+Per response the sender measures time-to-first-audio and the gap-free
+ratio: the share of chunks after the first that were sent before the
+previous audio finished playing.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger("eventhorizon.tts_delivery")
+
+WINDOW = int(os.getenv("TTS_DELIVERY_WINDOW", "4"))
+GRACE_MS = float(os.getenv("TTS_DELIVERY_GRACE_MS", "2000"))
+FIRST_DEADLINE_MS = float(os.getenv("TTS_DELIVERY_FIRST_DEADLINE_MS", "8000"))
+CHARS_PER_SECOND = 15.0  # speaking-rate estimate for clips whose duration can't be read
+
+# send(seq, text, audio, actual_format, skipped) — writes one chunk to the client
+SendChunk = Callable[[int, str, Optional[bytes], Optional[str], bool], Awaitable[None]]
+
+
+def clip_duration(audio: Optional[bytes], fmt: Optional[str], text: str) -> float:
+    """Playback seconds of a clip: exact for WAV, estimated from the text otherwise."""
+    if not audio:
+        return 0.0
+    if fmt == "wav":
+        from app.services.streaming_tts import wav_pcm
+        pcm, sample_rate = wav_pcm(audio)
+        return len(pcm) / (2 * sample_rate)
+    return len(text) / CHARS_PER_SECOND
+
+
+class OrderedAudioDelivery:
+    def __init__(self, send: SendChunk, window: int = WINDOW, grace_ms: float = GRACE_MS,
+                 first_deadline_ms: float = FIRST_DEADLINE_MS):
+        self._send = send
+        self.window = window
+        self.grace = grace_ms / 1000
+        self.first_deadline = first_deadline_ms / 1000
+        self._results: Dict[int, asyncio.Future] = {}
+        self._texts: Dict[int, str] = {}
+        self._added: Dict[int, float] = {}
+        self._next = 0
+        self._total: Optional[int] = None
+        self._changed = asyncio.Condition()
+        self._skipped = set()
+        self._t0 = time.monotonic()
+        self._play_end: Optional[float] = None  # when the client finishes the audio sent so far
+        self.stats = {
+            "chunks": 0, "audio_chunks": 0, "skipped": 0, "late_dropped": 0, "empty": 0,
+            "gap_free": 0, "gaps": 0, "gap_ms": 0.0, "ttfa_ms": None, "max_buffered": 0,
+        }
+
+    # ── Producer side (tts_workers / chunker) ────────────────
+
+    def _future(self, seq: int) -> asyncio.Future:
+        fut = self._results.get(seq)
+        if fut is None:
+            fut = self._results[seq] = asyncio.get_running_loop().create_future()
+        return fut
+
+    async def add(self, seq: int, text: str):
+        """Register a sentence as soon as it is queued for synthesis."""
+        self._texts[seq] = text
+        self._added[seq] = time.monotonic()
+        self._future(seq)
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def slot(self, seq: int) -> bool:
+        """Wait until `seq` is inside the look-ahead window. False if it was already skipped."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: seq < self._next + self.window or seq in self._skipped)
+        return seq not in self._skipped
+
+    def complete(self, seq: int, audio: Optional[bytes], fmt: Optional[str]):
+        """Hand in a worker's result (audio None/empty on failure)."""
+        if seq in self._skipped:
+            self.stats["late_dropped"] += 1
+            return
+        fut = self._future(seq)
+        if fut.done():
+            return
+        fut.set_result((audio, fmt))
+        buffered = sum(1 for s, f in self._results.items() if s >= self._next and f.done())
+        self.stats["max_buffered"] = max(self.stats["max_buffered"], buffered)
+
+    def close(self, total: int):
+        """No chunks beyond seq `total - 1` will be added."""
+        self._total = total
+        asyncio.get_running_loop().create_task(self._notify())
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    # ── Sender ───────────────────────────────────────────────
+
+    async def run(self):
+        """Send chunks in order until close() and everything up to `total` is out."""
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: self._next in self._results or (self._total is not None and self._next >= self._total))
+            if self._total is not None and self._next >= self._total:
+                break
+
+            seq = self._next
+            now = time.monotonic()
+            if self._play_end is None:
+                deadline = self._added.get(seq, now) + self.first_deadline
+            else:
+                deadline = max(self._play_end, now) + self.grace
+            try:
+                audio, fmt = await asyncio.wait_for(asyncio.shield(self._results[seq]), max(0.0, deadline - now))
+            except asyncio.TimeoutError:
+                self._skipped.add(seq)
+                self.stats["skipped"] += 1
+                logger.info(f"[TTS DELIVERY] seq={seq} missed its deadline, skipping audio")
+                audio, fmt = None, None
+
+            await self._emit(seq, audio, fmt, skipped=seq in self._skipped)
+            self._results.pop(seq, None)
+            self._texts.pop(seq, None)
+            self._added.pop(seq, None)
+            async with self._changed:
+                self._next += 1
+                self._changed.notify_all()
+
+    async def _emit(self, seq: int, audio: Optional[bytes], fmt: Optional[str], skipped: bool):
+        text = self._texts.get(seq, "")
+        now = time.monotonic()
+        self.stats["chunks"] += 1
+        if audio:
+            self.stats["audio_chunks"] += 1
+            if self._play_end is None:
+                self.stats["ttfa_ms"] = round((now - self._t0) * 1000, 1)
+            elif now <= self._play_end:
+                self.stats["gap_free"] += 1
+            else:
+                self.stats["gaps"] += 1
+                self.stats["gap_ms"] += (now - self._play_end) * 1000
+            self._play_end = max(now, self._play_end or now) + clip_duration(audio, fmt, text)
+        elif not skipped:
+            self.stats["empty"] += 1
+        try:
+            await self._send(seq, text, audio, fmt, skipped)
+        except Exception as e:
+            logger.warning(f"[TTS DELIVERY] send failed for seq={seq}: {e}")
+
+    def summary(self) -> dict:
+        followers = self.stats["gap_free"] + self.stats["gaps"]
+        return {
+            **self.stats,
+            "gap_ms": round(self.stats["gap_ms"], 1),
+            "gap_free_ratio": round(self.stats["gap_free"] / followers, 3) if followers else None,
+        }
+
+
+# ──────────────────────────────────────────────────────────────
+# Aggregate metrics across responses
+# ──────────────────────────────────────────────────────────────
+
+_agg_lock = threading.Lock()
+_agg = {"responses": 0, "chunks": 0, "skipped": 0, "late_dropped": 0, "gap_free": 0, "gaps": 0}
+_ttfa: deque = deque(maxlen=500)
+
+
+def record_delivery(summary: dict):
+    with _agg_lock:
+        _agg["responses"] += 1
+        for key in ("chunks", "skipped", "late_dropped", "gap_free", "gaps"):
+            _agg[key] += summary[key]
+        if summary["ttfa_ms"] is not None:
+            _ttfa.append(summary["ttfa_ms"])
+
+
+def get_delivery_stats() -> dict:
+    with _agg_lock:
+        ttfa = sorted(_ttfa)
+        followers = _agg["gap_free"] + _agg["gaps"]
+        return {
+            **_agg,
+            "gap_free_ratio": round(_agg["gap_free"] / followers, 3) if followers else None,
+            "ttfa_p50_ms": ttfa[len(ttfa) // 2] if ttfa else None,
+            "ttfa_p90_ms": ttfa[min(len(ttfa) - 1, int(0.9 * len(ttfa)))] if ttfa else None,
+        }
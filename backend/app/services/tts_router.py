@@ -0,0 +1,249 @@
+"""
+Adaptive TTS Provider Router — EventHorizon AI
+================================================
+race_tts used to fire Gemini and Sarvam at once for the first sentence of
+every response (paying for both) and then lock to whichever won that one
+race, without ever learning which provider is actually fast or healthy.
+
+The router keeps, per (provider, language):
+  • EWMA latency of successful syntheses and an EWMA error rate,
+  • the last latencies, for a p90,
+  • a cooldown: consecutive failures (errors, empty audio, or results
+    slower than TTS_ROUTER_SLOW_MS) bench the provider for a while, with
+    the bench doubling on each repeat up to TTS_ROUTER_COOLDOWN_MAX_S.
+
+`run` sends the sentence to the predicted-fastest provider only. If it
+hasn't answered within that provider's p90 latency (clamped, and with a
+prior until enough samples exist) the second-ranked provider is hedged in;
+the first good result wins and the other is cancelled and awaited. A
+cancelled coroutine stops at its next await, but a thread-backed provider
+(Gemini and Sarvam run in asyncio.to_thread) keeps running until its HTTP
+call returns, so a hedge still costs that provider's full request. A
+failure starts the next provider immediately. A small share of requests
+(TTS_ROUTER_EXPLORE_RATE) lead with the runner-up instead, so a provider
+that got faster is noticed.
+
+Voice consistency is the caller's job: pass the provider locked for the
+response as `preferred` and it is used alone (the ranked ones are only
+tried if it fails outright).
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("eventhorizon.tts_router")
+
+EWMA_ALPHA = float(os.getenv("TTS_ROUTER_EWMA_ALPHA", "0.2"))
+HEDGE_MIN_MS = float(os.getenv("TTS_ROUTER_HEDGE_MIN_MS", "300"))
+HEDGE_MAX_MS = float(os.getenv("TTS_ROUTER_HEDGE_MAX_MS", "4000"))
+SLOW_MS = float(os.getenv("TTS_ROUTER_SLOW_MS", "8000"))
+FAILURES_TO_COOL = int(os.getenv("TTS_ROUTER_FAILURES_TO_COOL", "3"))
+COOLDOWN_S = float(os.getenv("TTS_ROUTER_COOLDOWN_S", "30"))
+COOLDOWN_MAX_S = float(os.getenv("TTS_ROUTER_COOLDOWN_MAX_S", "600"))
+EXPLORE_RATE = float(os.getenv("TTS_ROUTER_EXPLORE_RATE", "0.05"))
+MIN_SAMPLES_FOR_P90 = 5
+ERROR_PENALTY = 3.0  # predicted cost = latency * (1 + ERROR_PENALTY * error_rate)
+
+# Starting guesses (ms) until a provider has measurements — keeps the old
+# preference order (Sarvam, then Gemini, with Azure as the last resort)
+PRIOR_LATENCY_MS = {"sarvam": 1200.0, "gemini": 1500.0, "azure": 2500.0}
+
+ProviderCall = Callable[[], Awaitable[Optional[bytes]]]
+
+
+class _ProviderStats:
+    __slots__ = ("latency_ms", "error_rate", "samples", "requests", "failures", "wins", "hedges",
+                 "consecutive_failures", "cooldowns", "cooldown_until", "recent")
+
+    def __init__(self, prior_ms: float):
+        self.latency_ms = prior_ms
+        self.error_rate = 0.0
+        self.samples = 0
+        self.requests = 0
+        self.failures = 0
+        self.wins = 0
+        self.hedges = 0
+        self.consecutive_failures = 0
+        self.cooldowns = 0
+        self.cooldown_until = 0.0
+        self.recent: deque = deque(maxlen=100)
+
+    def cooling(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+    def cost(self) -> float:
+        return self.latency_ms * (1 + ERROR_PENALTY * self.error_rate)
+
+    def p90(self) -> Optional[float]:
+        if len(self.recent) < MIN_SAMPLES_FOR_P90:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+
+
+class TTSRouter:
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], _ProviderStats] = {}
+        self._lock = threading.Lock()
+        self.totals = {"requests": 0, "hedged": 0, "hedge_wins": 0, "explored": 0, "all_failed": 0}
+
+    def _get(self, provider: str, language: str) -> _ProviderStats:
+        key = (provider, language)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _ProviderStats(PRIOR_LATENCY_MS.get(provider, 2000.0))
+        return stats
+
+    # ── Prediction ───────────────────────────────────────────
+
+    def rank(self, language: str, providers: List[str]) -> List[str]:
+        """Providers by predicted cost; cooled-down ones go last (still usable if nothing else works)."""
+        return [p for *_, p in self._scored(language, providers)]
+
+    def _scored(self, language: str, providers: List[str]) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return sorted((self._get(p, language).cooling(now), self._get(p, language).cost(), i, p)
+                          for i, p in enumerate(providers))
+
+    def hedge_delay(self, provider: str, language: str) -> float:
+        """Seconds to wait on `provider` before hedging: its p90 latency (prior × 1.5 until measured)."""
+        with self._lock:
+            stats = self._get(provider, language)
+            delay_ms = stats.p90() or stats.latency_ms * 1.5
+        return min(HEDGE_MAX_MS, max(HEDGE_MIN_MS, delay_ms)) / 1000
+
+    # ── Feedback ─────────────────────────────────────────────
+
+    def record(self, provider: str, language: str, latency_ms: float, ok: bool):
+        with self._lock:
+            stats = self._get(provider, language)
+            stats.requests += 1
+            slow = ok and latency_ms > SLOW_MS
+            if ok:
+                # The first measurement replaces the prior outright
+                alpha = EWMA_ALPHA if stats.samples else 1.0
+                stats.latency_ms += alpha * (latency_ms - stats.latency_ms)
+                stats.samples += 1
+                stats.recent.append(latency_ms)
+            failed = not ok or slow
+            stats.error_rate += EWMA_ALPHA * ((1.0 if failed else 0.0) - stats.error_rate)
+            if not failed:
+                stats.consecutive_failures = 0
+                return
+            stats.failures += not ok
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= FAILURES_TO_COOL:
+                bench = min(COOLDOWN_MAX_S, COOLDOWN_S * 2 ** stats.cooldowns)
+                stats.cooldown_until = time.monotonic() + bench
+                stats.cooldowns += 1
+                stats.consecutive_failures = 0
+                logger.warning(f"[TTS ROUTER] {provider}/{language} cooled down for {bench:.0f}s "
+                               f"({'slow' if slow else 'failing'}, error rate {stats.error_rate:.2f})")
+
+    # ── Execution ────────────────────────────────────────────
+
+    async def run(self, language: str, calls: Dict[str, ProviderCall],
+                  preferred: Optional[str] = None) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        (audio, provider) from the first provider in `calls` that returns
+        audio, hedging as described above; (None, None) if all fail.
+        """
+        self.totals["requests"] += 1
+        scored = self._scored(language, list(calls))
+        order = [p for *_, p in scored]
+        if preferred in calls:
+            audio = await self._attempt(preferred, language, calls[preferred])
+            if audio:
+                return audio, preferred
+            order.remove(preferred)
+        elif len(scored) > 1 and not scored[1][0] and random.random() < EXPLORE_RATE:
+            order[0], order[1] = order[1], order[0]
+            self.totals["explored"] += 1
+
+        running: Dict[asyncio.Task, str] = {}
+        first = order[0] if order else None
+        hedged = False
+
+        def launch():
+            nonlocal hedged
+            name = order.pop(0)
+            if running:
+                hedged = True
+                self.totals["hedged"] += 1
+                with self._lock:
+                    self._get(name, language).hedges += 1
+            running[asyncio.create_task(self._attempt(name, language, calls[name]))] = name
+
+        try:
+            while order or running:
+                if not running:
+                    launch()
+                leader = next(iter(running.values()))
+                timeout = self.hedge_delay(leader, language) if order and len(running) == 1 else None
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"[TTS ROUTER] {leader} slower than {timeout * 1000:.0f}ms, hedging to {order[0]}")
+                    launch()
+                    continue
+                for task in done:
+                    name = running.pop(task)
+                    audio = task.result()
+                    if audio:
+                        with self._lock:
+                            self._get(name, language).wins += 1
+                        if hedged and name != first:
+                            self.totals["hedge_wins"] += 1
+                        return audio, name
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                # Don't leave the losers as orphaned tasks; a to_thread call
+                # still finishes in its thread, the result is just dropped
+                await asyncio.gather(*running, return_exceptions=True)
+
+        self.totals["all_failed"] += 1
+        return None, None
+
+    async def _attempt(self, provider: str, language: str, call: ProviderCall) -> Optional[bytes]:
+        t0 = time.perf_counter()
+        audio = None
+        try:
+            audio = await call()
+        except asyncio.CancelledError:
+            raise  # lost a hedge — not a provider failure
+        except Exception as e:
+            logger.warning(f"[TTS ROUTER] {provider} failed: {e}")
+        self.record(provider, language, (time.perf_counter() - t0) * 1000, bool(audio))
+        return audio
+
+    # ── Reporting ────────────────────────────────────────────
+
+    def get_stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            providers = {}
+            for (provider, language), s in sorted(self._stats.items()):
+                p90 = s.p90()
+                providers.setdefault(language, {})[provider] = {
+                    "ewma_latency_ms": round(s.latency_ms, 1),
+                    "p90_ms": round(p90, 1) if p90 is not None else None,
+                    "error_rate": round(s.error_rate, 3),
+                    "requests": s.requests,
+                    "failures": s.failures,
+                    "wins": s.wins,
+                    "hedges": s.hedges,
+                    "cooldowns": s.cooldowns,
+                    "cooling_for_s": round(max(0.0, s.cooldown_until - now), 1),
+                }
+        return {**self.totals, "by_language": providers}
+
+
+tts_router = TTSRouter()
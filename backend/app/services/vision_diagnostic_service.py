@@ -7,6 +7,11 @@ Agentic pipeline for crop disease diagnosis:
   Step 3: Translation via existing TranslatorService
   Step 4: TTS via existing RivaTTSService
 
+Steps run as a DAG (stage_executor): once vision returns, price search and
+translation run concurrently, and TTS starts as soon as the translated text
+exists (immediately for English). Price is appended to the displayed text
+but not spoken, so audio never waits on the web search.
+
 Designed for 2G-optimized input: expects <50KB compressed JPEG Base64 from the frontend.
 """
 
@@ -14,8 +19,9 @@ import os
 import json
 import re
 import logging
+import time
 import base64
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 from datetime import datetime
 
 import httpx
@@ -24,6 +30,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.cache_utils import TTLCache
+from app.services.diagnosis_cache import diagnosis_cache, variant_key
+from app.services.stage_executor import StageExecutor, StageFailed, SKIPPED
+from app.services.audio_codec import encode_async, mime_for, normalize_format
 
 logger = logging.getLogger("eventhorizon.vision")
 
@@ -42,6 +51,16 @@ NVIDIA_VISION_MODEL = os.getenv(
     "nvidia/nemotron-nano-12b-v2-vl"
 )
 
+# Per-stage timeouts for the diagnosis DAG (seconds). Vision is critical
+# (covers NIM's 60s plus the Gemini fallback);
+# a timed-out price/translate/tts stage just yields a partial result.
+STAGE_TIMEOUTS = {
+    "vision": float(os.getenv("DIAG_VISION_TIMEOUT", "110")),
+    "price": float(os.getenv("DIAG_PRICE_TIMEOUT", "20")),
+    "translate": float(os.getenv("DIAG_TRANSLATE_TIMEOUT", "25")),
+    "tts": float(os.getenv("DIAG_TTS_TIMEOUT", "20")),
+}
+
 def get_gemini_url():
     key = os.getenv("GEMINI_API_KEY", "")
     return f"https://generativelanguage.googleapis.com/v1beta/models/gemini-3.1-flash-lite:generateContent?key={key}"
@@ -102,6 +121,8 @@ class VisionDiagnosticService:
         user_query: Optional[str] = None,
         speak_result: bool = True,
         location: Optional[str] = None,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        audio_format: str = "wav",
     ) -> Dict[str, Any]:
         """
         Full diagnostic pipeline.
@@ -112,10 +133,30 @@ class VisionDiagnosticService:
             language: 2-letter language code for response translation
             user_query: Optional text query from the farmer (e.g., "What's wrong with my tomato?")
             speak_result: Whether to generate TTS audio for the diagnosis
+            on_event: Optional non-blocking callback, called as each stage completes
+                      with ("diagnosis" | "price" | "translation" | "audio", payload).
+                      Used by the streaming endpoints.
+            audio_format: "wav" | "opus" | "webm" | "mp3" for the spoken diagnosis
 
         Returns:
             Dict with diagnosis, price info, translated text, and optional audio URL
         """
+        # ── Step 0: Perceptual-hash cache (retries / near-duplicate uploads) ──
+        try:
+            image_bytes = base64.b64decode(image_base64.split(",", 1)[-1], validate=False)
+        except Exception:
+            image_bytes = b""
+        fingerprint = await diagnosis_cache.fingerprint(image_bytes)
+        cache_ns = "diagnose|" + variant_key(user_query, location)
+        cache_variant = variant_key(language, f"tts:{audio_format}" if speak_result else "")
+        cached, base = diagnosis_cache.lookup(cache_ns, fingerprint, cache_variant)
+        if cached is not None:
+            cached["cache"] = "hit"
+            logger.info(f"[Vision] Cache hit: {cached.get('issue_detected')}")
+            if on_event is not None:
+                self._replay_events(cached, on_event)
+            return cached
+
         result = {
             "plant_name": "Unknown",
             "issue_detected": "unknown",
@@ -134,82 +175,198 @@ class VisionDiagnosticService:
             "error": None,
         }
 
-        # ── Step 1: Vision Inference ──
-        try:
+        ex = StageExecutor()
+        t0 = time.perf_counter()
+
+        if base is not None:
+            # Same photo seen in another language: reuse diagnosis + price, redo translation/TTS
+            result.update(base)
+            result["cache"] = "partial"
+        else:
+            result["cache"] = "miss"
+
+        # ── Step 1: Vision Inference (critical) ──
+        async def vision_stage():
+            if base is not None:
+                return dict(base)
             diagnosis = await self._vision_inference(image_base64, user_query)
-            if diagnosis:
-                result.update(diagnosis)
-                logger.info(f"[Vision] Diagnosis: {diagnosis.get('issue_detected', 'unknown')}")
-            else:
-                result["error"] = "Vision model could not analyze the image."
-                return result
-        except Exception as e:
+            if not diagnosis:
+                raise ValueError("Vision model could not analyze the image.")
+            logger.info(f"[Vision] Diagnosis: {diagnosis.get('issue_detected', 'unknown')}")
+            return diagnosis
+
+        # ── Step 2: Price Search (skip if healthy or not a plant / cached) ──
+        async def price_stage():
+            diagnosis = ex_results["vision"]
+            if base is not None or diagnosis.get("issue_detected") in ("healthy", "not_a_plant", "N/A"):
+                return SKIPPED
+            if location:
+                logger.info(f"[Vision] Using location for search: {location}")
+            return await self._search_remedy_price(
+                diagnosis.get("search_query_trigger", ""),
+                diagnosis.get("recommended_material", ""),
+                location=location,
+            )
+
+        # ── Step 3: Translation — independent of the price, so it runs alongside it ──
+        async def translate_stage():
+            fields = {**result, **ex_results["vision"], "remedy_price": None}
+            return await self._localize(fields, language)
+
+        # ── Step 4: TTS — starts as soon as the (translated) text exists ──
+        async def tts_stage():
+            if not speak_result:
+                return SKIPPED
+            fields = ex_results.get("translate") or {}
+            text = fields.get("diagnosis_translated") or self._build_diagnosis_text({**result, **ex_results["vision"]})
+            wav = await self._speak(text, language)
+            if not wav:
+                return None
+            audio, fmt = await encode_async(wav, audio_format)
+            return {"audio": audio, "format": fmt, "mime": mime_for(fmt), "wav_bytes": len(wav)}
+
+        ex_results: Dict[str, Any] = {}
+
+        def stage(name, fn):
+            async def run():
+                out = await fn()
+                ex_results[name] = out
+                if on_event is not None:
+                    self._emit_stage_event(name, out, on_event)
+                return out
+            return run
+
+        ex.add("vision", stage("vision", vision_stage), timeout=STAGE_TIMEOUTS["vision"], critical=True)
+        ex.add("price", stage("price", price_stage), deps=["vision"], timeout=STAGE_TIMEOUTS["price"])
+        ex.add("translate", stage("translate", translate_stage), deps=["vision"], timeout=STAGE_TIMEOUTS["translate"])
+        ex.add("tts", stage("tts", tts_stage), deps=["translate"], timeout=STAGE_TIMEOUTS["tts"])
+
+        try:
+            await ex.run()
+        except StageFailed as e:
             logger.error(f"[Vision] Inference failed: {e}")
-            result["error"] = f"Image analysis failed: {str(e)}"
+            result["error"] = e.error if e.status == "failed" else f"Image analysis failed: {e.status} ({e.error})"
+            result["metadata"] = self._pipeline_metadata(ex, t0)
             return result
 
-        # ── Step 2: Price Search (skip if healthy or not a plant) ──
-        if result["issue_detected"] not in ("healthy", "not_a_plant", "N/A"):
-            try:
-                if location:
-                    logger.info(f"[Vision] Using location for search: {location}")
+        # ── Assemble: diagnosis fields, price, translated text, audio ──
+        result.update(ex_results["vision"])
+        price_info = ex_results.get("price")
+        if isinstance(price_info, dict):
+            result["remedy_price"] = price_info.get("price")
+            result["remedy_link"] = price_info.get("link")
+        base = {k: result.get(k) for k in self._BASE_FIELDS}
+
+        result["diagnosis_text"] = self._build_diagnosis_text(result)
+        localized = ex_results.get("translate")
+        if localized:
+            result.update({k: v for k, v in localized.items() if k in self._TRANSLATED_FIELDS})
+            translated = localized.get("diagnosis_translated") or result["diagnosis_text"]
+            price = result.get("remedy_price")
+            if price and price != "Check link for current price" and language != "en":
+                translated = f"{translated} ({price})"
+            result["diagnosis_translated"] = result["diagnosis_text"] if language == "en" else translated
+        else:
+            result["diagnosis_translated"] = result["diagnosis_text"]
 
-                price_info = await self._search_remedy_price(
-                    result.get("search_query_trigger", ""),
-                    result.get("recommended_material", ""),
-                    location=location
-                )
-                if price_info:
-                    result["remedy_price"] = price_info.get("price")
-                    result["remedy_link"] = price_info.get("link")
-            except Exception as e:
-                logger.warning(f"[Vision] Price search failed: {e}")
-                # Non-critical — continue without price
+        spoken = ex_results.get("tts")
+        if isinstance(spoken, dict) and spoken.get("audio"):
+            audio_b64 = base64.b64encode(spoken["audio"]).decode("utf-8")
+            result["audio_url"] = f"data:{spoken['mime']};base64,{audio_b64}"
+            logger.info(f"[Vision] TTS: {spoken['wav_bytes']} WAV bytes -> {len(spoken['audio'])} {spoken['format']} bytes")
 
-        # ── Step 3: Build diagnosis text and translate ──
-        diagnosis_text = self._build_diagnosis_text(result)
-        result["diagnosis_text"] = diagnosis_text
+        result["metadata"] = self._pipeline_metadata(ex, t0)
+        if not result.get("error") and not ex.partial:
+            diagnosis_cache.store(cache_ns, fingerprint, cache_variant, result, base=base)
+        return result
 
-        if language != "en":
-            try:
-                # First try translation of all fields using Gemini
-                await self._translate_fields(result, language)
-            except Exception as e:
-                logger.warning(f"[Vision] Gemini translation failed: {e}")
+    # Fields produced by vision + price search (language independent)
+    _BASE_FIELDS = (
+        "plant_name", "issue_detected", "cause", "severity", "recommended_material",
+        "organic_alternative", "application_method", "search_query_trigger",
+        "confidence", "remedy_price", "remedy_link",
+    )
+    _TRANSLATED_FIELDS = (
+        "plant_name", "issue_detected", "severity", "cause", "organic_alternative",
+        "recommended_material", "application_method",
+    )
+
+    def _emit_stage_event(self, stage: str, out: Any, on_event: Callable[[str, Dict[str, Any]], None]):
+        """Map a finished stage's output to a streaming event."""
+        try:
+            if stage == "vision":
+                on_event("diagnosis", {k: out.get(k) for k in self._BASE_FIELDS if k in out})
+            elif stage == "price" and isinstance(out, dict):
+                on_event("price", {"remedy_price": out.get("price"), "remedy_link": out.get("link")})
+            elif stage == "translate" and isinstance(out, dict):
+                payload = {k: out.get(k) for k in self._TRANSLATED_FIELDS}
+                payload["diagnosis_translated"] = out.get("diagnosis_translated")
+                on_event("translation", payload)
+            elif stage == "tts" and isinstance(out, dict):
+                on_event("audio", {"audio": out["audio"], "format": out["format"], "mime": out["mime"]})
+        except Exception as e:
+            logger.warning(f"[Vision] Stream event for {stage} failed: {e}")
+
+    def _replay_events(self, result: Dict[str, Any], on_event: Callable[[str, Dict[str, Any]], None]):
+        """Emit the stage events for a cached result, in pipeline order."""
+        on_event("diagnosis", {k: result.get(k) for k in self._BASE_FIELDS})
+        if result.get("remedy_price"):
+            on_event("price", {"remedy_price": result["remedy_price"], "remedy_link": result.get("remedy_link")})
+        payload = {k: result.get(k) for k in self._TRANSLATED_FIELDS}
+        payload["diagnosis_translated"] = result.get("diagnosis_translated")
+        on_event("translation", payload)
+        audio_url = result.get("audio_url") or ""
+        if audio_url.startswith("data:"):
+            header, _, b64 = audio_url.partition(",")
+            mime = header[5:].split(";")[0]
+            fmt = normalize_format(mime) or "wav"
+            on_event("audio", {"audio": base64.b64decode(b64), "format": fmt, "mime": mime})
 
-            if not result.get("diagnosis_translated") or result.get("diagnosis_translated") == diagnosis_text:
-                try:
-                    import asyncio
-                    from app.services.translator import translator
-                    translated = await asyncio.to_thread(
-                        translator.translate_from_english, diagnosis_text, language
-                    )
-                    result["diagnosis_translated"] = translated if translated else diagnosis_text
-                except Exception as fallback_err:
-                    logger.warning(f"[Vision] Fallback translation failed: {fallback_err}")
-                    result["diagnosis_translated"] = diagnosis_text
-        else:
-            result["diagnosis_translated"] = diagnosis_text
+    @staticmethod
+    def _pipeline_metadata(ex: StageExecutor, t0: float) -> Dict[str, Any]:
+        return {
+            "stages": ex.timings(),
+            "partial": ex.partial,
+            "total_ms": round((time.perf_counter() - t0) * 1000, 1),
+        }
 
-        # ── Step 4: TTS (speak the diagnosis aloud) ──
-        if speak_result:
+    async def _localize(self, fields: Dict[str, Any], language: str) -> Dict[str, Any]:
+        """
+        Build the English diagnosis text (without price — that is appended
+        once the price stage finishes) and translate it plus the display
+        fields. Works on its own copy so it can run alongside price search.
+        """
+        diagnosis_text = self._build_diagnosis_text(fields)
+        fields["diagnosis_text"] = diagnosis_text
+        fields["diagnosis_translated"] = ""
+
+        if language == "en":
+            fields["diagnosis_translated"] = diagnosis_text
+            return fields
+
+        try:
+            # First try translation of all fields using Gemini
+            await self._translate_fields(fields, language)
+        except Exception as e:
+            logger.warning(f"[Vision] Gemini translation failed: {e}")
+
+        if not fields.get("diagnosis_translated") or fields.get("diagnosis_translated") == diagnosis_text:
             try:
-                from app.services.azure_tts_engine import casual_voice_engine
                 import asyncio
-                tts_text = result["diagnosis_translated"]
-                audio_bytes = await asyncio.to_thread(
-                    casual_voice_engine.speak_natural, tts_text, language
+                from app.services.translator import translator
+                translated = await asyncio.to_thread(
+                    translator.translate_from_english, diagnosis_text, language
                 )
-                if audio_bytes:
-                    audio_b64 = base64.b64encode(audio_bytes).decode("utf-8")
-                    mime = "audio/wav"
-                    result["audio_url"] = f"data:{mime};base64,{audio_b64}"
-                    logger.info(f"[Vision] TTS: {len(audio_bytes)} bytes")
-            except Exception as e:
-                logger.warning(f"[Vision] TTS failed: {e}")
-                # Non-critical — continue without audio
-
-        return result
+                fields["diagnosis_translated"] = translated if translated else diagnosis_text
+            except Exception as fallback_err:
+                logger.warning(f"[Vision] Fallback translation failed: {fallback_err}")
+                fields["diagnosis_translated"] = diagnosis_text
+        return fields
+
+    async def _speak(self, text: str, language: str) -> Optional[bytes]:
+        """Synthesize the diagnosis. For English this starts right after vision, overlapping price search."""
+        from app.services.azure_tts_engine import casual_voice_engine
+        return await casual_voice_engine.speak_natural_async(text, language)
 
     # ═══════════════════════════════════════════════════════════════════════
     # STEP 1: Vision Inference — NIM (primary) → Gemini (fallback)
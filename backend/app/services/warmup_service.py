@@ -0,0 +1,123 @@
+"""
+Warm-up Orchestrator — EventHorizon AI
+========================================
+Tracks the named start-up tasks a worker runs before it should receive
+traffic (DB pool pre-connect, classifier load, TTS voice warm, HTTP
+pre-connect, cache pre-load). Each task has its own timeout; readiness
+stays false until every *critical* task has finished, and /api/health
+reports per-component status so the load balancer only routes to warm
+workers.
+"""
+
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+_FINISHED = (READY, FAILED, TIMEOUT)
+
+
+class WarmupTask:
+    def __init__(self, name: str, factory: Callable[[], Awaitable[Any]], timeout: float, critical: bool):
+        self.name = name
+        self.factory = factory
+        self.timeout = timeout
+        self.critical = critical
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "critical": self.critical,
+            "timeout_s": self.timeout,
+            "duration_ms": round(self.duration_ms, 1) if self.duration_ms is not None else None,
+            "error": self.error,
+        }
+
+
+class WarmupOrchestrator:
+    """Runs registered warm-up tasks concurrently and reports readiness."""
+
+    def __init__(self):
+        self.tasks: Dict[str, WarmupTask] = {}
+        self._handles: Dict[str, asyncio.Task] = {}
+        self._started_at: Optional[float] = None
+
+    def register(self, name: str, factory: Callable[[], Awaitable[Any]], timeout: float = 60.0, critical: bool = False):
+        """Register a coroutine factory to run at start-up."""
+        self.tasks[name] = WarmupTask(name, factory, timeout, critical)
+
+    async def _run(self, task: WarmupTask):
+        task.status = RUNNING
+        task.started_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(task.factory(), timeout=task.timeout)
+            task.status = READY
+        except asyncio.TimeoutError:
+            task.status = TIMEOUT
+            task.error = f"exceeded {task.timeout:g}s"
+        except Exception as e:
+            task.status = FAILED
+            task.error = str(e)
+        finally:
+            task.duration_ms = (time.perf_counter() - task.started_at) * 1000
+            flag = "[*]" if task.status == READY else "[!]"
+            print(f"{flag} Warm-up '{task.name}' {task.status} in {task.duration_ms:.0f}ms"
+                  + (f" ({task.error})" if task.error else ""))
+
+    def start(self):
+        """Launch every registered task in the background."""
+        self._started_at = time.perf_counter()
+        for name, task in self.tasks.items():
+            if name not in self._handles:
+                self._handles[name] = asyncio.create_task(self._run(task))
+
+    async def wait_for(self, name: str) -> str:
+        """Wait for one task to finish and return its final status."""
+        handle = self._handles.get(name)
+        if handle is not None:
+            await asyncio.shield(handle)
+        return self.tasks[name].status
+
+    async def wait_critical(self):
+        """Wait for all critical tasks to finish (success, failure or timeout)."""
+        await asyncio.gather(*[h for n, h in self._handles.items() if self.tasks[n].critical])
+
+    def cancel(self):
+        for handle in self._handles.values():
+            if not handle.done():
+                handle.cancel()
+
+    @property
+    def is_ready(self) -> bool:
+        """True once every critical task has finished."""
+        return all(t.status in _FINISHED for t in self.tasks.values() if t.critical)
+
+    @property
+    def is_degraded(self) -> bool:
+        """True if any finished critical task did not succeed."""
+        return any(t.status in (FAILED, TIMEOUT) for t in self.tasks.values() if t.critical)
+
+    def report(self) -> Dict[str, Any]:
+        if not self.is_ready:
+            status = "booting"
+        elif self.is_degraded:
+            status = "degraded"
+        else:
+            status = "ready"
+        return {
+            "status": status,
+            "uptime_s": round(time.perf_counter() - self._started_at, 1) if self._started_at else 0,
+            "components": {name: t.to_dict() for name, t in self.tasks.items()},
+        }
+
+
+warmup_orchestrator = WarmupOrchestrator()
@@ -0,0 +1,51 @@
+"""
+Assistant WebSocket Audio Protocol — EventHorizon AI
+======================================================
+Binary frames for audio in both directions; JSON text frames stay for
+control messages (text chat, audio_end, transcripts, stream markers).
+
+Frame layout (network byte order), 6-byte header + raw audio payload:
+
+    offset  size  field
+    0       1     type     FRAME_MIC_AUDIO (client → server)
+                           FRAME_TTS_AUDIO (server → client)
+    1       1     format   FORMAT_CODES (wav / opus / webm / mp3 / pcm)
+    2       4     seq      uint32 — mic chunk counter or TTS sentence seq
+
+Clients opt in with `?protocol=binary` on the socket URL or a
+`{"type": "hello", "protocol": "binary"}` message. Without it the server
+keeps the legacy base64-in-JSON `audio_chunk` messages (compat mode);
+binary mic frames are accepted in either mode.
+"""
+
+import struct
+from typing import Tuple
+
+HEADER = struct.Struct("!BBI")
+HEADER_SIZE = HEADER.size
+
+FRAME_MIC_AUDIO = 0x01
+FRAME_TTS_AUDIO = 0x11
+
+FORMAT_CODES = {"wav": 0, "opus": 1, "webm": 2, "mp3": 3, "pcm": 4}  # pcm: streamed s16le mono frames
+FORMAT_NAMES = {code: name for name, code in FORMAT_CODES.items()}
+
+PROTOCOL_JSON = "json"
+PROTOCOL_BINARY = "binary"
+
+
+class FrameError(ValueError):
+    pass
+
+
+def pack_frame(frame_type: int, seq: int, payload: bytes, fmt: str = "wav") -> bytes:
+    """Header + payload in a single buffer (one copy of the payload)."""
+    return HEADER.pack(frame_type, FORMAT_CODES.get(fmt, 0), seq & 0xFFFFFFFF) + payload
+
+
+def unpack_frame(data: bytes) -> Tuple[int, str, int, memoryview]:
+    """Returns (type, format, seq, payload) — payload is a zero-copy view into `data`."""
+    if len(data) < HEADER_SIZE:
+        raise FrameError(f"Frame too short ({len(data)} bytes)")
+    frame_type, fmt_code, seq = HEADER.unpack_from(data, 0)
+    return frame_type, FORMAT_NAMES.get(fmt_code, "wav"), seq, memoryview(data)[HEADER_SIZE:]
@@ -0,0 +1,95 @@
+"""
+Azure Chunked TTS Benchmark — EventHorizon AI
+===============================================
+End-to-end speak_natural latency for long answers that split into 5, 10
+and 20 chunks, sequential vs parallel chunk synthesis (sync thread fan-out
+and speak_natural_async). Needs AZURE_SPEECH_KEY.
+
+Usage:
+    python bench_azure_chunks.py
+    AZURE_TTS_POOL_MAX_PER_VOICE=8 BENCH_LANG=hi BENCH_ROUNDS=5 python bench_azure_chunks.py
+"""
+
+import os
+import sys
+import time
+import asyncio
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dotenv import load_dotenv
+load_dotenv()
+
+CHUNK_COUNTS = [5, 10, 20]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "3"))
+LANG = os.getenv("BENCH_LANG", "en_in")
+
+CLAUSES = [
+    "Check the lower leaves of your tomato plants every morning",
+    "Remove any leaf with brown rings and burn it away from the field",
+    "Spray a copper based fungicide in the evening when the wind is calm",
+    "Water the roots directly and keep the leaves as dry as possible",
+    "Leave enough space between plants so that air can move freely",
+]
+
+
+def make_answer(n_chunks: int) -> str:
+    # Each clause is under the 12-word limit, so _segment_text makes one chunk per sentence
+    return ". ".join(CLAUSES[i % len(CLAUSES)] for i in range(n_chunks)) + "."
+
+
+def bench_sync(engine, text):
+    timings, size = [], 0
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        audio = engine.speak_natural(text, LANG)
+        timings.append(time.perf_counter() - t0)
+        size = len(audio or b"")
+    return statistics.median(timings), size
+
+
+async def bench_async(engine, text):
+    timings, size = [], 0
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        audio = await engine.speak_natural_async(text, LANG)
+        timings.append(time.perf_counter() - t0)
+        size = len(audio or b"")
+    return statistics.median(timings), size
+
+
+def main():
+    from app.services.azure_tts_engine import UniversalCasualIndianVoice, POOL_MAX_PER_VOICE
+
+    engine = UniversalCasualIndianVoice(pre_warm_voices=[LANG])
+    if not engine.is_available:
+        print("Azure TTS unavailable (AZURE_SPEECH_KEY / SDK missing).")
+        return
+
+    print("=" * 78)
+    print(f"  lang={LANG}  pool max/voice={POOL_MAX_PER_VOICE}  rounds={ROUNDS}")
+    print("=" * 78)
+    print(f"  {'chunks':>6} | {'sequential ms':>13} | {'parallel ms':>11} | {'async ms':>8} | {'speedup':>7} | bytes")
+    print("-" * 78)
+
+    for n in CHUNK_COUNTS:
+        text = make_answer(n)
+        n_chunks = len(engine._segment_text(engine._clean_text(text), max_words=12))
+
+        engine._parallel_chunks = False
+        seq, size = bench_sync(engine, text)
+        engine._parallel_chunks = True
+        par, _ = bench_sync(engine, text)
+        asy, _ = asyncio.run(bench_async(engine, text))
+
+        print(f"  {n_chunks:>6} | {seq * 1000:>13.0f} | {par * 1000:>11.0f} | {asy * 1000:>8.0f} | {seq / par:>6.1f}x | {size:,}")
+
+    print("-" * 78)
+    for voice, stats in engine.get_pool_stats().items():
+        print(f"  {voice}: created={stats['created']} max_queue={stats['max_queue_depth']} "
+              f"avg_wait={stats['avg_wait_ms']}ms max_wait={stats['wait_ms_max']}ms")
+    engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Classifier Micro-batching Benchmark — EventHorizon AI
+======================================================
+Measures plant-classifier throughput for batch sizes 1/4/8/16:
+
+  1. direct   — one forward pass over N images (pure model cost per batch)
+  2. batcher  — N concurrent requests through ClassifierBatcher, as the
+                /analyze-plant endpoint sees them under load
+
+Usage:
+    python bench_classifier_batching.py
+    CLASSIFIER_TORCH_THREADS=4 BENCH_ROUNDS=5 python bench_classifier_batching.py
+"""
+
+import io
+import os
+import sys
+import time
+import asyncio
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BATCH_SIZES = [1, 4, 8, 16]
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "3"))
+
+
+def make_images(n):
+    from PIL import Image
+
+    images, payloads = [], []
+    for i in range(n):
+        img = Image.new("RGB", (256, 256), (40 + (i * 13) % 120, 120 + (i * 7) % 100, 40))
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+        images.append(img)
+        payloads.append(buf.getvalue())
+    return images, payloads
+
+
+def bench_direct(proc, mod, batch_size):
+    from app.services.classifier_service import run_batch_inference
+
+    images, _ = make_images(batch_size)
+    run_batch_inference(proc, mod, images)  # warm
+    timings = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        run_batch_inference(proc, mod, images)
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings)
+
+
+async def bench_batcher(proc, mod, concurrency):
+    from app.services.classifier_service import ClassifierBatcher
+
+    _, payloads = make_images(concurrency)
+    batcher = ClassifierBatcher(proc, mod, max_batch=concurrency)
+    await batcher.classify(payloads[0])  # warm
+    timings = []
+    for _ in range(ROUNDS):
+        t0 = time.perf_counter()
+        await asyncio.gather(*[batcher.classify(p) for p in payloads])
+        timings.append(time.perf_counter() - t0)
+    return statistics.median(timings), batcher.stats
+
+
+def main():
+    from app.services.classifier_service import load_shared_classifier, TORCH_THREADS, configure_torch_threads
+
+    configure_torch_threads()
+    print("Loading classifier...")
+    proc, mod = load_shared_classifier()
+
+    print("=" * 72)
+    print(f"  Torch intra-op threads: {TORCH_THREADS}   rounds: {ROUNDS}")
+    print("=" * 72)
+    print(f"  {'batch':>5} | {'direct ms':>10} | {'img/s':>7} | {'batcher ms':>10} | {'img/s':>7} | batches")
+    print("-" * 72)
+
+    baseline = None
+    for n in BATCH_SIZES:
+        direct = bench_direct(proc, mod, n)
+        batched, stats = asyncio.run(bench_batcher(proc, mod, n))
+        direct_tput = n / direct
+        if baseline is None:
+            baseline = direct_tput
+        print(f"  {n:>5} | {direct * 1000:>10.1f} | {direct_tput:>7.1f} | "
+              f"{batched * 1000:>10.1f} | {n / batched:>7.1f} | {stats['batches']}")
+
+    print("-" * 72)
+    print(f"  Baseline (batch=1) throughput: {baseline:.1f} img/s")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
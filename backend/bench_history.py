@@ -0,0 +1,147 @@
+"""
+Chat History Compaction Benchmark — EventHorizon AI
+=====================================================
+Plays 50-turn farmer sessions and, at every turn, builds the Gemini
+request payload (system prompt + contents) twice: with the full client
+history (old behaviour) and with history_manager's window + summary.
+Reports payload bytes and estimated input tokens at turns 10…50, and
+time-to-first-token — modelled as TTFT_BASE_MS + TTFT_MS_PER_1K_TOKENS per
+1k input tokens, or measured against Gemini with --live (needs
+GEMINI_API_KEY; makes 2 calls per reported turn).
+
+Summaries are produced offline by a stand-in summarizer (first sentence of
+each dropped turn, capped at 80 words) unless --live is given.
+
+Usage:
+    python bench_history.py
+    python bench_history.py --sessions 10 --live
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.services.history_manager import HistoryManager, estimate_tokens
+
+TURNS = 50
+REPORT_AT = [10, 20, 30, 40, 50]
+TTFT_BASE_MS = 350.0
+TTFT_MS_PER_1K_TOKENS = 120.0
+
+QUESTIONS = [
+    "My tomato leaves have brown spots with rings, what is it?",
+    "How much copper fungicide per litre of water?",
+    "Should I spray in the morning or evening?",
+    "Mere khet mein paani kam hai, drip irrigation ka kharcha kitna hoga?",
+    "What is the onion price in Nashik mandi today?",
+    "Will it rain this week in my district?",
+    "Which PM-KISAN documents do I need?",
+    "मेरी गेहूं की फसल पीली पड़ रही है, क्या करूं?",
+    "How much urea for 2 acres of wheat?",
+    "Is neem oil safe for bees?",
+]
+ANSWER = ("Bro, those brown ring spots are early blight, a fungal disease that loves humid weather. "
+          "Remove the lower infected leaves and burn them away from the field, then spray a copper "
+          "based fungicide in the evening when the wind is calm. Water at the roots only and keep the "
+          "leaves dry. Check again in three days and tell me if the spots keep spreading, okay?")
+
+
+class MemoryStore:
+    def __init__(self):
+        self.data = {}
+
+    def get_memory(self, user_id):
+        return dict(self.data.get(user_id, {}))
+
+    def save_memory(self, user_id, key, value):
+        self.data.setdefault(user_id, {})[key] = value
+        return True
+
+
+def offline_summarizer(turns, previous):
+    sentences = [str(t["content"]).split(".")[0].strip() for t in turns if t.get("role") == "user"]
+    words = (previous + " " + ". ".join(sentences)).split()
+    return " ".join(words[-80:])
+
+
+def payload_for(message, window, memory):
+    from app.services.gemini_service import build_system_prompt, gemini_service
+    return {
+        "contents": gemini_service._build_contents_payload(message, window),
+        "system_instruction": {"parts": [{"text": build_system_prompt("agriculture", "en", memory)}]},
+    }
+
+
+def tokens_of(payload):
+    return sum(estimate_tokens(p["text"]) for c in payload["contents"] for p in c["parts"]) + \
+        estimate_tokens(payload["system_instruction"]["parts"][0]["text"])
+
+
+def live_ttft(message, window, memory):
+    from app.services.gemini_service import gemini_service
+    t0 = time.perf_counter()
+    stream = gemini_service.generate_response_stream(message, "agriculture", "en", window, memory)
+    next(stream, None)
+    ttft = (time.perf_counter() - t0) * 1000
+    stream.close()
+    return ttft
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History compaction: payload size and TTFT over 50-turn sessions")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="measure TTFT against Gemini")
+    args = parser.parse_args()
+
+    store = MemoryStore()
+    rows = {turn: {"full_kb": [], "compact_kb": [], "full_tok": [], "compact_tok": [], "full_ms": [], "compact_ms": []}
+            for turn in REPORT_AT}
+    manager = HistoryManager(summarize=None if args.live else offline_summarizer, store=store, background=False)
+
+    for s in range(args.sessions):
+        rng = random.Random(s)
+        history = []
+        for turn in range(1, TURNS + 1):
+            message = rng.choice(QUESTIONS)
+            compact = manager.compact(history, user_id=f"bench-{s}")
+            if turn in REPORT_AT:
+                full = payload_for(message, history, None)
+                small = payload_for(message, compact.window, compact.memory)
+                r = rows[turn]
+                r["full_kb"].append(len(json.dumps(full, ensure_ascii=False).encode()) / 1024)
+                r["compact_kb"].append(len(json.dumps(small, ensure_ascii=False).encode()) / 1024)
+                r["full_tok"].append(tokens_of(full))
+                r["compact_tok"].append(tokens_of(small))
+                if args.live:
+                    r["full_ms"].append(live_ttft(message, history, None))
+                    r["compact_ms"].append(live_ttft(message, compact.window, compact.memory))
+                else:
+                    r["full_ms"].append(TTFT_BASE_MS + TTFT_MS_PER_1K_TOKENS * tokens_of(full) / 1000)
+                    r["compact_ms"].append(TTFT_BASE_MS + TTFT_MS_PER_1K_TOKENS * tokens_of(small) / 1000)
+            history += [{"role": "user", "content": message}, {"role": "assistant", "content": ANSWER}]
+
+    print("=" * 84)
+    print(f"  {args.sessions} sessions x {TURNS} turns  budget={manager.token_budget} tokens  "
+          f"TTFT {'measured (Gemini)' if args.live else f'model: {TTFT_BASE_MS:.0f}ms + {TTFT_MS_PER_1K_TOKENS:.0f}ms/1k tok'}")
+    print("=" * 84)
+    print(f"  {'turn':>4} | {'full KB':>8} | {'compact KB':>10} | {'full tok':>8} | {'compact tok':>11} | "
+          f"{'full TTFT':>9} | {'compact TTFT':>12}")
+    print("-" * 84)
+    for turn, r in rows.items():
+        m = statistics.median
+        print(f"  {turn:>4} | {m(r['full_kb']):>8.1f} | {m(r['compact_kb']):>10.1f} | {m(r['full_tok']):>8.0f} | "
+              f"{m(r['compact_tok']):>11.0f} | {m(r['full_ms']):>7.0f}ms | {m(r['compact_ms']):>10.0f}ms")
+    print("-" * 84)
+    print(f"  {manager.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
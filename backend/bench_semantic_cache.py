@@ -0,0 +1,134 @@
+"""
+Semantic Chat Cache Replay — EventHorizon AI
+==============================================
+Replays a chat query log through the exact-match key (what
+chat_response_cache does) and the semantic cache, and reports hit rates.
+If log rows carry an "intent" label, hits whose cached answer was stored
+for a different intent are counted as false hits.
+
+Log format (JSONL, one query per line):
+    {"t_s": 12.5, "message": "...", "language": "hi", "page_context": "market",
+     "history": [...], "intent": "price:tomato"}
+Only "message" is required. Without --log a built-in sample of farmer
+queries (paraphrases in English, Hinglish and Hindi, spread over a day)
+is replayed.
+
+Usage:
+    python bench_semantic_cache.py
+    python bench_semantic_cache.py --log chat_queries.jsonl
+"""
+
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.semantic_cache import SemanticChatCache
+
+PARAPHRASES = {
+    ("en", "general", "price:tomato"): ["Tomato price today?", "what is the tomato rate today", "today's tomato price",
+                                         "tomato rate today please", "tell me the price of tomato today"],
+    ("en", "general", "price:onion"): ["Onion price today?", "what is the onion rate today", "onion rate today"],
+    ("hi", "general", "price:tomato"): ["aaj tamatar ka bhav kya hai", "tamatar ka bhav aaj", "टमाटर का आज का भाव क्या है",
+                                         "aaj tamatar ka rate kitna hai"],
+    ("hi", "general", "price:onion"): ["aaj pyaaz ka bhav kya hai", "प्याज का आज का भाव"],
+    ("en", "agriculture", "blight"): ["How do I treat early blight on tomato?", "how to treat tomato early blight",
+                                       "treatment for early blight in tomato", "early blight tomato treatment"],
+    ("en", "agriculture", "whitefly"): ["how to control whitefly in cotton", "whitefly control cotton",
+                                         "cotton whitefly how to control"],
+    ("en", "general", "rain"): ["Will it rain tomorrow?", "rain tomorrow?", "is rain expected tomorrow"],
+    ("hi", "general", "rain"): ["kal baarish hogi kya", "kal barish hogi", "क्या कल बारिश होगी"],
+    ("en", "general", "pmkisan"): ["When is the next PM-KISAN installment?", "next pm kisan installment date",
+                                    "pm kisan next installment when"],
+    ("en", "general", "urea:2"): ["how much urea for 2 acres of wheat", "urea quantity for 2 acres wheat"],
+    ("en", "general", "urea:5"): ["how much urea for 5 acres of wheat", "urea quantity for 5 acres wheat"],
+    # Opposite intents that differ only by a negation
+    ("en", "agriculture", "urea:cotton"): ["can I spray urea on cotton", "should I spray urea on cotton"],
+    ("en", "agriculture", "urea:cotton:not"): ["can I not spray urea on cotton", "should I not spray urea on cotton",
+                                               "don't spray urea on cotton?"],
+    ("hi", "agriculture", "urea:cotton"): ["kya cotton pe urea spray karu", "cotton pe urea spray karu kya"],
+    ("hi", "agriculture", "urea:cotton:not"): ["kya cotton pe urea spray nahi karu", "cotton pe urea spray mat karu kya"],
+}
+
+
+def sample_log(n: int = 600, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    keys = list(PARAPHRASES)
+    weights = [5 if k[2].startswith("price") else 2 for k in keys]
+    rows, t = [], 0.0
+    for _ in range(n):
+        language, context, intent = rng.choices(keys, weights)[0]
+        t += rng.expovariate(n / 86400)  # spread over a day
+        rows.append({"t_s": t, "message": rng.choice(PARAPHRASES[(language, context, intent)]),
+                     "language": language, "page_context": context, "intent": intent})
+    return rows
+
+
+def exact_key(row: dict) -> str:
+    history_json = json.dumps(row.get("history") or [], sort_keys=True, separators=(",", ":"), default=str)
+    return f"chat:{row.get('language', 'en')}:{row.get('page_context') or 'general'}:" \
+           f"{hashlib.sha256((row['message'] + history_json).encode('utf-8')).hexdigest()}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a chat query log through the chat caches")
+    parser.add_argument("--log", help="JSONL query log")
+    parser.add_argument("--exact-ttl", type=float, default=3600, help="exact cache TTL (chat_response_cache)")
+    args = parser.parse_args()
+
+    if args.log:
+        with open(args.log, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        rows = sample_log()
+
+    clock = {"now": 0.0}
+    semantic = SemanticChatCache(clock=lambda: clock["now"])
+    exact = {}
+    counts = Counter()
+
+    for i, row in enumerate(rows):
+        clock["now"] = row.get("t_s", i)
+        language, context = row.get("language", "en"), row.get("page_context") or "general"
+        intent = row.get("intent")
+
+        key = exact_key(row)
+        stored = exact.get(key)
+        if stored and clock["now"] - stored[0] < args.exact_ttl:
+            counts["exact"] += 1
+            continue
+
+        hit = semantic.get(row["message"], language, context, row.get("history"))
+        if hit is not None:
+            counts["semantic"] += 1
+            if intent and not hit[0].endswith(f"[{intent}]"):
+                counts["false"] += 1
+            continue
+
+        counts["miss"] += 1
+        answer = f"answer [{intent}]" if intent else "answer"
+        exact[key] = (clock["now"], answer)
+        semantic.set(row["message"], language, context, answer, row.get("history"))
+
+    total = len(rows)
+    print("=" * 60)
+    print(f"  {total} queries replayed{' from ' + args.log if args.log else ' (built-in sample)'}")
+    print("=" * 60)
+    print(f"  exact-key hit rate (old cache):  {counts['exact'] / total:6.1%}")
+    print(f"  semantic layer extra hits:       {counts['semantic'] / total:6.1%}")
+    print(f"  combined hit rate:               {(counts['exact'] + counts['semantic']) / total:6.1%}")
+    print(f"  LLM calls:                       {counts['miss']}  (was {total - counts['exact']})")
+    if any(r.get("intent") for r in rows):
+        print(f"  false hits (wrong intent):       {counts['false']}")
+    stats = semantic.get_stats()
+    print(f"  expired entries: {stats['expired']}  number-guard rejections: {stats['number_mismatch']}  "
+          f"negation-guard rejections: {stats['negation_mismatch']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Startup Import Budget — EventHorizon AI
+========================================
+Imports `app.main` in a fresh interpreter with `-X importtime`, reports the
+slowest top-level packages, and fails if the total import time exceeds the
+budget or if any deferred heavy dependency is imported eagerly.
+
+Usage:
+    python bench_startup.py                 # default 2500 ms budget
+    STARTUP_IMPORT_BUDGET_MS=1500 python bench_startup.py
+"""
+
+import os
+import re
+import sys
+import subprocess
+
+BUDGET_MS = float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "2500"))
+TOP_N = 15
+
+# Must only be imported on first use by the services that need them
+DEFERRED_MODULES = [
+    "pandas",
+    "numpy",
+    "prophet",
+    "sklearn",
+    "transformers",
+    "torch",
+    "groq",
+    "onnxruntime",
+    "azure.cognitiveservices.speech",
+    "sqlalchemy.ext.asyncio",
+]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime():
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"[FAIL] `import app.main` exited with {proc.returncode}")
+    return proc.stderr
+
+
+def parse(stderr):
+    """Return [(module, self_us, cumulative_us, depth)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            self_us, cum_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+            rows.append((name, self_us, cum_us, (len(indent) - 1) // 2))
+    return rows
+
+
+def main():
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    rows = parse(run_importtime())
+    if not rows:
+        raise SystemExit("[FAIL] No -X importtime output captured")
+
+    total_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+    imported = {name for name, _, _, _ in rows}
+
+    # Aggregate self time per top-level package
+    by_package = {}
+    for name, self_us, _, _ in rows:
+        pkg = name.split(".")[0]
+        by_package[pkg] = by_package.get(pkg, 0) + self_us
+
+    print("=" * 60)
+    print(f"  import app.main — {total_ms:.0f} ms total ({len(rows)} modules)")
+    print("=" * 60)
+    for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:TOP_N]:
+        print(f"  {pkg:<36} {us / 1000:8.1f} ms")
+
+    eager = [m for m in DEFERRED_MODULES if m in imported]
+    print("-" * 60)
+    print(f"  Budget: {BUDGET_MS:.0f} ms -> {'PASS' if total_ms <= BUDGET_MS else 'FAIL'}")
+    print(f"  Deferred heavy modules imported eagerly: {', '.join(eager) if eager else 'none'}")
+    print("=" * 60)
+
+    ok = total_ms <= BUDGET_MS and not eager
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
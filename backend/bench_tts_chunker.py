@@ -0,0 +1,136 @@
+"""
+TTS Chunker Benchmark — EventHorizon AI
+=========================================
+Replays LLM token streams through the legacy extract_tts_chunks splitter
+and the AdaptiveTTSChunker and reports, per language, simulated
+time-to-first-audio (first chunk ready + its synthesis time) and the
+number of synthesis calls per answer.
+
+Streams come from a JSONL log (one answer per line:
+{"language": "hi", "events": [[t_ms, "text"], ...]}) — e.g. captured from
+gemini_service.generate_response_stream — or, without --log, from built-in
+sample answers replayed with Gemini-like pacing. Synthesis time is modelled
+as TTS_BASE_MS + TTS_MS_PER_CHAR × chunk length.
+
+Usage:
+    python bench_tts_chunker.py
+    python bench_tts_chunker.py --log token_streams.jsonl
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import statistics
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.tts_chunker import extract_tts_chunks, AdaptiveTTSChunker
+
+TTS_BASE_MS = 350.0
+TTS_MS_PER_CHAR = 6.0
+FIRST_TOKEN_MS = 600.0
+
+SAMPLES = {
+    "en": [
+        "Your tomato leaves show signs of early blight, a common fungal disease in humid weather. "
+        "Remove the affected lower leaves and burn them away from the field. Spray a copper based fungicide "
+        "in the evening when the wind is calm. Water at the roots and keep the leaves dry. Check again after "
+        "three days and call the Kisan helpline if the spots keep spreading.",
+        "The NDVI for your field is 0.42, which is lower than last month. This usually means water stress. "
+        "Irrigate early tomorrow morning, apply mulch around the plants, and avoid fertilizer until the "
+        "crop recovers. I will alert you if the index drops below 0.35.",
+        "Onion prices at the Nashik mandi are ₹2,150 per quintal today, up 4% from last week. Prices usually "
+        "rise further in the next two weeks, so holding part of your stock could pay off if you have dry storage.",
+    ],
+    "hi": [
+        "आपके टमाटर के पत्तों पर झुलसा रोग के लक्षण दिख रहे हैं, जो नम मौसम में आम है। नीचे के प्रभावित पत्ते "
+        "तोड़कर खेत से दूर जला दें। शाम को जब हवा शांत हो तब तांबा आधारित फफूंदनाशक का छिड़काव करें। पानी जड़ों में "
+        "दें और पत्तों को सूखा रखें। तीन दिन बाद फिर देखें।",
+        "आपके खेत का एनडीवीआई 0.42 है, जो पिछले महीने से कम है। इसका मतलब आमतौर पर पानी की कमी होता है। कल सुबह "
+        "जल्दी सिंचाई करें, पौधों के चारों ओर मल्च डालें, और फसल ठीक होने तक खाद न डालें॥",
+    ],
+    "ta": [
+        "உங்கள் தக்காளி இலைகளில் ஆரம்பகால கருகல் நோயின் அறிகுறிகள் தெரிகின்றன. பாதிக்கப்பட்ட கீழ் இலைகளை அகற்றி "
+        "வயலுக்கு வெளியே எரித்து விடுங்கள். காற்று அமைதியாக இருக்கும் மாலை நேரத்தில் தாமிர பூஞ்சைக்கொல்லி தெளிக்கவும். "
+        "வேர்களில் தண்ணீர் ஊற்றி இலைகளை உலர வைக்கவும்.",
+    ],
+}
+
+
+def synthetic_stream(text: str, rng: random.Random) -> list:
+    """Gemini-like SSE pacing: first part after ~FIRST_TOKEN_MS, then 3-9 word parts every 60-180ms."""
+    words = text.split(" ")
+    events, t, i = [], FIRST_TOKEN_MS * rng.uniform(0.8, 1.3), 0
+    while i < len(words):
+        n = rng.randint(3, 9)
+        events.append([t, " ".join(words[i:i + n]) + (" " if i + n < len(words) else "")])
+        i += n
+        t += rng.uniform(60, 180)
+    return events
+
+
+def synth_ms(chunk: str) -> float:
+    return TTS_BASE_MS + TTS_MS_PER_CHAR * len(chunk)
+
+
+def replay_legacy(events: list) -> list:
+    buffer, emitted = "", []
+    for t, text in events:
+        buffer += text
+        chunks, buffer = extract_tts_chunks(buffer)
+        emitted += [(t, c) for c in chunks]
+    chunks, _ = extract_tts_chunks(buffer, is_final=True)
+    emitted += [(events[-1][0], c) for c in chunks]
+    return emitted
+
+
+def replay_adaptive(events: list) -> list:
+    chunker, emitted = AdaptiveTTSChunker(), []
+    for t, text in events:
+        emitted += [(t, c) for c in chunker.feed(text, now=t / 1000)]
+    emitted += [(events[-1][0], c) for c in chunker.flush()]
+    return emitted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay token streams through the TTS chunkers")
+    parser.add_argument("--log", help="JSONL of recorded token streams")
+    parser.add_argument("--rounds", type=int, default=20, help="pacing variations per built-in sample")
+    args = parser.parse_args()
+
+    streams = []
+    if args.log:
+        with open(args.log, encoding="utf-8") as f:
+            streams = [(row["language"], row["events"]) for row in map(json.loads, f) if row.get("events")]
+    else:
+        rng = random.Random(42)
+        for language, texts in SAMPLES.items():
+            for text in texts:
+                streams += [(language, synthetic_stream(text, rng)) for _ in range(args.rounds)]
+
+    results = defaultdict(lambda: defaultdict(list))
+    for language, events in streams:
+        for name, replay in (("legacy", replay_legacy), ("adaptive", replay_adaptive)):
+            emitted = replay(events)
+            t_first, first = emitted[0]
+            results[language][name].append((t_first + synth_ms(first), len(emitted),
+                                             statistics.mean(len(c) for _, c in emitted)))
+
+    print("=" * 76)
+    print(f"  {len(streams)} answers  (synthesis model: {TTS_BASE_MS:.0f}ms + {TTS_MS_PER_CHAR:.0f}ms/char)")
+    print("=" * 76)
+    print(f"  {'lang':<5} {'chunker':<9} | {'TTFA p50':>9} | {'TTFA p90':>9} | {'calls/answer':>12} | {'chars/call':>10}")
+    print("-" * 76)
+    for language, by_name in results.items():
+        for name, rows in by_name.items():
+            ttfa = sorted(r[0] for r in rows)
+            print(f"  {language:<5} {name:<9} | {ttfa[len(ttfa) // 2]:>7.0f}ms | {ttfa[int(0.9 * (len(ttfa) - 1))]:>7.0f}ms | "
+                  f"{statistics.mean(r[1] for r in rows):>12.1f} | {statistics.mean(r[2] for r in rows):>10.0f}")
+    print("-" * 76)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+TTS Delivery Benchmark — EventHorizon AI
+==========================================
+Simulates handle_chat_stream's TTS pipeline (LLM emitting sentences, 3
+concurrent workers, provider latency with occasional stragglers) and
+compares the old send-on-completion delivery, reordered by the client,
+with OrderedAudioDelivery. Reports time-to-first-audio, gap-free playback
+ratio, total gap time, skipped chunks and peak clips buffered.
+
+Simulated time runs 10x faster than real time. No API keys needed.
+
+Usage:
+    python bench_tts_delivery.py
+    BENCH_STRAGGLER_RATE=0.2 BENCH_RUNS=50 python bench_tts_delivery.py
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app.services.tts_delivery as tts_delivery
+from app.services.tts_delivery import OrderedAudioDelivery
+
+SCALE = 0.1  # simulated seconds per real second
+RUNS = int(os.getenv("BENCH_RUNS", "20"))
+SENTENCES = int(os.getenv("BENCH_SENTENCES", "8"))
+WORKERS = 3
+LLM_SENTENCE_MS = 350          # LLM emits one sentence every ~350ms
+PROVIDER_MEDIAN_MS = 900       # typical synthesis latency per sentence
+STRAGGLER_RATE = float(os.getenv("BENCH_STRAGGLER_RATE", "0.1"))
+STRAGGLER_MS = 6000            # a stuck provider call
+SENTENCE = "Spray neem oil on the leaves in the evening."  # ~3s of speech
+
+tts_delivery.CHARS_PER_SECOND = 15.0 / SCALE
+
+
+def synth_latency(rng: random.Random) -> float:
+    if rng.random() < STRAGGLER_RATE:
+        return STRAGGLER_MS * SCALE / 1000
+    return rng.lognormvariate(0, 0.35) * PROVIDER_MEDIAN_MS * SCALE / 1000
+
+
+def playback(arrivals: list, duration: float, t0: float) -> dict:
+    """Client playing clips in seq order as they arrive: TTFA, gaps, peak clips waiting."""
+    play_end, gaps, gap_s, peak = None, 0, 0.0, 0
+    for seq, arrived in enumerate(arrivals):
+        if arrived is None:
+            continue
+        if play_end is None:
+            ttfa = arrived - t0
+            play_end = arrived
+        elif arrived > play_end:
+            gaps += 1
+            gap_s += arrived - play_end
+        start = max(arrived, play_end)
+        # clips that had arrived but were waiting behind this one
+        peak = max(peak, sum(1 for a in arrivals[seq + 1:] if a is not None and a <= start))
+        play_end = start + duration
+    followers = sum(1 for a in arrivals if a is not None) - 1
+    return {"ttfa": ttfa, "gap_free": (followers - gaps) / followers if followers else 1.0,
+            "gap_s": gap_s, "peak": peak}
+
+
+async def produce(queue: asyncio.Queue, delivery=None):
+    for seq in range(SENTENCES):
+        await asyncio.sleep(LLM_SENTENCE_MS * SCALE / 1000)
+        if delivery:
+            await delivery.add(seq, SENTENCE)
+        await queue.put(seq)
+    if delivery:
+        delivery.close(SENTENCES)
+    for _ in range(WORKERS):
+        await queue.put(None)
+
+
+async def run_legacy(rng: random.Random) -> dict:
+    queue, t0 = asyncio.Queue(), time.monotonic()
+    arrivals = [None] * SENTENCES
+
+    async def worker():
+        while (seq := await queue.get()) is not None:
+            await asyncio.sleep(synth_latency(rng))
+            arrivals[seq] = time.monotonic()  # sent the moment it is done
+
+    await asyncio.gather(produce(queue), *(worker() for _ in range(WORKERS)))
+    result = playback(arrivals, len(SENTENCE) / tts_delivery.CHARS_PER_SECOND, t0)
+    result["skipped"] = 0
+    return result
+
+
+async def run_ordered(rng: random.Random) -> dict:
+    queue = asyncio.Queue()
+    sent = {}
+
+    async def send(seq, text, audio, fmt, skipped):
+        sent[seq] = None if skipped else time.monotonic()
+
+    delivery = OrderedAudioDelivery(send, grace_ms=2000 * SCALE, first_deadline_ms=8000 * SCALE)
+    t0 = delivery._t0
+
+    async def worker():
+        while (seq := await queue.get()) is not None:
+            if not await delivery.slot(seq):
+                continue
+            await asyncio.sleep(synth_latency(rng))
+            delivery.complete(seq, b"audio", "sim")
+
+    await asyncio.gather(produce(queue, delivery), delivery.run(), *(worker() for _ in range(WORKERS)))
+    summary = delivery.summary()
+    result = playback([sent.get(i) for i in range(SENTENCES)], len(SENTENCE) / tts_delivery.CHARS_PER_SECOND, t0)
+    result["skipped"] = summary["skipped"]
+    result["peak"] = summary["max_buffered"]
+    return result
+
+
+def report(name: str, results: list):
+    ttfa = statistics.median(r["ttfa"] for r in results) / SCALE * 1000
+    gap_free = statistics.mean(r["gap_free"] for r in results)
+    gap_s = statistics.mean(r["gap_s"] for r in results) / SCALE
+    skipped = sum(r["skipped"] for r in results)
+    peak = max(r["peak"] for r in results)
+    print(f"  {name:<22} | {ttfa:>9.0f} | {gap_free:>8.1%} | {gap_s:>10.2f} | {skipped:>7} | {peak:>4}")
+
+
+def main():
+    print("=" * 78)
+    print(f"  {RUNS} responses x {SENTENCES} sentences, {WORKERS} workers, "
+          f"provider median {PROVIDER_MEDIAN_MS}ms, stragglers {STRAGGLER_RATE:.0%} at {STRAGGLER_MS}ms")
+    print("=" * 78)
+    print(f"  {'delivery':<22} | {'TTFA ms':>9} | {'gap-free':>8} | {'gap s/resp':>10} | {'skipped':>7} | peak")
+    print("-" * 78)
+    legacy = [asyncio.run(run_legacy(random.Random(i))) for i in range(RUNS)]
+    ordered = [asyncio.run(run_ordered(random.Random(i))) for i in range(RUNS)]
+    report("send-on-completion", legacy)
+    report("ordered + deadlines", ordered)
+    print("-" * 78)
+    print("  peak = clips buffered ahead of playback (client-side before, server-side now)")
+
+
+if __name__ == "__main__":
+    main()
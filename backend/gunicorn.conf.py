@@ -0,0 +1,41 @@
+"""
+Gunicorn config — EventHorizon AI
+==================================
+Multi-worker serving with the plant classifier loaded once in the master:
+
+    CLASSIFIER_SHARE_MODE=prefork gunicorn -c gunicorn.conf.py app.main:app
+
+With preload + prefork the weights are loaded before workers fork, so all
+workers share the same read-only pages copy-on-write. In the default "mmap"
+mode workers instead map the persisted weight file themselves, which also
+shares pages and works with plain `uvicorn --workers N`.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+
+def on_starting(server):
+    """Runs once in the master before any worker is forked."""
+    if os.getenv("CLASSIFIER_SHARE_MODE", "mmap").strip().lower() != "prefork":
+        return
+    try:
+        # Only load weights here — never run inference in the master: torch's
+        # intra-op thread pool must not be started before fork.
+        from app.services.classifier_service import load_shared_classifier
+        load_shared_classifier()
+    except Exception as e:
+        server.log.warning(f"Pre-fork classifier load failed, workers will load lazily: {e}")
+
+
+def post_fork(server, worker):
+    try:
+        from app.services.classifier_service import get_memory_mb
+        server.log.info(f"Worker {worker.pid} forked — memory {get_memory_mb()}")
+    except Exception:
+        pass
@@ -0,0 +1,55 @@
+"""
+Advisory Phrase Pre-synthesis — EventHorizon AI
+=================================================
+Batch job: localizes every advisory template and synthesizes its fixed
+phrases into the audio store for each Azure voice language, so
+/api/voice/advisory-tts only synthesizes the dynamic values at request
+time. Safe to re-run — stored clips are skipped.
+Needs AZURE_SPEECH_KEY (and the translator for non-English languages).
+
+Usage:
+    python presynth_phrases.py
+    python presynth_phrases.py --languages hi ta te --numbers
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from dotenv import load_dotenv
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-synthesize advisory template phrases")
+    parser.add_argument("--languages", nargs="*", help="language codes (default: every Azure voice language)")
+    parser.add_argument("--numbers", action="store_true", help="also synthesize NDVI values 0.00-1.00 and counts 1-12")
+    args = parser.parse_args()
+
+    from app.services.azure_tts_engine import casual_voice_engine
+    from app.services.audio_store import audio_store
+    from app.services.phrase_tts import presynthesize
+
+    if not casual_voice_engine.is_available:
+        print("Azure TTS unavailable (AZURE_SPEECH_KEY / SDK missing).")
+        return
+
+    t0 = time.perf_counter()
+    report = presynthesize(args.languages, numbers=args.numbers)
+
+    print("=" * 70)
+    print(f"  {'language':>8} | {'templates':>9} | {'phrases':>7} | {'new clips':>9} | failed")
+    print("-" * 70)
+    for language, row in report.items():
+        print(f"  {language:>8} | {row['templates_localized']:>9} | {row['phrases']:>7} | "
+              f"{row['synthesized']:>9} | {row['failed']}")
+    print("-" * 70)
+    store = audio_store.get_stats()
+    print(f"  {time.perf_counter() - t0:.1f}s  store: {store['entries']} clips, {store['bytes'] / 1e6:.1f} MB in {store['dir']}")
+    casual_voice_engine.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Classifier Backend Parity Test — EventHorizon AI
+==================================================
+Runs the PlantVillage classifier through each backend (torch, onnx,
+onnx-int8) in its own subprocess on the same sample set and compares:
+
+  • top-1 agreement and max probability drift vs. torch
+  • median latency per image at batch 1 and batch 8
+  • RSS added by loading the backend
+
+Samples come from CLASSIFIER_SAMPLE_DIR (default ./samples/leaves, any
+.jpg/.png); if that is empty a deterministic synthetic set is generated so
+the comparison still runs.
+
+Usage:
+    python test_classifier_onnx_parity.py
+    CLASSIFIER_SAMPLE_DIR=/data/plantvillage/val python test_classifier_onnx_parity.py
+"""
+
+import os
+import sys
+import json
+import time
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+SAMPLE_DIR = os.getenv("CLASSIFIER_SAMPLE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "leaves"))
+MIN_AGREEMENT = {"onnx": 1.0, "onnx-int8": float(os.getenv("INT8_MIN_AGREEMENT", "0.95"))}
+ROUNDS = 5
+
+
+def load_samples():
+    from PIL import Image, ImageDraw
+
+    images = []
+    if os.path.isdir(SAMPLE_DIR):
+        for name in sorted(os.listdir(SAMPLE_DIR)):
+            if name.lower().endswith((".jpg", ".jpeg", ".png")):
+                images.append(Image.open(os.path.join(SAMPLE_DIR, name)).convert("RGB"))
+    if images:
+        return images, "dir"
+
+    # Synthetic leaves: green ellipses with brown/yellow lesions on soil-coloured backgrounds
+    for i in range(16):
+        img = Image.new("RGB", (320, 280), (90 + i * 5, 70 + i * 3, 40))
+        draw = ImageDraw.Draw(img)
+        draw.ellipse((30 + i, 20, 290 - i, 260), fill=(40 + i * 4, 130 + i * 5, 40 + i * 2))
+        for j in range(i % 6):
+            x, y = 80 + j * 30, 90 + (j * 37 + i * 11) % 100
+            draw.ellipse((x, y, x + 18, y + 14), fill=(120 + j * 10, 80 + i * 3, 30))
+        images.append(img)
+    return images, "synthetic"
+
+
+def run_child(backend):
+    """Load one backend, classify the samples, print a JSON report."""
+    os.environ["CLASSIFIER_BACKEND"] = backend
+    from app.services import classifier_service as cs
+
+    images, source = load_samples()
+    before = cs.get_memory_mb().get("Rss", 0)
+    proc, mod = cs.load_shared_classifier()
+    after = cs.get_memory_mb().get("Rss", 0)
+    actual = cs.memory_report.get("backend")
+
+    if hasattr(mod, "predict_proba"):
+        probs = mod.predict_proba(images).tolist()
+    else:
+        import torch
+        cs.configure_torch_threads()
+        with torch.inference_mode():
+            logits = mod(**proc(images=images, return_tensors="pt")).logits
+            probs = torch.nn.functional.softmax(logits, dim=-1).tolist()
+
+    latency = {}
+    for batch in (1, 8):
+        subset = images[:batch]
+        cs.run_batch_inference(proc, mod, subset)
+        timings = []
+        for _ in range(ROUNDS):
+            t0 = time.perf_counter()
+            cs.run_batch_inference(proc, mod, subset)
+            timings.append((time.perf_counter() - t0) / len(subset))
+        latency[batch] = statistics.median(timings) * 1000
+
+    print(json.dumps({
+        "backend": actual,
+        "source": source,
+        "probs": probs,
+        "latency_ms": latency,
+        "rss_added_mb": round(after - before, 1),
+    }))
+
+
+def run_backend(backend):
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", backend],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"[FAIL] {backend} backend crashed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    results = {b: run_backend(b) for b in BACKENDS}
+    ref = results["torch"]["probs"]
+    ref_top = [max(range(len(p)), key=p.__getitem__) for p in ref]
+
+    print("=" * 76)
+    print(f"  Samples: {len(ref)} ({results['torch']['source']})")
+    print("=" * 76)
+    print(f"  {'backend':<10} | {'top1 agree':>10} | {'max |dp|':>8} | {'ms/img b1':>9} | {'ms/img b8':>9} | {'+RSS MB':>8}")
+    print("-" * 76)
+
+    ok = True
+    for backend in BACKENDS:
+        r = results[backend]
+        if r["backend"] != backend:
+            print(f"  {backend:<10} | fell back to {r['backend']} — is onnxruntime installed?")
+            ok = False
+            continue
+        top = [max(range(len(p)), key=p.__getitem__) for p in r["probs"]]
+        agree = sum(a == b for a, b in zip(top, ref_top)) / len(ref_top)
+        drift = max(abs(x - y) for p, q in zip(r["probs"], ref) for x, y in zip(p, q))
+        lat = r["latency_ms"]
+        print(f"  {backend:<10} | {agree:>10.1%} | {drift:>8.4f} | {lat['1']:>9.1f} | {lat['8']:>9.1f} | {r['rss_added_mb']:>8.1f}")
+        if backend in MIN_AGREEMENT and agree < MIN_AGREEMENT[backend]:
+            ok = False
+
+    print("-" * 76)
+    print(f"  Parity: {'PASS' if ok else 'FAIL'}")
+    print("=" * 76)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        run_child(sys.argv[2])
+    else:
+        sys.exit(main())
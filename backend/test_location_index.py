@@ -0,0 +1,119 @@
+"""
+District Spatial Index Verification & Benchmark — EventHorizon AI
+==================================================================
+Checks the grid index in location_index.py against a brute-force haversine
+scan (nearest, k-nearest, radius, batch) and benchmarks it against the
+previous linear scan over INDIA_LOCATIONS.
+"""
+
+import sys
+import os
+import time
+import random
+
+# Ensure backend directory is in python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.india_locations import INDIA_LOCATIONS, find_nearest_district
+from app.services.location_index import (
+    DISTRICT_INDEX,
+    haversine_km,
+    find_nearest_districts,
+    find_districts_within,
+    find_nearest_district_many,
+)
+
+
+def brute_force(lat, lon):
+    """Exhaustive haversine scan — the reference answer."""
+    scored = []
+    for state, districts in INDIA_LOCATIONS.items():
+        for district, coords in districts.items():
+            scored.append((haversine_km(lat, lon, coords["lat"], coords["lon"]), state, district))
+    scored.sort()
+    return scored
+
+
+def legacy_linear_scan(lat, lon):
+    """The pre-index implementation (squared-degree distance, full scan)."""
+    best = None
+    best_dist = float("inf")
+    for state, districts in INDIA_LOCATIONS.items():
+        for district, coords in districts.items():
+            d = (coords["lat"] - lat) ** 2 + (coords["lon"] - lon) ** 2
+            if d < best_dist:
+                best_dist = d
+                best = {"state": state, "district": district, "lat": coords["lat"], "lon": coords["lon"]}
+    return best
+
+
+def random_points(n, seed=42):
+    rng = random.Random(seed)
+    # India bounding box plus a margin so some points fall offshore
+    return [(rng.uniform(5.0, 38.0), rng.uniform(66.0, 99.0)) for _ in range(n)]
+
+
+def field_points(n, seed=7):
+    """Realistic GPS fixes: farms within ~50 km of a district centroid."""
+    rng = random.Random(seed)
+    centroids = [c for districts in INDIA_LOCATIONS.values() for c in districts.values()]
+    return [(c["lat"] + rng.uniform(-0.5, 0.5), c["lon"] + rng.uniform(-0.5, 0.5))
+            for c in rng.choices(centroids, k=n)]
+
+
+def run_tests():
+    if sys.platform == "win32":
+        sys.stdout.reconfigure(encoding="utf-8")
+
+    print("=" * 60)
+    print(f"  District Spatial Index — {len(DISTRICT_INDEX)} districts, {len(DISTRICT_INDEX.cells)} cells")
+    print("=" * 60)
+
+    points = random_points(1000) + field_points(1000)
+    failures = 0
+
+    # 1. Correctness vs brute force
+    for lat, lon in points:
+        ref = brute_force(lat, lon)
+        got = find_nearest_district(lat, lon)
+        if (got["state"], got["district"]) != (ref[0][1], ref[0][2]) and \
+                abs(haversine_km(lat, lon, got["lat"], got["lon"]) - ref[0][0]) > 1e-9:
+            failures += 1
+
+        knn = find_nearest_districts(lat, lon, k=5)
+        if [round(r["distance_km"], 3) for r in knn] != [round(d, 3) for d, _, _ in ref[:5]]:
+            failures += 1
+
+        within = find_districts_within(lat, lon, 150)
+        if len(within) != sum(1 for d, _, _ in ref if d <= 150):
+            failures += 1
+
+    batch = find_nearest_district_many(points)
+    for (lat, lon), got in zip(points, batch):
+        if abs(got["distance_km"] - round(brute_force(lat, lon)[0][0], 3)) > 1e-3:
+            failures += 1
+
+    print(f"\n[CORRECTNESS] {len(points)} random points: {'PASS' if failures == 0 else f'FAIL ({failures} mismatches)'}")
+
+    # 2. Benchmarks
+    def bench(label, fn, n_points):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        print(f"  {label:<28} {elapsed * 1000:8.1f} ms  ({elapsed / n_points * 1e6:6.1f} µs/query)")
+
+    points = field_points(2000, seed=11)
+    print(f"\n[BENCHMARK] nearest district — {len(points)} field GPS fixes")
+    bench("legacy linear scan", lambda: [legacy_linear_scan(la, lo) for la, lo in points], len(points))
+    bench("grid index (single)", lambda: [find_nearest_district(la, lo) for la, lo in points], len(points))
+    bench("grid index (batch)", lambda: find_nearest_district_many(points), len(points))
+    bench("k-nearest (k=5)", lambda: [find_nearest_districts(la, lo, 5) for la, lo in points], len(points))
+    bench("radius (50 km)", lambda: [find_districts_within(la, lo, 50) for la, lo in points], len(points))
+
+    print("\n" + "=" * 60)
+    return failures == 0
+
+
+if __name__ == "__main__":
+    ok = run_tests()
+    sys.exit(0 if ok else 1)
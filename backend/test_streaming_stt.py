@@ -0,0 +1,65 @@
+"""Test: incremental STT transcribes each speech segment once (MockASR, synthetic PCM)."""
+import sys, math, asyncio, array
+sys.path.insert(0, "app")
+
+from app.services.streaming_stt import IncrementalTranscriber, MockASR, SAMPLE_RATE
+
+SEP = "=" * 60
+
+CHUNK_MS = 250
+
+
+def tone(seconds: float, amp: int = 6000) -> bytes:
+    n = int(seconds * SAMPLE_RATE)
+    return array.array("h", (int(amp * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)) for i in range(n))).tobytes()
+
+
+def silence(seconds: float) -> bytes:
+    return bytes(int(seconds * SAMPLE_RATE) * 2)
+
+
+async def run(utterance: bytes):
+    asr = MockASR()
+    stt = IncrementalTranscriber(asr=asr, input_format="pcm", preview_every=3, preview_min_interval_ms=0)
+    chunk_bytes = SAMPLE_RATE * 2 * CHUNK_MS // 1000
+    previews = []
+    for off in range(0, len(utterance), chunk_bytes):
+        stt.add_chunk(utterance[off:off + chunk_bytes])
+        if stt.should_preview():
+            previews.append((await stt.preview())["transcript"])
+    final = await stt.finalize()
+    return asr, previews, final
+
+
+print(SEP)
+print("  Incremental STT — 3 phrases separated by pauses")
+print(SEP)
+
+speech = tone(1.5) + silence(0.8) + tone(2.0) + silence(0.8) + tone(1.0) + silence(0.2)
+asr, previews, final = asyncio.run(run(speech))
+total_s = len(speech) / (SAMPLE_RATE * 2)
+asr_s = sum(asr.calls) / (SAMPLE_RATE * 2)
+
+for p in previews:
+    print(f"  preview: {p!r}")
+print(f"  final:   {final['transcript']!r}")
+print(f"  segments={final['segments']} asr_calls={len(asr.calls)} asr_audio={asr_s:.1f}s (utterance {total_s:.1f}s)")
+
+# Legacy path sent the growing buffer every 3rd chunk plus once at the end
+n_chunks = math.ceil(len(speech) / (SAMPLE_RATE * 2 * CHUNK_MS / 1000))
+legacy_s = sum(min(total_s, k * CHUNK_MS / 1000) for k in range(3, n_chunks + 1, 3)) + total_s
+print(f"  legacy whole-buffer path would have sent ~{legacy_s:.1f}s of audio")
+
+assert final["segments"] == 3, final
+assert len(asr.calls) == 3, "each segment must be transcribed exactly once"
+assert final["transcript"].count("seg") == 3
+assert final["stats"]["reused_segments"] > 0, "finalize should reuse preview results"
+
+# Quiet speaker: never crosses STT_VAD_MIN_RMS, so the whole recording goes to ASR once
+quiet = tone(1.5, amp=200) + silence(0.3)
+asr, _, final = asyncio.run(run(quiet))
+print(f"  quiet speaker: segments={final['segments']} asr_calls={len(asr.calls)} transcript={final['transcript']!r}")
+assert final["segments"] == 0 and len(asr.calls) == 1, "quiet audio must still reach ASR"
+assert final["transcript"], final
+assert final["stats"]["vad_fallbacks"] == 1
+print("\n  => OK")
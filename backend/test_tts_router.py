@@ -0,0 +1,90 @@
+"""Test: adaptive TTS router learns the fast provider, hedges stragglers and cools down failures (simulated providers)."""
+import sys, random, asyncio
+sys.path.insert(0, "app")
+
+import app.services.tts_router as tts_router_module
+from app.services.tts_router import TTSRouter
+
+SEP = "=" * 60
+LANG = "hi"
+random.seed(7)
+
+# Scaled-down latencies: priors and hedge floor in tens of ms instead of seconds
+tts_router_module.PRIOR_LATENCY_MS = {"sarvam": 100.0, "gemini": 120.0}
+tts_router_module.HEDGE_MIN_MS = 20
+tts_router_module.COOLDOWN_S = 60
+tts_router_module.EXPLORE_RATE = 0.1
+
+
+def provider(name, latency_ms, fail_every=0, stall_every=0):
+    count = {"n": 0}
+
+    def call():
+        async def run():
+            count["n"] += 1
+            delay = latency_ms * random.uniform(0.8, 1.2)
+            if stall_every and count["n"] % stall_every == 0:
+                delay *= 10
+            await asyncio.sleep(delay / 1000)
+            if fail_every and count["n"] % fail_every == 0:
+                raise RuntimeError(f"{name} 503")
+            return name.encode()
+        return run()
+    return call, count
+
+
+async def scenario(router, calls, counts, sentences):
+    winners = {}
+    for _ in range(sentences):
+        audio, name = await router.run(LANG, calls)
+        assert audio, "every sentence must get audio"
+        winners[name] = winners.get(name, 0) + 1
+    return winners, {k: c["n"] for k, c in counts.items()}
+
+
+print(SEP)
+print("  1. Learns the fastest provider (sarvam prior, gemini actually faster)")
+print(SEP)
+router = TTSRouter()
+g, gc = provider("gemini", 30)
+s, sc = provider("sarvam", 120)
+winners, sent = asyncio.run(scenario(router, {"gemini": g, "sarvam": s}, {"gemini": gc, "sarvam": sc}, 40))
+print(f"  winners={winners} requests sent={sent}")
+assert router.rank(LANG, ["sarvam", "gemini"])[0] == "gemini"
+assert sum(sent.values()) < 40 * 1.3, "racing every sentence would send 80 requests"
+
+print(SEP)
+print("  2. Hedges a provider that stalls on every 5th request")
+print(SEP)
+router = TTSRouter()
+g, gc = provider("gemini", 60, stall_every=5)
+s, sc = provider("sarvam", 90)
+winners, sent = asyncio.run(scenario(router, {"gemini": g, "sarvam": s}, {"gemini": gc, "sarvam": sc}, 40))
+stats = router.get_stats()
+print(f"  winners={winners} requests sent={sent} hedged={stats['hedged']} hedge_wins={stats['hedge_wins']}")
+assert stats["hedged"] >= 4 and stats["hedge_wins"] >= 3, "stalled requests should be rescued by the hedge"
+
+print(SEP)
+print("  3. Cools down a failing provider")
+print(SEP)
+router = TTSRouter()
+g, gc = provider("gemini", 80)
+s, sc = provider("sarvam", 5, fail_every=1)
+winners, sent = asyncio.run(scenario(router, {"gemini": g, "sarvam": s}, {"gemini": gc, "sarvam": sc}, 40))
+sarvam = router.get_stats()["by_language"][LANG]["sarvam"]
+print(f"  winners={winners} requests sent={sent} sarvam cooldowns={sarvam['cooldowns']} cooling_for={sarvam['cooling_for_s']}s")
+assert winners == {"gemini": 40}
+assert sarvam["error_rate"] > 0.1
+assert sent["sarvam"] <= 8, "a cooled-down provider should not be tried first"
+
+# Three straight failures bench a provider even if it is the cheapest on paper
+router = TTSRouter()
+for _ in range(3):
+    router.record("sarvam", LANG, 10, ok=False)
+router.record("sarvam", LANG, 10, ok=True)
+sarvam = router.get_stats()["by_language"][LANG]["sarvam"]
+print(f"  after 3 failures: cooldowns={sarvam['cooldowns']} cooling_for={sarvam['cooling_for_s']}s")
+assert sarvam["cooldowns"] == 1 and sarvam["cooling_for_s"] > 0
+assert router.rank(LANG, ["sarvam", "gemini"]) == ["gemini", "sarvam"]
+
+print("\n  => OK")
@@ -17,7 +17,8 @@ const Gatekeeper: React.FC<GatekeeperProps> = ({ children }) => {
                 const response = await fetch('/api/health');
                 if (response.ok) {
                     const data = await response.json();
-                    if (data.status === 'ready') {
+                    // "degraded": a critical component failed to warm, but the API is up
+                    if (data.status === 'ready' || data.status === 'degraded') {
                         setIsBackendReady(true);
                         setIsError(false);
                         clearInterval(intervalId);